@@ -0,0 +1,60 @@
+"""
+Benchmark dictionary lookups keyed by nested attributes.
+
+Lookups with the same attribute objects reuse their cached hash, while
+lookups with freshly built, structurally equal attributes have to compute
+the hash of the whole attribute tree, as it would without caching.
+"""
+
+import argparse
+import time
+
+from xdsl.dialects.builtin import (Float32Type, IntegerType, TensorType,
+                                   TupleType, VectorType)
+from xdsl.ir import Attribute
+
+
+def build_type(idx: int) -> Attribute:
+    vector = VectorType.from_type_and_list(Float32Type(), [4, idx % 16 + 1])
+    tensor = TensorType.from_type_and_list(vector, [idx, 2, 3])
+    return TupleType.from_type_list(
+        [tensor, vector, IntegerType.from_width(idx % 64 + 1)])
+
+
+def time_lookups(table: dict[Attribute, int], keys: list[Attribute],
+                 num_rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(num_rounds):
+        for key in keys:
+            table[key]
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-types", type=int, default=200)
+    arg_parser.add_argument("--num-rounds", type=int, default=200)
+    arg_parser.add_argument("--num-fresh-rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    keys = [build_type(i) for i in range(args.num_types)]
+    table = {key: idx for idx, key in enumerate(keys)}
+
+    num_lookups = args.num_types * args.num_rounds
+    cached = time_lookups(table, keys, args.num_rounds)
+
+    # Fresh attributes are built outside of the timed region
+    num_fresh_lookups = args.num_types * args.num_fresh_rounds
+    fresh_keys = [
+        build_type(i) for _ in range(args.num_fresh_rounds)
+        for i in range(args.num_types)
+    ]
+    uncached = time_lookups(table, fresh_keys, 1)
+
+    print(f"cached hash (ns/lookup):  {cached / num_lookups * 1e9:.0f}")
+    print(f"fresh keys (ns/lookup):   "
+          f"{uncached / num_fresh_lookups * 1e9:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare the bytecode format with the textual format, on size, load time
+and write time.
+
+The module is a generated module of functions, which is printed and
+parsed in the textual format, and written and read in the bytecode format.
+"""
+
+import argparse
+import time
+from io import StringIO
+from typing import Callable
+
+from bench_parser import generate_program, new_context
+from xdsl.bytecode import from_bytecode, to_bytecode
+from xdsl.ir import Operation
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size",
+                            type=float,
+                            default=0.5,
+                            help="input size in MB")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    ctx = new_context()
+    module = Parser(ctx, generate_program(int(args.size * 2**20),
+                                          20)).parse_op()
+
+    def print_text(op: Operation) -> str:
+        output = StringIO()
+        Printer(stream=output).print_op(op)
+        return output.getvalue()
+
+    def best_time(fun: Callable[[], object]) -> float:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fun()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    text = print_text(module)
+    data = to_bytecode(module)
+    assert print_text(from_bytecode(ctx, data)) == text
+
+    text_write = best_time(lambda: print_text(module))
+    text_load = best_time(lambda: Parser(ctx, text).parse_op())
+    bytecode_write = best_time(lambda: to_bytecode(module))
+    bytecode_load = best_time(lambda: from_bytecode(ctx, data))
+
+    print(f"{'format':>8} {'size (MB)':>10} {'write (s)':>10} "
+          f"{'load (s)':>9}")
+    print(f"{'text':>8} {len(text) / 2**20:>10.2f} {text_write:>10.3f} "
+          f"{text_load:>9.3f}")
+    print(f"{'bytecode':>8} {len(data) / 2**20:>10.2f} "
+          f"{bytecode_write:>10.3f} {bytecode_load:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure the lazy loading of bytecode files.
+
+A module of functions is written to a bytecode file, which is then read
+eagerly, and memory-mapped while accessing the bodies of a few functions.
+The peak memory is measured with tracemalloc.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from bench_parse_parallel import generate_program
+from bench_parser import new_context
+from xdsl.bytecode import map_bytecode, read_bytecode, write_bytecode
+from xdsl.dialects.func import FuncOp
+from xdsl.ir import Operation
+from xdsl.parser import Parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=1000)
+    arg_parser.add_argument("--ops-per-function", type=int, default=20)
+    arg_parser.add_argument("--touched-functions", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    ctx = new_context()
+    module = Parser(
+        ctx, generate_program(args.num_functions,
+                              args.ops_per_function)).parse_op()
+
+    def touch(module: Operation) -> None:
+        funcs = list(module.regions[0].blocks[0].ops)
+        step = max(1, len(funcs) // args.touched_functions)
+        for func in funcs[::step][:args.touched_functions]:
+            assert func.regions[0].blocks
+
+    def load(path: Path, lazy: bool) -> None:
+        with open(path, "rb") as f:
+            if lazy:
+                with map_bytecode(ctx, f) as module:
+                    touch(module)
+            else:
+                touch(read_bytecode(ctx, f))
+
+    def measure(fun: Callable[[], object]) -> tuple[float, float]:
+        start = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        fun()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak / 2**20
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "module.xdslbc"
+        with open(path, "wb") as f:
+            write_bytecode(module, f, body_op_types=(FuncOp, ))
+        print(f"file: {path.stat().st_size / 2**20:.2f} MB, "
+              f"{args.num_functions} functions, "
+              f"{args.touched_functions} touched")
+        print(f"{'mode':>6} {'load (s)':>9} {'peak (MiB)':>11}")
+        for name, lazy in [("eager", False), ("lazy", True)]:
+            elapsed, peak = measure(lambda: load(path, lazy))
+            print(f"{name:>6} {elapsed:>9.3f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
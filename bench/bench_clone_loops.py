@@ -0,0 +1,99 @@
+"""
+Measure the cloning of affine loop nests.
+
+The module contains loop nests, where each loop body computes a few
+arithmetic operations from the induction variables of the enclosing loops.
+The whole module is cloned with `Operation.clone`, and a deep nest then
+checks that cloning does not overflow the stack.
+"""
+
+import argparse
+import time
+
+from xdsl.dialects.affine import For, Yield
+from xdsl.dialects.arith import Addi
+from xdsl.dialects.builtin import IndexType, ModuleOp
+from xdsl.ir import Block, BlockArgument, Operation, Region, SSAValue
+
+
+def generate_nest(depth: int, ops_per_loop: int) -> Operation:
+    """Generate a loop nest of `depth` affine.for loops."""
+
+    def loop_body(level: int, ivs: list[SSAValue]) -> Block.BlockCallback:
+
+        def body(iv: BlockArgument) -> list[Operation]:
+            ops = list[Operation]()
+            value: SSAValue = iv
+            for idx in range(ops_per_loop):
+                add = Addi.get(value, ivs[idx % len(ivs)] if ivs else iv)
+                ops.append(add)
+                value = add.results[0]
+            if level + 1 < depth:
+                ops.append(
+                    For.from_callable([], 0, 16,
+                                      loop_body(level + 1, ivs + [iv])))
+            ops.append(Yield.get())
+            return ops
+
+        return body
+
+    return For.from_callable([], 0, 16, loop_body(0, []))
+
+
+def generate_deep_nest(depth: int) -> Operation:
+    """
+    Generate a loop nest of `depth` affine.for loops containing only their
+    inner loop. The nest is built from the innermost loop outwards, so that
+    it does not recurse.
+    """
+    loop: Operation | None = None
+    for _ in range(depth):
+        block = Block.from_arg_types([IndexType()])
+        block.add_ops(([loop] if loop is not None else []) + [Yield.get()])
+        loop = For.from_region([], 0, 16, Region.from_block_list([block]))
+    assert loop is not None
+    return loop
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-nests", type=int, default=200)
+    arg_parser.add_argument("--depth", type=int, default=8)
+    arg_parser.add_argument("--ops-per-loop", type=int, default=4)
+    arg_parser.add_argument("--deep-depth", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    module = ModuleOp.from_region_or_ops([
+        generate_nest(args.depth, args.ops_per_loop)
+        for _ in range(args.num_nests)
+    ])
+    num_ops = 0
+
+    def count(op: Operation) -> None:
+        nonlocal num_ops
+        num_ops += 1
+
+    module.walk(count)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        module.clone()
+        best = min(best, time.perf_counter() - start)
+    print(f"operations:  {num_ops}")
+    print(f"clone (s):   {best:.3f}")
+    print(f"ops/s:       {num_ops / best:.0f}")
+
+    deep = ModuleOp.from_region_or_ops([generate_deep_nest(args.deep_depth)])
+    start = time.perf_counter()
+    try:
+        deep.clone()
+        print(f"depth {args.deep_depth} (s): "
+              f"{time.perf_counter() - start:.3f}")
+    except RecursionError:
+        print(f"depth {args.deep_depth}: recursion error")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the ways of copying a whole module.
+
+The module is a generated module of functions, copied with
+`Operation.clone`, with `copy_ops`, and through a pickle roundtrip. A module
+nested deeper than the recursion limit is copied as well.
+"""
+
+import argparse
+import pickle
+import time
+from typing import Callable
+
+from bench_parse_parallel import generate_program
+from bench_parser import new_context
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.dialects.scf import If, Yield
+from xdsl.ir import Operation
+from xdsl.parser import Parser
+from xdsl.serialization import copy_ops
+
+
+def generate_nested_module(depth: int) -> ModuleOp:
+    cond = Constant.from_int_constant(1, 1)
+    inner: list[Operation] = [Yield.get()]
+    for _ in range(depth):
+        inner = [If.get(cond, [], inner, [Yield.get()]), Yield.get()]
+    return ModuleOp.from_region_or_ops([cond, inner[0]])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=1000)
+    arg_parser.add_argument("--ops-per-function", type=int, default=10)
+    arg_parser.add_argument("--depth", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    module = Parser(
+        new_context(),
+        generate_program(args.num_functions,
+                         args.ops_per_function)).parse_op()
+    nested = generate_nested_module(args.depth)
+
+    def best_time(fun: Callable[[], object]) -> str:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            try:
+                fun()
+            except RecursionError:
+                return "recursion error"
+            best = min(best, time.perf_counter() - start)
+        return f"{best:.3f}"
+
+    print(f"{'method':>10} {'module (s)':>12} {'nested (s)':>16}")
+    methods: list[tuple[str, Callable[[Operation], Operation]]] = [
+        ("clone", lambda op: op.clone()),
+        ("copy_ops", lambda op: copy_ops([op])[0]),
+        ("pickle", lambda op: pickle.loads(pickle.dumps(op))),
+    ]
+    for name, copy in methods:
+        print(f"{name:>10} {best_time(lambda: copy(module)):>12} "
+              f"{best_time(lambda: copy(nested)):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure the memory used per operation by an arith-heavy module.
+
+The module is a long chain of arith.constant and arith.addi operations,
+and the memory is measured with tracemalloc after building it, and again
+after verifying and printing it, which should not allocate more memory in
+the operations.
+"""
+
+import argparse
+import os
+import tracemalloc
+
+from xdsl.dialects.arith import Addi, Constant
+from xdsl.dialects.builtin import ModuleOp, i32
+from xdsl.ir import Operation
+from xdsl.printer import Printer
+
+
+def build_ops(num_ops: int) -> list[Operation]:
+    """Build a chain of constants and additions with `num_ops` operations."""
+    ops = list[Operation]()
+    acc = Constant.from_int_constant(0, i32)
+    ops.append(acc)
+    while len(ops) < num_ops:
+        cst = Constant.from_int_constant(len(ops), i32)
+        acc = Addi.get(acc, cst)
+        ops += [cst, acc]
+    return ops
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-ops", type=int, default=100000)
+    args = arg_parser.parse_args()
+
+    # Build a first module, so that classes and attribute caches are
+    # initialized before measuring.
+    ModuleOp.from_region_or_ops(build_ops(100))
+
+    tracemalloc.start()
+    module = ModuleOp.from_region_or_ops(build_ops(args.num_ops))
+    built, peak = tracemalloc.get_traced_memory()
+    module.verify()
+    verified, _ = tracemalloc.get_traced_memory()
+    with open(os.devnull, "w") as stream:
+        Printer(stream=stream).print_op(module)
+    printed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_ops = len(module.ops)
+    print(f"operations:            {num_ops}")
+    print(f"total:                 {built / 2**20:.1f} MiB")
+    print(f"peak bytes/op:         {peak / num_ops:.0f}")
+    print(f"bytes/op after build:  {built / num_ops:.0f}")
+    print(f"bytes/op after verify: {verified / num_ops:.0f}")
+    print(f"bytes/op after print:  {printed / num_ops:.0f}")
+
+
+if __name__ == "__main__":
+    main()
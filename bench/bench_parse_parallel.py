@@ -0,0 +1,53 @@
+"""
+Measure the scaling of the parallel parser with the number of workers.
+
+The input is a generated module of independent functions, parsed once
+sequentially and then with pools of 1, 2, 4 and 8 worker processes.
+"""
+
+import argparse
+import time
+
+from bench_parser import generate_function, new_context
+from xdsl.parallel import parse_module_parallel
+from xdsl.parser import Parser
+
+
+def generate_program(num_functions: int, ops_per_function: int) -> str:
+    lines = ["module() {"]
+    for idx in range(num_functions):
+        lines += generate_function(idx, ops_per_function)
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=1000)
+    arg_parser.add_argument("--ops-per-function", type=int, default=10)
+    arg_parser.add_argument("--workers",
+                            type=int,
+                            nargs="+",
+                            default=[1, 2, 4, 8])
+    args = arg_parser.parse_args()
+
+    program = generate_program(args.num_functions, args.ops_per_function)
+    print(f"input: {len(program) / 2**20:.2f} MB, "
+          f"{args.num_functions} functions")
+
+    start = time.perf_counter()
+    Parser(new_context(), program).parse_op()
+    sequential = time.perf_counter() - start
+
+    print(f"{'workers':>10} {'parse (s)':>10} {'speedup':>8}")
+    print(f"{'sequential':>10} {sequential:>10.3f} {1:>8.2f}")
+    for num_workers in args.workers:
+        start = time.perf_counter()
+        parse_module_parallel(new_context(), program, num_workers)
+        elapsed = time.perf_counter() - start
+        print(f"{num_workers:>10} {elapsed:>10.3f} "
+              f"{sequential / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
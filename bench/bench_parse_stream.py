@@ -0,0 +1,63 @@
+"""
+Compare parsing a file read as a whole with parsing it as a stream.
+
+The peak memory is measured with tracemalloc, and includes both the input
+and the parsed IR. When streaming, only a chunk of the input is held in
+memory at a time.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+
+from bench_parser import generate_program, new_context
+from xdsl.parser import Parser
+
+
+def parse_string(path: Path):
+    with open(path) as f:
+        return Parser(new_context(), f.read()).parse_op()
+
+
+def parse_file(path: Path):
+    with open(path) as f:
+        return Parser(new_context(), f).parse_op()
+
+
+def parse_mmap(path: Path):
+    with open(path, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as m:
+        return Parser(new_context(), m).parse_op()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size",
+                            type=float,
+                            default=0.5,
+                            help="input size in MB")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "input.xdsl"
+        path.write_text(generate_program(int(args.size * 2**20), 20))
+        size = path.stat().st_size / 2**20
+        print(f"input: {size:.2f} MB")
+        print(f"{'mode':>8} {'parse (s)':>10} {'peak (MiB)':>11}")
+        for name, parse in [("string", parse_string), ("file", parse_file),
+                            ("mmap", parse_mmap)]:
+            start = time.perf_counter()
+            parse(path)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            parse(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>8} {elapsed:>10.3f} {peak / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
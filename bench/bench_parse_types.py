@@ -0,0 +1,70 @@
+"""
+Benchmark parsing and verifying a type-heavy module.
+
+Every operation of the generated module has nested vector, tuple and
+function types, drawn from a small set of distinct types, so most of the
+parsed attributes are structurally equal to a previously parsed one.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import Builtin
+from xdsl.ir import MLContext
+from xdsl.parser import Parser
+
+
+def generate_program(num_ops: int, num_types: int) -> str:
+    lines = ["module() {"]
+    for i in range(num_ops):
+        width = 8 * (1 + i % num_types)
+        elem = f"!i{width}"
+        vec = f"!vector<[4 : !index, {width} : !index], {elem}>"
+        typ = f"!tuple<[{vec}, !fun<[{elem}, {vec}], [{vec}]>]>"
+        lines.append(f'  %{i} : {typ} = arith.constant() '
+                     f'["value" = 0 : {elem}, "shape" = [{vec}, {vec}]]')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def new_context() -> MLContext:
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+    return ctx
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-ops", type=int, default=2000)
+    arg_parser.add_argument("--num-types", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    program = generate_program(args.num_ops, args.num_types)
+
+    start = time.perf_counter()
+    module = Parser(new_context(), program).parse_op()
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    module.verify()
+    verify_time = time.perf_counter() - start
+
+    # Parse a second time to measure the IR memory, as tracing allocations
+    # slows down the parser.
+    tracemalloc.start()
+    module = Parser(new_context(), program).parse_op()
+    ir_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"input:         {len(program) / 2**20:.2f} MiB, "
+          f"{args.num_ops} ops")
+    print(f"parse:         {parse_time:.3f} s")
+    print(f"verify:        {verify_time:.3f} s")
+    print(f"IR memory:     {ir_memory / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
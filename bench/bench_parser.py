@@ -0,0 +1,87 @@
+"""
+Measure the lexer and parser throughput in MB/s on generated modules.
+
+The generated module contains functions with block arguments, arithmetic
+operations, string and integer attributes, nested types and comments.
+"""
+
+import argparse
+import time
+
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import Builtin
+from xdsl.dialects.func import Func
+from xdsl.ir import MLContext
+from xdsl.lexer import Lexer
+from xdsl.parser import Parser
+
+
+def generate_function(idx: int, num_ops: int) -> list[str]:
+    lines = [
+        f'  func.func() ["sym_name" = "f{idx}", '
+        f'"function_type" = !fun<[!i32, !i64], [!i32]>, '
+        f'"sym_visibility" = "private"] {{',
+        "    ^0(%a : !i32, %b : !i64):",
+        "      // Chain of additions",
+        f'      %0 : !i32 = arith.constant() ["value" = {idx} : !i32]',
+    ]
+    for i in range(1, num_ops):
+        lines.append(f"      %{i} : !i32 = arith.addi(%{i - 1} : !i32, "
+                     f"%a : !i32)")
+    lines.append(f"      func.return(%{num_ops - 1} : !i32)")
+    lines.append("  }")
+    return lines
+
+
+def generate_program(size: int, ops_per_function: int) -> str:
+    """Generate a module of about `size` bytes."""
+    lines = ["module() {"]
+    num_bytes = 0
+    idx = 0
+    while num_bytes < size:
+        function = generate_function(idx, ops_per_function)
+        num_bytes += sum(len(line) + 1 for line in function)
+        lines += function
+        idx += 1
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def new_context() -> MLContext:
+    ctx = MLContext()
+    Builtin(ctx)
+    Func(ctx)
+    Arith(ctx)
+    return ctx
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--sizes",
+                            type=float,
+                            nargs="+",
+                            default=[0.25, 0.5, 1.0],
+                            help="input sizes in MB")
+    arg_parser.add_argument("--ops-per-function", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    print(f"{'size (MB)':>10} {'lex (MB/s)':>11} {'parse (s)':>10} "
+          f"{'parse (MB/s)':>13}")
+    for size in args.sizes:
+        program = generate_program(int(size * 2**20), args.ops_per_function)
+        num_mb = len(program) / 2**20
+
+        start = time.perf_counter()
+        for _ in Lexer(program):
+            pass
+        lex_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Parser(new_context(), program).parse_op()
+        parse_time = time.perf_counter() - start
+        print(f"{num_mb:>10.2f} {num_mb / lex_time:>11.2f} "
+              f"{parse_time:>10.3f} {num_mb / parse_time:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure the scaling of function passes run by a pool of worker processes.
+
+The input is a generated module of independent functions. A nested
+pipeline on func.func, whose pass swaps the operands of each arith.addi a
+few times, runs once in the current process and then with pools of 2, 4
+and 8 worker processes. The output is checked to be the same as the
+sequential output.
+"""
+
+import argparse
+import time
+from io import StringIO
+
+from bench_parse_parallel import generate_program
+from bench_parser import new_context
+from xdsl.dialects.arith import Addi
+from xdsl.dialects.func import FuncOp
+from xdsl.ir import MLContext, Operation
+from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager
+from xdsl.pattern_rewriter import (PatternRewriter, PatternRewriteWalker,
+                                   RewritePattern, op_type_rewrite_pattern)
+from xdsl.printer import Printer
+
+
+class SwapAddiOperands(RewritePattern):
+
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: Addi, rewriter: PatternRewriter):
+        rewriter.replace_matched_op(Addi.get(op.input2, op.input1))
+
+
+def swap_addi_operands(ctx: MLContext, op: Operation) -> None:
+    PatternRewriteWalker(SwapAddiOperands(),
+                         apply_recursively=False).rewrite_module(op)
+
+
+def run(program: str, num_workers: int, num_passes: int) -> tuple[float, str]:
+    ctx = new_context()
+    module = Parser(ctx, program).parse_op()
+    pass_manager = PassManager(ctx)
+    func_pass_manager = pass_manager.nest(FuncOp, num_workers=num_workers)
+    for _ in range(num_passes):
+        func_pass_manager.add_pass("swap-addi-operands", swap_addi_operands)
+    start = time.perf_counter()
+    pass_manager.run(module)
+    elapsed = time.perf_counter() - start
+    output = StringIO()
+    Printer(stream=output).print_op(module)
+    return elapsed, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=500)
+    arg_parser.add_argument("--ops-per-function", type=int, default=20)
+    arg_parser.add_argument("--num-passes", type=int, default=4)
+    arg_parser.add_argument("--workers",
+                            type=int,
+                            nargs="+",
+                            default=[2, 4, 8])
+    args = arg_parser.parse_args()
+
+    program = generate_program(args.num_functions, args.ops_per_function)
+    print(f"{args.num_functions} functions, {args.num_passes} passes")
+
+    sequential, expected = run(program, 1, args.num_passes)
+    print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'-':>8} {sequential:>9.3f} {1.0:>8.2f}")
+    for num_workers in args.workers:
+        elapsed, output = run(program, num_workers, args.num_passes)
+        assert output == expected, "parallel output differs"
+        print(f"{num_workers:>8} {elapsed:>9.3f} "
+              f"{sequential / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare the greedy and the indexed pattern appliers on a large pattern set.
+
+The pattern set contains patterns declared with `op_type_rewrite_pattern`
+on the operations of several dialects, and a few patterns matching any
+operation. None of the patterns rewrites the module, so that each walk
+only measures the cost of matching.
+"""
+
+import argparse
+import time
+
+from bench_parser import generate_program, new_context
+from xdsl.dialects.affine import Affine
+from xdsl.dialects.cf import Cf
+from xdsl.dialects.llvm import LLVM
+from xdsl.dialects.memref import MemRef
+from xdsl.dialects.scf import Scf
+from xdsl.ir import Operation
+from xdsl.parser import Parser
+from xdsl.pattern_rewriter import (AnonymousRewritePattern,
+                                   GreedyRewritePatternApplier,
+                                   IndexedRewritePatternApplier,
+                                   PatternRewriter, PatternRewriteWalker,
+                                   RewritePattern, op_type_rewrite_pattern)
+
+
+def make_pattern(op_type: type[Operation] | None) -> RewritePattern:
+    """Create a pattern on the given operation type that never rewrites."""
+
+    def match_and_rewrite(op: Operation, rewriter: PatternRewriter) -> None:
+        if "no_such_attribute" in op.attributes:
+            rewriter.erase_matched_op()
+
+    if op_type is None:
+        return AnonymousRewritePattern(match_and_rewrite)
+    match_and_rewrite.__annotations__["op"] = op_type
+    return AnonymousRewritePattern(op_type_rewrite_pattern(match_and_rewrite))
+
+
+def make_patterns(num_patterns: int, num_generic: int) -> list[RewritePattern]:
+    ctx = new_context()
+    for dialect in (Affine, Cf, LLVM, MemRef, Scf):
+        dialect(ctx)
+    op_types = sorted(ctx._registeredOps.values(), key=lambda op: op.name)
+    patterns = [
+        make_pattern(op_types[idx % len(op_types)])
+        for idx in range(num_patterns - num_generic)
+    ]
+    # Spread the generic patterns in the pattern set
+    for idx in range(num_generic):
+        patterns.insert(idx * len(patterns) // num_generic, make_pattern(None))
+    return patterns
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size",
+                            type=float,
+                            default=0.25,
+                            help="input size in MB")
+    arg_parser.add_argument("--num-patterns", type=int, default=200)
+    arg_parser.add_argument("--num-generic", type=int, default=4)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    module = Parser(new_context(), generate_program(int(args.size * 2**20),
+                                                    20)).parse_op()
+    ops = list[Operation]()
+    module.walk(ops.append)
+    patterns = make_patterns(args.num_patterns, args.num_generic)
+
+    print(f"operations:  {len(ops)}")
+    print(f"patterns:    {len(patterns)}")
+    for name, pattern in (
+        ("greedy", GreedyRewritePatternApplier(patterns)),
+        ("indexed", IndexedRewritePatternApplier(patterns)),
+    ):
+        walker = PatternRewriteWalker(pattern, apply_recursively=False)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            walker.rewrite_module(module)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name + ' (s):':<13}{best:.3f} "
+              f"({len(ops) / best:.0f} ops/s)")
+
+
+if __name__ == "__main__":
+    main()
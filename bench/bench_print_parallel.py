@@ -0,0 +1,54 @@
+"""
+Measure the scaling of the parallel printer with the number of workers.
+
+The printed module contains independent functions, printed once
+sequentially with local SSA names and then with pools of 1, 2, 4 and 8
+worker processes. The parallel output is checked against the sequential
+output.
+"""
+
+import argparse
+import time
+from io import StringIO
+
+from bench_parse_parallel import generate_program
+from bench_parser import new_context
+from xdsl.parallel import print_module_parallel
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=1000)
+    arg_parser.add_argument("--ops-per-function", type=int, default=10)
+    arg_parser.add_argument("--workers",
+                            type=int,
+                            nargs="+",
+                            default=[1, 2, 4, 8])
+    args = arg_parser.parse_args()
+
+    program = generate_program(args.num_functions, args.ops_per_function)
+    module = Parser(new_context(), program).parse_op()
+
+    expected = StringIO()
+    start = time.perf_counter()
+    Printer(stream=expected, local_ssa_names=True).print_op(module)
+    sequential = time.perf_counter() - start
+    print(f"output: {len(expected.getvalue()) / 2**20:.2f} MB, "
+          f"{args.num_functions} functions")
+
+    print(f"{'workers':>10} {'print (s)':>10} {'speedup':>8}")
+    print(f"{'sequential':>10} {sequential:>10.3f} {1:>8.2f}")
+    for num_workers in args.workers:
+        output = StringIO()
+        start = time.perf_counter()
+        print_module_parallel(Printer(stream=output), module, num_workers)
+        elapsed = time.perf_counter() - start
+        assert output.getvalue() == expected.getvalue()
+        print(f"{num_workers:>10} {elapsed:>10.3f} "
+              f"{sequential / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measure the printer throughput on a type-heavy module.
+
+Every operation of the module has nested vector, tuple and function types,
+drawn from a small set of distinct types, so that the same types are
+printed many times. The rendered text of these types is served from the
+attribute cache of the printer, whose size can be set with `--cache-size`.
+"""
+
+import argparse
+import time
+from io import StringIO
+
+from bench_parse_types import generate_program, new_context
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-ops", type=int, default=5000)
+    arg_parser.add_argument("--num-types", type=int, default=4)
+    arg_parser.add_argument("--cache-size", type=int, default=1024)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    program = generate_program(args.num_ops, args.num_types)
+    module = Parser(new_context(), program).parse_op()
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        printer = Printer(stream=StringIO(),
+                          attribute_cache_size=args.cache_size)
+        start = time.perf_counter()
+        printer.print_op(module)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"operations:  {args.num_ops}")
+    print(f"print (s):   {best:.3f}")
+    print(f"ops/s:       {args.num_ops / best:.0f}")
+    print(f"cache hits:   {printer.attribute_cache_hits}")
+    print(f"cache misses: {printer.attribute_cache_misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Measure the printer throughput in operations per second.
+
+The printed module contains functions with block arguments, arithmetic
+operations, and attributes, and is printed to an in-memory stream.
+"""
+
+import argparse
+import time
+from io import StringIO
+
+from bench_parser import generate_function, new_context
+from xdsl.ir import Operation
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=500)
+    arg_parser.add_argument("--ops-per-function", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    lines = ["module() {"]
+    for idx in range(args.num_functions):
+        lines += generate_function(idx, args.ops_per_function)
+    lines.append("}")
+    module = Parser(new_context(), "\n".join(lines)).parse_op()
+    ops = list[Operation]()
+    module.walk(ops.append)
+    num_ops = len(ops)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        output = StringIO()
+        start = time.perf_counter()
+        Printer(stream=output).print_op(module)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"operations:  {num_ops}")
+    print(f"output:      {len(output.getvalue()) / 2**20:.2f} MB")
+    print(f"print (s):   {best:.3f}")
+    print(f"ops/s:       {num_ops / best:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark a PatternRewriteWalker pass over a single large block.
+
+Each arith.constant of the block is replaced by a new constant, so every
+visited operation triggers an erase and an insertion in the block. With
+operations stored in a doubly-linked list, the time per operation should
+stay constant when the block size grows.
+"""
+
+import argparse
+import time
+
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import IntegerAttr, ModuleOp, i32
+from xdsl.pattern_rewriter import (PatternRewriter, PatternRewriteWalker,
+                                   RewritePattern, op_type_rewrite_pattern)
+
+
+class IncrementConstant(RewritePattern):
+
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: Constant, rewriter: PatternRewriter):
+        value = op.value
+        assert isinstance(value, IntegerAttr)
+        rewriter.replace_matched_op(
+            Constant.from_int_constant(value.parameters[0].data + 1, i32))
+
+
+def build_module(num_ops: int) -> ModuleOp:
+    return ModuleOp.from_region_or_ops(
+        [Constant.from_int_constant(i, i32) for i in range(num_ops)])
+
+
+def run(num_ops: int) -> float:
+    module = build_module(num_ops)
+    walker = PatternRewriteWalker(IncrementConstant(), apply_recursively=False)
+    start = time.perf_counter()
+    walker.rewrite_module(module)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--sizes",
+                            type=int,
+                            nargs="+",
+                            default=[12500, 25000, 50000, 100000])
+    args = arg_parser.parse_args()
+
+    print(f"{'ops':>10} {'total (s)':>12} {'us/op':>10}")
+    for num_ops in args.sizes:
+        elapsed = run(num_ops)
+        print(f"{num_ops:>10} {elapsed:>12.3f} "
+              f"{elapsed / num_ops * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
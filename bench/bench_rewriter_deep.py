@@ -0,0 +1,92 @@
+"""
+Measure the cost of PatternRewriter actions in a deep loop nest.
+
+The outermost loop of an affine.for nest is matched, and each constant of
+the innermost loop body is replaced by the rewriter. Every replacement
+checks that the replaced operation is contained in the matched operation,
+so the time per replacement should not grow with the nest depth.
+A walk where no pattern applies also measures the per-operation cost of
+the rewriter itself.
+"""
+
+import argparse
+import time
+
+from xdsl.dialects.affine import For, Yield
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import IndexType, ModuleOp, i32
+from xdsl.ir import Block, Operation, Region
+from xdsl.pattern_rewriter import (AnonymousRewritePattern, PatternRewriter,
+                                   PatternRewriteWalker)
+
+
+def build_nest(depth: int, num_ops: int) -> tuple[ModuleOp, Block]:
+    """
+    Build a loop nest of `depth` loops, whose innermost body contains
+    `num_ops` constants. Returns the module and the innermost block.
+    """
+    innermost = Block.from_arg_types([IndexType()])
+    innermost.add_ops(
+        [Constant.from_int_constant(idx, i32) for idx in range(num_ops)])
+    innermost.add_op(Yield.get())
+    loop = For.from_region([], 0, 16, Region.from_block_list([innermost]))
+    for _ in range(depth - 1):
+        block = Block.from_arg_types([IndexType()])
+        block.add_ops([loop, Yield.get()])
+        loop = For.from_region([], 0, 16, Region.from_block_list([block]))
+    return ModuleOp.from_region_or_ops([loop]), innermost
+
+
+def time_rewrite(depth: int, num_ops: int) -> float:
+    module, innermost = build_nest(depth, num_ops)
+    outermost = module.ops[0]
+    # The new constants are built beforehand, to only measure the rewrites
+    new_csts = [Constant.from_int_constant(0, i32) for _ in range(num_ops)]
+
+    def rewrite_innermost(op: Operation, rewriter: PatternRewriter) -> None:
+        if op is not outermost:
+            return
+        for cst, new_cst in zip(list(innermost.ops)[:-1], new_csts):
+            rewriter.replace_op(cst, new_cst)
+
+    walker = PatternRewriteWalker(AnonymousRewritePattern(rewrite_innermost),
+                                  apply_recursively=False)
+    start = time.perf_counter()
+    walker.rewrite_module(module)
+    return time.perf_counter() - start
+
+
+def time_walk(depth: int, num_ops: int) -> float:
+    module, _ = build_nest(depth, num_ops)
+
+    def no_match(op: Operation, rewriter: PatternRewriter) -> None:
+        pass
+
+    walker = PatternRewriteWalker(AnonymousRewritePattern(no_match))
+    start = time.perf_counter()
+    walker.rewrite_module(module)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--depths",
+                            type=int,
+                            nargs="+",
+                            default=[50, 100, 200, 400])
+    arg_parser.add_argument("--num-ops", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    print(f"{'depth':>6} {'rewrite (s)':>12} {'us/rewrite':>11} "
+          f"{'walk (s)':>9} {'us/op':>7}")
+    for depth in args.depths:
+        rewrite_time = time_rewrite(depth, args.num_ops)
+        walk_time = time_walk(depth, args.num_ops)
+        num_ops = depth * 2 + args.num_ops
+        print(f"{depth:>6} {rewrite_time:>12.3f} "
+              f"{rewrite_time / args.num_ops * 1e6:>11.2f} "
+              f"{walk_time:>9.3f} {walk_time / num_ops * 1e6:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
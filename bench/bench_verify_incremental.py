@@ -0,0 +1,83 @@
+"""
+Compare the time spent verifying the IR between passes, when verifying the
+whole module and when only verifying the modified operations.
+
+The input is a generated module of functions, and the pipeline is made of
+many small passes, each swapping the operands of the arith.addi operations
+of a single function. The output of both runs is checked to be the same.
+"""
+
+import argparse
+from io import StringIO
+
+from bench_parser import generate_function, new_context
+from xdsl.dialects.arith import Addi
+from xdsl.ir import MLContext, Operation
+from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager
+from xdsl.pattern_rewriter import (PatternRewriter, PatternRewriteWalker,
+                                   RewritePattern, op_type_rewrite_pattern)
+from xdsl.printer import Printer
+
+
+class SwapAddiOperands(RewritePattern):
+
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: Addi, rewriter: PatternRewriter):
+        rewriter.replace_matched_op(Addi.get(op.input2, op.input1))
+
+
+def swap_addi_operands_in(func_idx: int):
+    """Return a pass rewriting the function at the given index."""
+
+    def swap_addi_operands(ctx: MLContext, op: Operation) -> None:
+        func = op.regions[0].blocks[0].ops[func_idx]
+        PatternRewriteWalker(SwapAddiOperands(),
+                             apply_recursively=False).rewrite_module(func)
+
+    return swap_addi_operands
+
+
+def run(program: str, num_passes: int, num_functions: int,
+        incremental: bool) -> tuple[float, str]:
+    ctx = new_context()
+    module = Parser(ctx, program).parse_op()
+    module.verify()
+    pass_manager = PassManager(ctx, verify_incremental=incremental)
+    for idx in range(num_passes):
+        pass_manager.add_pass(
+            "swap-addi-operands",
+            swap_addi_operands_in(idx * 7919 % num_functions))
+    pass_manager.enable_timing()
+    pass_manager.run(module)
+    assert pass_manager.verifier_timing is not None
+    output = StringIO()
+    Printer(stream=output).print_op(module)
+    return pass_manager.verifier_timing.wall_time, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--num-functions", type=int, default=500)
+    arg_parser.add_argument("--ops-per-function", type=int, default=20)
+    arg_parser.add_argument("--num-passes", type=int, default=30)
+    args = arg_parser.parse_args()
+
+    lines = ["module() {"]
+    for idx in range(args.num_functions):
+        lines += generate_function(idx, args.ops_per_function)
+    lines.append("}")
+    program = "\n".join(lines)
+    print(f"{args.num_functions} functions, {args.num_passes} passes")
+
+    full, expected = run(program, args.num_passes, args.num_functions, False)
+    incremental, output = run(program, args.num_passes, args.num_functions,
+                              True)
+    assert output == expected, "incremental verification changed the output"
+    print(f"full verification (s):        {full:.3f}")
+    print(f"incremental verification (s): {incremental:.3f}")
+    print(f"speedup:                      {full / incremental:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,719 @@
+"""
+A compact binary format for operations.
+
+The bytecode of an operation starts with the magic bytes `xDSLbc` and the
+format version, followed by these sections:
+- the string table, which holds the operation names, attribute names, SSA
+  value names and string data used by the operation,
+- the attribute pool, which holds each distinct attribute once, after the
+  attributes it contains,
+- the body index, which holds the offsets of the bodies in the body
+  section, and the size of the operation section,
+- the operation itself, with its nested regions,
+- the body section, which holds the regions of the operations that are not
+  stored inline, such as function bodies. Bodies have their own value
+  numbering, so that they can be read independently and on demand.
+
+Integers are encoded as unsigned LEB128 varints. Strings, attributes and
+blocks are referred to by their index, and operands by the distance to the
+last defined value, so that most references fit in a single byte.
+Operands used before their definition, as in the blocks of a control flow
+graph, are instead referred to by a forward reference index, which the
+first use follows with the type of the value. The operation and each body
+end with the indices of the values of their forward references.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import StringIO
+from mmap import ACCESS_READ, mmap
+from typing import IO, Any, overload
+
+from xdsl.ir import (Attribute, Block, BlockArgument, Data, MLContext,
+                     OpResult, Operation, ParametrizedAttribute, Region,
+                     SSAValue)
+from xdsl.serialization import _ForwardRef
+
+MAGIC = b"xDSLbc"
+"""The bytes at the start of the bytecode."""
+
+VERSION = 3
+"""The version of the bytecode format."""
+
+# The encodings of the attributes in the attribute pool
+_PARAMETRIZED = 0
+"""A parametrized attribute, with the indices of its parameters."""
+_INT_DATA = 1
+"""A data attribute holding an integer, encoded in zigzag form."""
+_STRING_DATA = 2
+"""A data attribute holding a string, with the index of the string."""
+_LIST_DATA = 3
+"""A data attribute holding a list of attributes, with their indices."""
+_TEXT_DATA = 4
+"""Any other data attribute, with the index of its printed parameter."""
+
+# The kinds of the frames of the reader, named after the kind of their
+# children
+_REGIONS = 0
+_BLOCKS = 1
+_OPS = 2
+_BODY = 3
+"""The regions of a body, which restores the reader state after them."""
+
+
+def _append_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+@dataclass
+class _Scope:
+    """
+    The encoded operations of the operation or body being written, with
+    their own value numbering.
+    """
+
+    op: Operation
+    """The operation, or the operation of the body."""
+    ops: bytearray = field(default_factory=bytearray)
+    """The encoded operations."""
+    value_indices: dict[int, int] = field(default_factory=dict)
+    """The indices of the defined values, keyed by identity."""
+    forward_refs: dict[int, int] = field(default_factory=dict)
+    """
+    The indices of the values used before their definition, keyed by
+    identity.
+    """
+    forward_values: list[SSAValue] = field(default_factory=list)
+    """The values used before their definition."""
+
+
+@dataclass
+class _Writer:
+
+    body_op_types: tuple[type[Operation], ...]
+    """The operations whose regions are stored in the body section."""
+    scope: _Scope
+    """The operation or body being written."""
+    strings: list[str] = field(default_factory=list)
+    string_indices: dict[str, int] = field(default_factory=dict)
+    attributes: bytearray = field(default_factory=bytearray)
+    """The encoded attribute pool."""
+    attr_indices: dict[Any, int] = field(default_factory=dict)
+    """The attribute indices, keyed by attribute or by identity if unhashable."""
+    bodies: list[bytes] = field(default_factory=list)
+    """The encoded bodies."""
+    block_indices: dict[int, int] = field(default_factory=dict)
+    """The indices of the blocks in their region, keyed by identity."""
+
+    def string(self, string: str) -> int:
+        if (index := self.string_indices.get(string)) is None:
+            index = self.string_indices[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def name(self, name: str | None) -> int:
+        return 0 if name is None else self.string(name) + 1
+
+    def attr(self, attr: Attribute) -> int:
+        key: Any = attr
+        try:
+            index = self.attr_indices.get(key)
+        except TypeError:
+            key = id(attr)
+            index = self.attr_indices.get(key)
+        if index is not None:
+            return index
+
+        # Nested attributes are encoded first
+        out = bytearray()
+        _append_varint(out, self.string(attr.name))
+        if isinstance(attr, ParametrizedAttribute):
+            params = [self.attr(param) for param in attr.parameters]
+            out.append(_PARAMETRIZED)
+            _append_varint(out, len(params))
+            for param in params:
+                _append_varint(out, param)
+        elif isinstance(attr, Data):
+            data = attr.data
+            if type(data) is int:
+                out.append(_INT_DATA)
+                _append_varint(out, data << 1 if data >= 0 else
+                               (-data << 1) - 1)
+            elif type(data) is str:
+                out.append(_STRING_DATA)
+                _append_varint(out, self.string(data))
+            elif isinstance(data, list) and all(
+                    isinstance(elem, Attribute) for elem in data):
+                elems = [self.attr(elem) for elem in data]
+                out.append(_LIST_DATA)
+                _append_varint(out, len(elems))
+                for elem in elems:
+                    _append_varint(out, elem)
+            else:
+                from xdsl.printer import Printer
+                text = StringIO()
+                attr.print_parameter(data, Printer(stream=text))
+                out.append(_TEXT_DATA)
+                _append_varint(out, self.string(text.getvalue()))
+        else:
+            raise ValueError(f"Cannot encode attribute {attr} in bytecode")
+
+        self.attributes += out
+        index = self.attr_indices[key] = len(self.attr_indices)
+        return index
+
+    def define_values(self, values: Sequence[SSAValue]) -> None:
+        value_indices = self.scope.value_indices
+        for value in values:
+            value_indices[id(value)] = len(value_indices)
+
+    def operand(self, operand: SSAValue, last_value: int) -> None:
+        out = self.scope.ops
+        if (index := self.scope.value_indices.get(id(operand))) is not None:
+            _append_varint(out, (last_value - index) << 1)
+            return
+        # The first use of a value before its definition holds its type
+        forward_refs = self.scope.forward_refs
+        if (ref := forward_refs.get(id(operand))) is not None:
+            _append_varint(out, ref << 1 | 1)
+        else:
+            owner: Operation | Block | None = None
+            if isinstance(operand, OpResult):
+                owner = operand.op
+            elif isinstance(operand, BlockArgument):
+                owner = operand.block
+            if owner is None or not self.scope.op.is_ancestor(owner):
+                raise ValueError(
+                    f"Operand {operand} is not defined in the encoded "
+                    "operation")
+            ref = forward_refs[id(operand)] = len(forward_refs)
+            self.scope.forward_values.append(operand)
+            _append_varint(out, ref << 1 | 1)
+            _append_varint(out, self.attr(operand.typ))
+
+    def op(self, op: Operation) -> None:
+        """Encode an operation without its regions."""
+        out = self.scope.ops
+        _append_varint(out, self.string(op.name))
+
+        _append_varint(out, len(op.operands))
+        last_value = len(self.scope.value_indices) - 1
+        for operand in op.operands:
+            self.operand(operand, last_value)
+
+        _append_varint(out, len(op.successors))
+        for successor in op.successors:
+            if (index := self.block_indices.get(id(successor))) is None:
+                raise ValueError(
+                    f"Successor {successor} is not in the encoded region")
+            _append_varint(out, index)
+
+        # Attributes are encoded before the operation refers to them
+        attributes = [(self.string(name), self.attr(attr))
+                      for name, attr in op.attributes.items()]
+        _append_varint(out, len(attributes))
+        for name, attr in attributes:
+            _append_varint(out, name)
+            _append_varint(out, attr)
+
+        results = [(self.attr(result.typ), self.name(result.name))
+                   for result in op.results]
+        _append_varint(out, len(results))
+        for typ, name in results:
+            _append_varint(out, typ)
+            _append_varint(out, name)
+
+    def region(self, region: Region) -> None:
+        """Encode the signatures of the blocks of a region."""
+        out = self.scope.ops
+        blocks = region.blocks
+        _append_varint(out, len(blocks))
+        # The signatures of all blocks come first, so that successors can
+        # refer to any block of the region
+        for index, block in enumerate(blocks):
+            self.block_indices[id(block)] = index
+            args = [(self.attr(arg.typ), self.name(arg.name))
+                    for arg in block.args]
+            _append_varint(out, len(args))
+            for typ, name in args:
+                _append_varint(out, typ)
+                _append_varint(out, name)
+
+    def forward_ref_table(self, scope: _Scope) -> SSAValue | None:
+        """
+        Encode the indices of the values used before their definition at
+        the end of a scope. Return the first of these values which is not
+        defined in the scope instead, if any.
+        """
+        value_indices = scope.value_indices
+        indices = list[int]()
+        for value in scope.forward_values:
+            if (index := value_indices.get(id(value))) is None:
+                return value
+            indices.append(index)
+        for index in indices:
+            _append_varint(scope.ops, index)
+        return None
+
+    def inline_body(self, stack: list[Any], body: tuple[Operation, _Scope,
+                                                        int]) -> None:
+        """
+        Encode the regions of a body inline instead, as they use values
+        defined outside of them.
+        """
+        body_op, scope, num_bodies = body
+        self.scope = scope
+        del self.bodies[num_bodies:]
+        _append_varint(scope.ops, len(body_op.regions) << 1)
+        stack.extend(reversed(body_op.regions))
+
+    def encode(self) -> None:
+        """
+        Encode the operation of the scope and its regions. The nested
+        operations are encoded with an explicit stack, so that deeply nested
+        IR can be encoded.
+        """
+        # The stack also holds the results of operations, which are defined
+        # once the regions of their operation are encoded, and the bodies
+        # being encoded, with the scope and body count to restore after them
+        stack: list[Any] = [self.scope.op]
+        while stack:
+            item = stack.pop()
+            try:
+                if isinstance(item, Operation):
+                    self.op(item)
+                    regions = item.regions
+                    if not regions:
+                        _append_varint(self.scope.ops, 0)
+                        self.define_values(item.results)
+                        continue
+                    stack.append(item.results)
+                    if isinstance(item, self.body_op_types):
+                        # Bodies have their own value numbering
+                        stack.append((item, self.scope, len(self.bodies)))
+                        self.scope = _Scope(item)
+                    else:
+                        _append_varint(self.scope.ops, len(regions) << 1)
+                    stack.extend(reversed(regions))
+                elif isinstance(item, Region):
+                    self.region(item)
+                    stack.extend(reversed(item.blocks))
+                elif isinstance(item, Block):
+                    self.define_values(item.args)
+                    _append_varint(self.scope.ops, len(item.ops))
+                    stack.extend(reversed(item.ops))
+                elif isinstance(item, list):
+                    self.define_values(item)
+                elif self.forward_ref_table(self.scope) is not None:
+                    self.inline_body(stack, item)
+                else:
+                    # The lowest bit of the region count is set for bodies
+                    body_op, scope, _ = item
+                    self.bodies.append(bytes(self.scope.ops))
+                    self.scope = scope
+                    _append_varint(scope.ops, len(body_op.regions) << 1 | 1)
+                    _append_varint(scope.ops, len(self.bodies) - 1)
+            except ValueError:
+                # Give up on the innermost body being encoded, if any
+                while stack and not isinstance(stack[-1], tuple):
+                    stack.pop()
+                if not stack:
+                    raise
+                self.inline_body(stack, stack.pop())
+        if (value := self.forward_ref_table(self.scope)) is not None:
+            raise ValueError(
+                f"Operand {value} is not defined in the encoded operation")
+
+    def output(self) -> bytes:
+        out = bytearray(MAGIC)
+        _append_varint(out, VERSION)
+        _append_varint(out, len(self.strings))
+        for string in self.strings:
+            data = string.encode()
+            _append_varint(out, len(data))
+            out += data
+        _append_varint(out, len(self.attr_indices))
+        out += self.attributes
+        _append_varint(out, len(self.bodies))
+        offset = 0
+        for body in self.bodies:
+            _append_varint(out, offset)
+            offset += len(body)
+        _append_varint(out, len(self.scope.ops))
+        out += self.scope.ops
+        for body in self.bodies:
+            out += body
+        return bytes(out)
+
+
+class _LazyRegions(Sequence[Region]):
+    """
+    The regions of an operation read from the body section, which are read
+    on their first access. The regions then replace this sequence in the
+    operation.
+    """
+
+    def __init__(self, op: Operation, reader: _Reader, body: int,
+                 num_regions: int):
+        self._op = op
+        self._reader: _Reader | None = reader
+        self._body = body
+        self._num_regions = num_regions
+        self._regions: list[Region] = []
+
+    def _load(self) -> list[Region]:
+        if (reader := self._reader) is not None:
+            regions = reader.body(self._body, self._num_regions)
+            self._reader = None
+            for region in regions:
+                region.parent = self._op
+                self._regions.append(region)
+            if self._op.regions is self:
+                self._op.regions = self._regions
+        return self._regions
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._reader is None
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __bool__(self) -> bool:
+        # Checking for regions, as when attaching the operation, does not
+        # read them
+        return self._num_regions > 0 if self._reader is not None else bool(
+            self._regions)
+
+    @overload
+    def __getitem__(self, index: int) -> Region:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Region]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Region | list[Region]:
+        return self._load()[index]
+
+    def __iter__(self) -> Iterator[Region]:
+        return iter(self._load())
+
+    def append(self, region: Region) -> None:
+        self._load().append(region)
+
+
+class _Reader:
+
+    def __init__(self, ctx: MLContext, data: bytes | mmap, lazy: bool):
+        self.ctx = ctx
+        self.data = data
+        self.lazy = lazy
+        """Whether bodies are read on their first access."""
+        self.pos = 0
+        self.strings: list[str] = []
+        self.attributes: list[Attribute] = []
+        self.bodies: list[int] = []
+        """The positions of the bodies in the data."""
+        self.values: list[SSAValue] = []
+        self.forward_values: list[SSAValue] = []
+        """The placeholders of the values used before their definition."""
+
+    def read(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            self.pos = pos
+            return byte
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def name(self) -> str | None:
+        index = self.read()
+        return None if index == 0 else self.strings[index - 1]
+
+    def header(self) -> None:
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Input is not in the xDSL bytecode format")
+        self.pos = len(MAGIC)
+        if (version := self.read()) != VERSION:
+            raise ValueError(f"Unsupported bytecode version {version}, "
+                             f"expected version {VERSION}")
+
+    def string_table(self) -> None:
+        data = self.data
+        for _ in range(self.read()):
+            size = self.read()
+            self.strings.append(str(data[self.pos:self.pos + size], "utf-8"))
+            self.pos += size
+
+    def attribute_pool(self) -> None:
+        strings = self.strings
+        attributes = self.attributes
+        for _ in range(self.read()):
+            attr_def = self.ctx.get_attr(strings[self.read()])
+            kind = self.read()
+            attr: Attribute
+            if kind == _PARAMETRIZED:
+                attr = attr_def(
+                    [attributes[self.read()] for _ in range(self.read())])
+            elif kind == _INT_DATA:
+                value = self.read()
+                attr = attr_def(value >> 1 if value
+                                & 1 == 0 else -((value + 1) >> 1))
+            elif kind == _STRING_DATA:
+                attr = attr_def(strings[self.read()])
+            elif kind == _LIST_DATA:
+                attr = attr_def(
+                    [attributes[self.read()] for _ in range(self.read())])
+            elif kind == _TEXT_DATA:
+                from xdsl.parser import Parser
+                assert issubclass(attr_def, Data)
+                parser = Parser(self.ctx, strings[self.read()])
+                attr = attr_def(attr_def.parse_parameter(parser))
+            else:
+                raise ValueError(f"Unknown attribute encoding {kind}")
+            attributes.append(attr)
+
+    def body_index(self) -> None:
+        offsets = [self.read() for _ in range(self.read())]
+        bodies_start = self.read()
+        bodies_start += self.pos
+        self.bodies = [bodies_start + offset for offset in offsets]
+
+    def body(self, index: int, num_regions: int) -> list[Region]:
+        """Read the regions of a body, with their own value numbering."""
+        if isinstance(self.data, mmap) and self.data.closed:
+            raise ValueError(
+                "Cannot read the regions of an unmapped bytecode file")
+        reader = _Reader(self.ctx, self.data, self.lazy)
+        reader.strings = self.strings
+        reader.attributes = self.attributes
+        reader.bodies = self.bodies
+        reader.pos = self.bodies[index]
+        regions = list[Region]()
+        reader.decode(_REGIONS, num_regions, regions.append)
+        reader.forward_ref_table()
+        return regions
+
+    def forward_ref(self, ref: int) -> SSAValue:
+        # The first use of a value before its definition holds its type
+        if ref == len(self.forward_values):
+            self.forward_values.append(
+                _ForwardRef(self.attributes[self.read()]))
+        return self.forward_values[ref]
+
+    def forward_ref_table(self) -> None:
+        """
+        Replace the placeholders of the values used before their definition
+        by the values, at the end of a scope.
+        """
+        values = self.values
+        for placeholder in self.forward_values:
+            placeholder.replace_by(values[self.read()])
+
+    def op(self, blocks: list[Block]) -> tuple[Operation, int]:
+        """
+        Read an operation without its regions, with the blocks of its region,
+        and return it with its region count.
+        """
+        strings = self.strings
+        attributes = self.attributes
+        read = self.read
+        op_type = self.ctx.get_op(strings[read()])
+
+        values = self.values
+        last_value = len(values) - 1
+        operands = [
+            values[last_value - (index >> 1)]
+            if not (index := read()) & 1 else self.forward_ref(index >> 1)
+            for _ in range(read())
+        ]
+        successors = [blocks[read()] for _ in range(read())]
+        op_attributes = {
+            strings[read()]: attributes[read()]
+            for _ in range(read())
+        }
+        result_types = list[Attribute]()
+        result_names = list[str | None]()
+        for _ in range(read()):
+            result_types.append(attributes[read()])
+            result_names.append(self.name())
+
+        op = op_type.create(operands=operands,
+                            result_types=result_types,
+                            attributes=op_attributes,
+                            successors=successors)
+        for result, name in zip(op.results, result_names):
+            result.name = name
+        return op, read()
+
+    def region(self) -> tuple[Region, list[Block]]:
+        """Read a region with the signatures of its blocks."""
+        attributes = self.attributes
+        blocks = list[Block]()
+        for _ in range(self.read()):
+            arg_types = list[Attribute]()
+            names = list[str | None]()
+            for _ in range(self.read()):
+                arg_types.append(attributes[self.read()])
+                names.append(self.name())
+            block = Block.from_arg_types(arg_types)
+            for arg, name in zip(block.args, names):
+                arg.name = name
+            blocks.append(block)
+        return Region(), blocks
+
+    def decode(self, kind: int, count: int, add: Callable[[Any],
+                                                          None]) -> None:
+        """
+        Read `count` operations or regions, depending on `kind`, and their
+        contents, and pass them to `add`. The nested operations are read with
+        an explicit stack, so that deeply nested IR can be read.
+        """
+        # Each frame holds the kind and count of the children to read, the
+        # function adding them to their parent, the parent, the function
+        # adding the parent to its own parent, and either the blocks of the
+        # region or the reader state to restore after a body. Parents are
+        # only added once they are complete, so that they are attached
+        # bottom-up.
+        stack: list[list[Any]] = [[kind, count, add, None, None, []]]
+        read = self.read
+        while stack:
+            frame = stack[-1]
+            kind, count, add, parent, add_parent, extra = frame
+            if count == 0:
+                stack.pop()
+                if kind == _BODY:
+                    self.forward_ref_table()
+                    self.pos, self.values, self.forward_values = extra
+                if isinstance(parent, Operation):
+                    # The results are only visible after the regions
+                    self.values.extend(parent.results)
+                if add_parent is not None:
+                    add_parent(parent)
+                continue
+            frame[1] = count - 1
+
+            if kind == _OPS:
+                op, num_regions = self.op(extra)
+                if num_regions & 1 and self.lazy:
+                    op.regions = _LazyRegions(op, self, read(),
+                                              num_regions >> 1)
+                elif num_regions & 1:
+                    # Bodies are read with their own value numbering
+                    body = read()
+                    stack.append([
+                        _BODY, num_regions >> 1, op.add_region, op, add,
+                        (self.pos, self.values, self.forward_values)
+                    ])
+                    self.pos = self.bodies[body]
+                    self.values, self.forward_values = [], []
+                    continue
+                elif num_regions:
+                    stack.append([
+                        _REGIONS, num_regions >> 1, op.add_region, op, add, []
+                    ])
+                    continue
+                self.values.extend(op.results)
+                add(op)
+            elif kind == _BLOCKS:
+                block = extra[len(extra) - count]
+                self.values.extend(block.args)
+                stack.append([_OPS, read(), block.add_op, block, add, extra])
+            else:
+                region, blocks = self.region()
+                stack.append([
+                    _BLOCKS,
+                    len(blocks), region.add_block, region, add, blocks
+                ])
+
+
+def to_bytecode(
+    op: Operation, body_op_types: tuple[type[Operation], ...] = ()) -> bytes:
+    """
+    Encode an operation in the bytecode format.
+    The operands of nested operations should be defined in the operation.
+    The regions of `body_op_types` operations, such as functions, are
+    stored in the body section, unless they use values defined outside of
+    them, so that they can be read lazily.
+    """
+    writer = _Writer(body_op_types, _Scope(op))
+    writer.encode()
+    return writer.output()
+
+
+def from_bytecode(ctx: MLContext,
+                  data: bytes | mmap,
+                  lazy: bool = False) -> Operation:
+    """
+    Decode an operation encoded with `to_bytecode`.
+    If `lazy` is set, the regions stored in the body section are decoded on
+    their first access, and `data` should not be modified until then.
+    """
+    reader = _Reader(ctx, data, lazy)
+    reader.header()
+    reader.string_table()
+    reader.attribute_pool()
+    reader.body_index()
+    ops = list[Operation]()
+    reader.decode(_OPS, 1, ops.append)
+    reader.forward_ref_table()
+    return ops[0]
+
+
+def write_bytecode(
+    op: Operation,
+    stream: IO[bytes],
+    body_op_types: tuple[type[Operation], ...] = ()) -> None:
+    """
+    Write an operation in the bytecode format to a binary stream, with the
+    regions of `body_op_types` operations stored in the body section.
+    """
+    stream.write(to_bytecode(op, body_op_types))
+
+
+def read_bytecode(ctx: MLContext,
+                  stream: IO[bytes],
+                  lazy: bool = False) -> Operation:
+    """
+    Read an operation in the bytecode format from a binary stream.
+    If `lazy` is set, the regions stored in the body section are only
+    decoded on their first access. Use `map_bytecode` to also read them
+    from the file on demand.
+    """
+    return from_bytecode(ctx, stream.read(), lazy)
+
+
+@contextmanager
+def map_bytecode(ctx: MLContext, stream: IO[bytes]) -> Iterator[Operation]:
+    """
+    Memory-map a file in the bytecode format, and read the operation in it,
+    with the regions stored in the body section read on their first access.
+    The file is unmapped on exit, after which the regions that were not
+    accessed can no longer be read.
+    """
+    try:
+        data = mmap(stream.fileno(), 0, access=ACCESS_READ)
+    except (OSError, ValueError):
+        # Streams without a file, such as pipes, are read entirely
+        yield from_bytecode(ctx, stream.read(), lazy=True)
+        return
+    with data:
+        yield from_bytecode(ctx, data, lazy=True)
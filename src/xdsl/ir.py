@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import (TYPE_CHECKING, Any, Callable, Generic, Protocol, Sequence,
-                    TypeVar, cast)
+from weakref import WeakValueDictionary
+from typing import (TYPE_CHECKING, Any, Callable, ClassVar, Generic, Iterator,
+                    Protocol, Sequence, TypeVar, cast, overload)
 from frozenlist import FrozenList
 
 # Used for cyclic dependencies in type hints
@@ -14,12 +15,53 @@ if TYPE_CHECKING:
 
 OpT = TypeVar('OpT', bound='Operation')
 
+_EMPTY_SEQUENCE: Any = ()
+"""
+The results, successors or regions of the operations whose corresponding
+list is not allocated yet.
+"""
+
+_SlotsT = TypeVar('_SlotsT')
+
+
+def _shallow_copy(obj: _SlotsT) -> _SlotsT:
+    """Copy the slots of an object into a new object of the same class."""
+    copied = object.__new__(type(obj))
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if hasattr(obj, name):
+                object.__setattr__(copied, name, getattr(obj, name))
+    return copied
+
+
+_OP_ORDER_STRIDE = 32
+"""The gap left between consecutive operation order indices of a block."""
+
 
 @dataclass
 class MLContext:
     """Contains structures for operations/attributes registration."""
     _registeredOps: dict[str, type[Operation]] = field(default_factory=dict)
     _registeredAttrs: dict[str, type[Attribute]] = field(default_factory=dict)
+    _interned_attrs: WeakValueDictionary[tuple[Any, ...], Attribute] = field(
+        default_factory=WeakValueDictionary)
+    """
+    The unique attributes of the context, indexed by their structure. They
+    are only kept while they are used, so that the table does not grow for
+    the lifetime of the context.
+    """
+    _interned_attr_ids: WeakValueDictionary[int, Attribute] = field(
+        default_factory=WeakValueDictionary)
+    """The unique attributes of the context, indexed by their identity."""
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        # The interned attributes are not pickled, as they are weakly held
+        return self._registeredOps, self._registeredAttrs
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        self._registeredOps, self._registeredAttrs = state
+        self._interned_attrs = WeakValueDictionary()
+        self._interned_attr_ids = WeakValueDictionary()
 
     def register_op(self, op: type[Operation]) -> None:
         """Register an operation definition. Operation names should be unique."""
@@ -46,10 +88,62 @@ class MLContext:
             raise Exception(f"Attribute {name} is not registered")
         return self._registeredAttrs[name]
 
+    def intern_attr(self, attr: A) -> A:
+        """
+        Get the unique attribute of the context that is structurally equal
+        to the given one. The first interned attribute of a given structure
+        becomes the unique one, so interned attributes that are equal are
+        the same object. Nested attributes are interned as well.
+        Attributes with unhashable data are returned unchanged.
+        Only the attributes created by the parser, or deserialized with a
+        context, are interned. Attributes created by their builders, such
+        as `IntegerType.from_width`, are not, as they have no context, so
+        equal attributes should be compared with `==` rather than `is`.
+        """
+        if self._interned_attr_ids.get(id(attr)) is attr:
+            return attr
+
+        # Nested attributes are interned first, so the structure of the
+        # attribute can be identified by the identity of its children.
+        key: tuple[Any, ...]
+        if isinstance(attr, ParametrizedAttribute):
+            params = [self.intern_attr(param) for param in attr.parameters]
+            if any(new is not old
+                   for new, old in zip(params, attr.parameters)):
+                attr = type(attr)(params)
+            key = (type(attr), *map(id, params))
+        elif isinstance(attr, Data):
+            data = attr.data
+            if isinstance(data, list) and all(
+                    isinstance(elem, Attribute) for elem in data):
+                elems = [self.intern_attr(elem) for elem in data]
+                if any(new is not old for new, old in zip(elems, data)):
+                    attr = type(attr)(elems)
+                key = (type(attr), list, *map(id, elems))
+            elif isinstance(data, list):
+                key = (type(attr), list, *data)
+            else:
+                key = (type(attr), data)
+            try:
+                hash(key)
+            except TypeError:
+                return attr
+        else:
+            return attr
+
+        unique_attr = self._interned_attrs.setdefault(key, attr)
+        if unique_attr is attr:
+            self._interned_attr_ids[id(attr)] = attr
+        return cast(A, unique_attr)
 
-@dataclass(frozen=True)
+
+@dataclass(eq=False, slots=True)
 class Use:
-    """The use of a SSA value."""
+    """
+    The use of a SSA value, as an operand slot of an operation.
+    Each operand of an operation owns a single slot, which is linked in the
+    use list of the SSA value it currently refers to.
+    """
 
     operation: Operation
     """The operation using the value."""
@@ -57,20 +151,99 @@ class Use:
     index: int
     """The index of the operand using the value in the operation."""
 
+    _value: SSAValue | None = field(default=None, init=False, repr=False)
+    """The value currently used by the operand slot."""
 
-@dataclass
+    _prev_use: Use | None = field(default=None, init=False, repr=False)
+    """The previous use in the value use list."""
+
+    _next_use: Use | None = field(default=None, init=False, repr=False)
+    """The next use in the value use list."""
+
+    @property
+    def value(self) -> SSAValue:
+        """The value used by the operand slot."""
+        assert self._value is not None, "operand slot is not initialized"
+        return self._value
+
+    def __repr__(self) -> str:
+        return f"Use(op_name={repr(self.operation.name)}, index={repr(self.index)})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Use) and self.operation is other.operation \
+            and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.operation), self.index))
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class SSAValueUses:
+    """
+    An iterable view over the uses of an SSA value.
+    Uses are iterated in a deterministic order, from the most recent one.
+    """
+
+    value: SSAValue
+    """The value whose uses are viewed."""
+
+    def __iter__(self) -> Iterator[Use]:
+        use = self.value._first_use
+        while use is not None:
+            # Read the next use first, so the current one can be modified
+            next_use = use._next_use
+            yield use
+            use = next_use
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return self.value._first_use is not None
+
+    def __contains__(self, use: object) -> bool:
+        return isinstance(use, Use) and any(use == other for other in self)
+
+    def __repr__(self) -> str:
+        return f"SSAValueUses({list(self)})"
+
+
+@dataclass(slots=True)
 class SSAValue(ABC):
     """A reference to an SSA variable.
     An SSA variable is either an operation result, or a basic block argument."""
 
-    typ: Attribute
-    """Each SSA variable is associated to a type."""
+    _typ: Attribute
+    """The type of the variable."""
 
-    uses: set[Use] = field(init=False, default_factory=set, repr=False)
-    """All uses of the value."""
+    _first_use: Use | None = field(init=False, default=None, repr=False)
+    """The head of the linked list of uses of the value."""
 
     name: str | None = field(init=False, default=None)
 
+    @property
+    def typ(self) -> Attribute:
+        """Each SSA variable is associated to a type."""
+        return self._typ
+
+    @typ.setter
+    def typ(self, typ: Attribute) -> None:
+        self._typ = typ
+        # The operation defining the value and its users are modified
+        self._mark_owner_dirty()
+        use = self._first_use
+        while use is not None:
+            use.operation._dirty = True
+            use = use._next_use
+
+    def _mark_owner_dirty(self) -> None:
+        """Mark the operation defining the value as modified."""
+
+    @property
+    def uses(self) -> SSAValueUses:
+        """All uses of the value."""
+        return SSAValueUses(self)
+
     @staticmethod
     def get(arg: SSAValue | Operation) -> SSAValue:
         """Get a new SSAValue from either a SSAValue, or an operation with a single result."""
@@ -85,19 +258,36 @@ class SSAValue(ABC):
             f"Expected SSAValue or Operation for SSAValue.get, but got {arg}")
 
     def add_use(self, use: Use):
-        """Add a new use of the value."""
-        self.uses.add(use)
+        """Add a new use of the value, by linking an operand slot to it."""
+        use._value = self
+        use._prev_use = None
+        use._next_use = self._first_use
+        if self._first_use is not None:
+            self._first_use._prev_use = use
+        self._first_use = use
 
     def remove_use(self, use: Use):
-        """Remove a use of the value."""
-        assert use in self.uses, "use to be removed was not in use list"
-        self.uses.remove(use)
+        """
+        Remove a use of the value, by unlinking an operand slot from it.
+        The operand slot still refers to the value afterwards.
+        """
+        assert use._value is self and (
+            use._prev_use is not None
+            or self._first_use is use), "use to be removed was not in use list"
+        if use._prev_use is None:
+            self._first_use = use._next_use
+        else:
+            use._prev_use._next_use = use._next_use
+        if use._next_use is not None:
+            use._next_use._prev_use = use._prev_use
+        use._prev_use = None
+        use._next_use = None
 
     def replace_by(self, value: SSAValue) -> None:
         """Replace the value by another value in all its uses."""
-        for use in self.uses.copy():
+        for use in self.uses:
             use.operation.replace_operand(use.index, value)
-        assert len(self.uses) == 0, "unexpected error in xdsl"
+        assert self._first_use is None, "unexpected error in xdsl"
 
     def erase(self, safe_erase: bool = True) -> None:
         """
@@ -105,14 +295,14 @@ class SSAValue(ABC):
         If safe_erase is True, then check that no operations use the value anymore.
         If safe_erase is False, then replace its uses by an ErasedSSAValue.
         """
-        if safe_erase and len(self.uses) != 0:
+        if safe_erase and self.uses:
             raise Exception(
                 "Attempting to delete SSA value that still has uses of operation:\n"
                 f"{self.op}")
         self.replace_by(ErasedSSAValue(self.typ, self))
 
 
-@dataclass
+@dataclass(slots=True)
 class OpResult(SSAValue):
     """A reference to an SSA variable defined by an operation result."""
 
@@ -122,6 +312,13 @@ class OpResult(SSAValue):
     result_index: int
     """The index of the result in the defining operation."""
 
+    def _mark_owner_dirty(self) -> None:
+        self.op._dirty = True
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The result is pickled with its operation, rather than with its uses
+        return _get_op_result, (self.op, self.result_index)
+
     def __repr__(self) -> str:
         return f"OpResult(typ={repr(self.typ)}, num_uses={repr(len(self.uses))}" + \
             f", op_name={repr(self.op.name)}, result_index={repr(self.result_index)}, name={repr(self.name)})"
@@ -134,7 +331,7 @@ class OpResult(SSAValue):
         return id(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BlockArgument(SSAValue):
     """A reference to an SSA variable defined by a basic block argument."""
 
@@ -144,6 +341,13 @@ class BlockArgument(SSAValue):
     index: int
     """The index of the variable in the block arguments."""
 
+    def _mark_owner_dirty(self) -> None:
+        self.block._mark_parent_op_dirty()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The argument is pickled with its block, rather than with its uses
+        return _get_block_arg, (self.block, self.index)
+
     def __repr__(self) -> str:
         if isinstance(self.block, Block):
             block_repr = f"Block(num_arguments={len(self.block.args)}, num_blocks={len(self.block.ops)} ops)"
@@ -160,7 +364,17 @@ class BlockArgument(SSAValue):
         return id(self)
 
 
-@dataclass
+def _get_op_result(op: Operation, index: int) -> OpResult:
+    """Get an operation result. This is used to unpickle results."""
+    return op.results[index]
+
+
+def _get_block_arg(block: Block, index: int) -> BlockArgument:
+    """Get a block argument. This is used to unpickle arguments."""
+    return block.args[index]
+
+
+@dataclass(slots=True)
 class ErasedSSAValue(SSAValue):
     """
     An erased SSA variable.
@@ -235,57 +449,218 @@ class ParametrizedAttribute(Attribute):
         ...
 
 
-@dataclass
+class OpAttributes(dict[str, Attribute]):
+    """
+    The attribute dictionary of an operation, which marks the operation as
+    modified when it is changed in place.
+    """
+
+    __slots__ = ("_op", )
+
+    _op: Operation
+    """The operation owning the attributes."""
+
+    def __init__(self, op: Operation, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._op = op
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return OpAttributes, (self._op, dict(self))
+
+    def __setitem__(self, name: str, attr: Attribute) -> None:
+        self._op._dirty = True
+        super().__setitem__(name, attr)
+
+    def __delitem__(self, name: str) -> None:
+        self._op._dirty = True
+        super().__delitem__(name)
+
+    def __ior__(self, other: Any) -> OpAttributes:
+        self._op._dirty = True
+        return super().__ior__(other)
+
+    def clear(self) -> None:
+        self._op._dirty = True
+        super().clear()
+
+    def pop(self, *args: Any) -> Any:
+        self._op._dirty = True
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[str, Attribute]:
+        self._op._dirty = True
+        return super().popitem()
+
+    def setdefault(self, name: str, default: Attribute) -> Attribute:
+        self._op._dirty = True
+        return super().setdefault(name, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._op._dirty = True
+        super().update(*args, **kwargs)
+
+
+@dataclass(slots=True)
 class Operation:
     """A generic operation. Operation definitions inherit this class."""
 
-    name: str = field(default="", init=False)
+    name: ClassVar[str] = ""
     """The operation name. Should be a static member of the class"""
 
-    _operands: FrozenList[SSAValue] = field(default_factory=FrozenList)
-    """The operation operands."""
+    _operand_uses: list[Use] = field(default_factory=list)
+    """The operation operand slots, each referring to an operand."""
 
-    results: list[OpResult] = field(default_factory=list)
-    """The results created by the operation."""
+    _results: list[OpResult] = field(default=_EMPTY_SEQUENCE,
+                                     init=False,
+                                     repr=False)
+    """The results, or `_EMPTY_SEQUENCE` until they are first accessed."""
 
-    successors: list[Block] = field(default_factory=list)
-    """
-    The basic blocks that the operation may give control to.
-    This list should be empty for non-terminator operations.
-    """
+    _successors: list[Block] = field(default=_EMPTY_SEQUENCE,
+                                     init=False,
+                                     repr=False)
+    """The successors, or `_EMPTY_SEQUENCE` until they are first accessed."""
 
-    attributes: dict[str, Attribute] = field(default_factory=dict)
-    """The attributes attached to the operation."""
+    _attributes: OpAttributes | None = field(default=None,
+                                             init=False,
+                                             repr=False)
+    """The attributes, or `None` until they are first accessed."""
 
-    regions: list[Region] = field(default_factory=list)
-    """Regions arguments of the operation."""
+    _regions: list[Region] = field(default=_EMPTY_SEQUENCE,
+                                   init=False,
+                                   repr=False)
+    """The regions, or `_EMPTY_SEQUENCE` until they are first accessed."""
 
     parent: Block | None = field(default=None, repr=False)
     """The block containing this operation."""
 
+    _prev_op: Operation | None = field(default=None, init=False, repr=False)
+    """The previous operation in the parent block."""
+
+    _next_op: Operation | None = field(default=None, init=False, repr=False)
+    """The next operation in the parent block."""
+
+    _order_index: int = field(default=0, init=False, repr=False)
+    """
+    The position of the operation in its block, relative to the other operations.
+    Only meaningful when the parent block operation order is valid.
+    """
+
+    _dirty: bool = field(default=True, init=False, repr=False)
+    """Was the operation modified since it was last verified."""
+
+    @property
+    def prev_op(self) -> Operation | None:
+        """The operation preceding this one in its block, if any."""
+        return self._prev_op
+
+    @property
+    def next_op(self) -> Operation | None:
+        """The operation following this one in its block, if any."""
+        return self._next_op
+
     def parent_block(self) -> Block | None:
         return self.parent
 
     def parent_op(self) -> Operation | None:
         return self.parent.parent.parent if self.parent and self.parent.parent else None
 
+    def is_before_in_block(self, other: Operation) -> bool:
+        """
+        Returns true if the operation is placed before another operation
+        of the same block.
+        The block operation order is computed lazily, so this is O(1) unless
+        the block was modified in a way that required a renumbering.
+        """
+        if self.parent is None or self.parent is not other.parent:
+            raise ValueError("Expected operations to be in the same block in "
+                             "is_before_in_block.")
+        if not self.parent._op_order_valid:
+            self.parent._recompute_op_order()
+        return self._order_index < other._order_index
+
     def parent_region(self) -> Region | None:
         return self.parent.parent if self.parent else None
 
     @property
-    def operands(self) -> FrozenList[SSAValue]:
-        return self._operands
+    def results(self) -> list[OpResult]:
+        """
+        The results created by the operation.
+        The list is allocated on its first access, so that operations
+        without results that are never queried do not hold an empty list.
+        """
+        if self._results is _EMPTY_SEQUENCE:
+            self._results = []
+        return self._results
+
+    @results.setter
+    def results(self, results: list[OpResult]) -> None:
+        self._results = results
+        self._dirty = True
+
+    @property
+    def successors(self) -> list[Block]:
+        """
+        The basic blocks that the operation may give control to.
+        This list should be empty for non-terminator operations, and is
+        allocated on its first access.
+        """
+        if self._successors is _EMPTY_SEQUENCE:
+            self._successors = []
+        return self._successors
+
+    @successors.setter
+    def successors(self, successors: list[Block]) -> None:
+        self._successors = successors
+        self._dirty = True
+
+    @property
+    def attributes(self) -> dict[str, Attribute]:
+        """
+        The attributes attached to the operation.
+        The dictionary is allocated on its first access. Assigning a
+        dictionary copies it, so that changes to the attributes mark the
+        operation as modified.
+        """
+        if self._attributes is None:
+            self._attributes = OpAttributes(self)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, attributes: dict[str, Attribute]) -> None:
+        self._attributes = OpAttributes(self, attributes)
+        self._dirty = True
+
+    @property
+    def regions(self) -> list[Region]:
+        """
+        Regions arguments of the operation.
+        The list is allocated on its first access.
+        """
+        if self._regions is _EMPTY_SEQUENCE:
+            self._regions = []
+        return self._regions
+
+    @regions.setter
+    def regions(self, regions: list[Region]) -> None:
+        self._regions = regions
+        self._dirty = True
+
+    @property
+    def operands(self) -> OpOperands:
+        return OpOperands(self)
 
     @operands.setter
-    def operands(self, new: list[SSAValue] | FrozenList[SSAValue]):
-        if isinstance(new, list):
-            new = FrozenList(new)
-        for idx, operand in enumerate(self._operands):
-            operand.remove_use(Use(self, idx))
-        for idx, operand in enumerate(new):
-            operand.add_use(Use(self, idx))
-        self._operands = new
-        self._operands.freeze()
+    def operands(self, new: Sequence[SSAValue]):
+        uses = self._operand_uses
+        # Reuse the existing operand slots, and only allocate the missing ones
+        for use in uses:
+            use.value.remove_use(use)
+        del uses[len(new):]
+        for idx in range(len(uses), len(new)):
+            uses.append(Use(self, idx))
+        for use, operand in zip(uses, new):
+            operand.add_use(use)
+        self._dirty = True
 
     def __post_init__(self):
         assert (self.name != "")
@@ -306,20 +681,46 @@ class Operation:
                 assert isinstance(
                     operand, SSAValue), "Operands must be of type SSAValue"
             operation.operands = operands
-        if result_types is not None:
+        if result_types:
             operation.results = [
                 OpResult(typ, operation, idx)
                 for (idx, typ) in enumerate(result_types)
             ]
-        if attributes is not None:
+        if attributes:
             operation.attributes = attributes
-        if successors is not None:
-            operation.successors = successors
+        if successors:
+            operation.successors = list(successors)
         if regions is not None:
             for region in regions:
                 operation.add_region(region)
         return operation
 
+    @classmethod
+    def _create_unchecked(cls: type[OpT], operands: Sequence[SSAValue],
+                          result_types: Sequence[Attribute],
+                          attributes: dict[str, Attribute],
+                          successors: list[Block]) -> OpT:
+        """
+        Create an operation without regions, like `create`, but without
+        checking the operands. This is used to copy existing IR.
+        """
+        op = cls()
+        if operands:
+            uses = op._operand_uses
+            for idx, operand in enumerate(operands):
+                use = Use(op, idx)
+                operand.add_use(use)
+                uses.append(use)
+        if result_types:
+            op.results = [
+                OpResult(typ, op, idx) for idx, typ in enumerate(result_types)
+            ]
+        if attributes:
+            op.attributes = attributes
+        if successors:
+            op.successors = successors
+        return op
+
     @classmethod
     def create(cls: type[OpT],
                operands: Sequence[SSAValue] | None = None,
@@ -343,9 +744,10 @@ class Operation:
 
     def replace_operand(self, operand_idx: int, new_operand: SSAValue) -> None:
         """Replace an operand with another operand."""
-        self.operands = list(self._operands[:operand_idx]) + [
-            new_operand
-        ] + list(self._operands[operand_idx + 1:])
+        use = self._operand_uses[operand_idx]
+        use.value.remove_use(use)
+        new_operand.add_use(use)
+        self._dirty = True
 
     def add_region(self, region: Region) -> None:
         """Add an unattached region to the operation."""
@@ -354,6 +756,7 @@ class Operation:
                 "Cannot add region that is already attached on an operation.")
         self.regions.append(region)
         region.parent = self
+        self._dirty = True
 
     def drop_all_references(self) -> None:
         """
@@ -361,25 +764,83 @@ class Operation:
         This function is called prior to deleting an operation.
         """
         self.parent = None
-        for idx, operand in enumerate(self.operands):
-            operand.remove_use(Use(self, idx))
-        for region in self.regions:
+        for use in self._operand_uses:
+            use.value.remove_use(use)
+        for region in self._regions:
             region.drop_all_references()
 
     def walk(self, fun: Callable[[Operation], None]) -> None:
         """Call a function on all operations contained in the operation (including this one)"""
         fun(self)
-        for region in self.regions:
+        for region in self._regions:
             region.walk(fun)
 
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Was the operation modified since it was last verified.
+        New operations are dirty.
+        """
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """
+        Mark the operation as modified, so that it is verified again by
+        `verify_incremental`. Changes to operands, attributes, regions, to
+        the types of its values, and to the operations and blocks of its
+        regions mark operations as dirty. Other changes, such as modifying
+        the lists of results or successors in place, should call this
+        method.
+        """
+        self._dirty = True
+
     def verify(self, verify_nested_ops: bool = True) -> None:
         for operand in self.operands:
             if isinstance(operand, ErasedSSAValue):
                 raise Exception("Erased SSA value is used by the operation")
         self.verify_()
         if verify_nested_ops:
-            for region in self.regions:
+            for region in self._regions:
                 region.verify()
+        self._dirty = False
+
+    def verify_incremental(self) -> int:
+        """
+        Verify the dirty operations nested in the operation, including
+        itself, along with their parent operations and the users of their
+        results. The other operations are assumed to be still valid since
+        their last verification. Returns the number of verified operations.
+        """
+        dirty_ops = list[Operation]()
+
+        def collect(op: Operation) -> None:
+            if op._dirty:
+                dirty_ops.append(op)
+
+        self.walk(collect)
+        # The operations to verify, in a deterministic order
+        ops = dict[Operation, None]()
+        for op in dirty_ops:
+            ops[op] = None
+            if op is not self and (parent_op := op.parent_op()) is not None:
+                ops[parent_op] = None
+            for result in op._results:
+                for use in result.uses:
+                    ops[use.operation] = None
+        for op in ops:
+            for region in op._regions:
+                for block in region.blocks:
+                    if block.parent is not region:
+                        raise Exception(
+                            "Parent pointer of block does not refer to containing region"
+                        )
+                    for block_op in block.ops:
+                        if block_op.parent is not block:
+                            raise Exception(
+                                "Parent pointer of operation does not refer to containing region"
+                            )
+            op.verify(verify_nested_ops=False)
+        return len(ops)
 
     def verify_(self) -> None:
         pass
@@ -401,23 +862,23 @@ class Operation:
             value_mapper = {}
         if block_mapper is None:
             block_mapper = {}
-        operands = [
-            (value_mapper[operand] if operand in value_mapper else operand)
-            for operand in self.operands
-        ]
-        result_types = [res.typ for res in self.results]
-        attributes = self.attributes.copy()
-        successors = [(block_mapper[successor]
-                       if successor in block_mapper else successor)
-                      for successor in self.successors]
-        regions = [Region() for _ in self.regions]
-        cloned_op = self.create(operands=operands,
-                                result_types=result_types,
-                                attributes=attributes,
-                                successors=successors,
-                                regions=regions)
-        for idx, result in enumerate(cloned_op.results):
-            value_mapper[self.results[idx]] = result
+        get_value = value_mapper.get
+        operands = [get_value(operand, operand) for operand in self.operands]
+        # The attributes are copied when assigned to the new operation
+        attributes = self._attributes
+        successors = self._successors
+        if successors:
+            successors = [
+                block_mapper.get(successor, successor)
+                for successor in successors
+            ]
+        cloned_op = self._create_unchecked(operands,
+                                           [res.typ for res in self._results],
+                                           attributes, successors)
+        for region in self._regions:
+            cloned_op.add_region(Region())
+        for result, cloned_result in zip(self._results, cloned_op._results):
+            value_mapper[result] = cloned_result
         return cloned_op
 
     def clone(self: OpT,
@@ -429,8 +890,11 @@ class Operation:
         if block_mapper is None:
             block_mapper = {}
         op = self.clone_without_regions(value_mapper, block_mapper)
-        for idx, region in enumerate(self.regions):
-            region.clone_into(op.regions[idx], 0, value_mapper, block_mapper)
+        if self._regions:
+            _clone_regions(
+                [(region, cloned_region, 0)
+                 for region, cloned_region in zip(self._regions, op._regions)],
+                value_mapper, block_mapper)
         return op
 
     def erase(self,
@@ -443,7 +907,7 @@ class Operation:
         assert self.parent is None, "Operation with parents should first be detached before erasure."
         if drop_references:
             self.drop_all_references()
-        for result in self.results:
+        for result in self._results:
             result.erase(safe_erase=safe_erase)
 
     def detach(self):
@@ -460,11 +924,12 @@ class Operation:
 
     def is_ancestor(self, op: Operation | Block | Region) -> bool:
         """Returns true if the operation is an ancestor of the operation, block, or region."""
-        if op is self:
-            return True
-        if op.parent is None:
-            return False
-        return self.is_ancestor(op.parent)
+        node: Operation | Block | Region | None = op
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
 
     def __eq__(self, other: Operation) -> bool:
         return self is other
@@ -472,6 +937,20 @@ class Operation:
     def __hash__(self) -> int:
         return id(self)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """
+        Pickle the operation in the flat form of `xdsl.serialization`,
+        rather than as a graph of objects, so that deeply nested operations
+        can be pickled and deep-copied. The unpickled operation has no
+        parent, and the values it uses that are defined outside of it are
+        pickled separately.
+        """
+        from xdsl.serialization import deserialize_op, serialize_ops
+        return deserialize_op, (serialize_ops([self], allow_external=True), )
+
+    def __copy__(self: OpT) -> OpT:
+        return _shallow_copy(self)
+
     @classmethod
     @property
     def irdl_definition(cls) -> OpDef:
@@ -479,7 +958,122 @@ class Operation:
         ...
 
 
-@dataclass(eq=False)
+@dataclass(frozen=True, eq=False, slots=True)
+class OpOperands(Sequence[SSAValue]):
+    """
+    A list-like view over the operands of an operation.
+    The view is backed by the operation operand slots, and reflects their changes.
+    """
+
+    op: Operation
+    """The operation whose operands are viewed."""
+
+    def __iter__(self) -> Iterator[SSAValue]:
+        return (use.value for use in self.op._operand_uses)
+
+    def __len__(self) -> int:
+        return len(self.op._operand_uses)
+
+    @overload
+    def __getitem__(self, index: int) -> SSAValue:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[SSAValue]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> SSAValue | list[SSAValue]:
+        if isinstance(index, slice):
+            return [use.value for use in self.op._operand_uses[index]]
+        return self.op._operand_uses[index].value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return False
+
+    def __repr__(self) -> str:
+        return f"OpOperands({list(self)})"
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class BlockOps(Sequence[Operation]):
+    """
+    A list-like view over the operations of a block.
+    The view is backed by the block operation list, and reflects its changes.
+    Random access requires walking the list, prefer iteration when possible.
+    """
+
+    block: Block
+    """The block whose operations are viewed."""
+
+    def __iter__(self) -> Iterator[Operation]:
+        op = self.block._first_op
+        while op is not None:
+            # Read the next operation first, so the current one can be detached
+            next_op = op._next_op
+            yield op
+            op = next_op
+
+    def __reversed__(self) -> Iterator[Operation]:
+        op = self.block._last_op
+        while op is not None:
+            prev_op = op._prev_op
+            yield op
+            op = prev_op
+
+    def __len__(self) -> int:
+        return self.block._num_ops
+
+    def __bool__(self) -> bool:
+        return self.block._first_op is not None
+
+    def __contains__(self, op: object) -> bool:
+        return isinstance(op, Operation) and op.parent is self.block
+
+    @overload
+    def __getitem__(self, index: int) -> Operation:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Operation]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Operation | list[Operation]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        num_ops = self.block._num_ops
+        if index < 0:
+            index += num_ops
+        if index < 0 or index >= num_ops:
+            raise IndexError("Block operation index out of range")
+        # Walk from the closest end of the list
+        if index <= num_ops // 2:
+            op = self.block._first_op
+            for _ in range(index):
+                op = op._next_op
+        else:
+            op = self.block._last_op
+            for _ in range(num_ops - 1 - index):
+                op = op._prev_op
+        return op
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BlockOps):
+            return self.block is other.block
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return False
+
+    def __repr__(self) -> str:
+        return f"BlockOps({list(self)})"
+
+    def copy(self) -> list[Operation]:
+        """Get a list containing the block operations."""
+        return list(self)
+
+
+@dataclass(eq=False, slots=True)
 class Block:
     """A sequence of operations"""
 
@@ -487,12 +1081,40 @@ class Block:
                                              init=False)
     """The basic block arguments."""
 
-    ops: list[Operation] = field(default_factory=list, init=False)
-    """Ordered operations contained in the block."""
+    _first_op: Operation | None = field(default=None, init=False, repr=False)
+    """The first operation of the block."""
+
+    _last_op: Operation | None = field(default=None, init=False, repr=False)
+    """The last operation of the block."""
+
+    _num_ops: int = field(default=0, init=False, repr=False)
+    """The number of operations in the block."""
+
+    _op_order_valid: bool = field(default=False, init=False, repr=False)
+    """Are the operation order indices up to date."""
 
     parent: Region | None = field(default=None, init=False, repr=False)
     """Parent region containing the block."""
 
+    @property
+    def ops(self) -> BlockOps:
+        """
+        Ordered operations contained in the block.
+        Operations are stored in an intrusive doubly-linked list, so inserting,
+        detaching, and erasing an operation relative to another is O(1).
+        """
+        return BlockOps(self)
+
+    @property
+    def first_op(self) -> Operation | None:
+        """The first operation of the block, if any."""
+        return self._first_op
+
+    @property
+    def last_op(self) -> Operation | None:
+        """The last operation of the block, if any."""
+        return self._last_op
+
     def parent_op(self) -> Operation | None:
         return self.parent.parent if self.parent else None
 
@@ -545,11 +1167,12 @@ class Block:
 
     def is_ancestor(self, op: Operation | Block | Region) -> bool:
         """Returns true if the block is an ancestor of the operation, block, or region."""
-        if op is self:
-            return True
-        if op.parent is None:
-            return False
-        return self.is_ancestor(op.parent)
+        node: Operation | Block | Region | None = op
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
 
     def insert_arg(self, typ: Attribute, index: int) -> BlockArgument:
         """
@@ -564,8 +1187,23 @@ class Block:
         self._args = FrozenList(
             list(self._args[:index]) + [new_arg] + list(self._args[index:]))
         self._args.freeze()
+        self._mark_parent_op_dirty()
         return new_arg
 
+    def add_args(self, types: Sequence[Attribute]) -> list[BlockArgument]:
+        """
+        Add new arguments with the given types at the end of the arguments
+        list. Returns the new arguments.
+        """
+        new_args = [
+            BlockArgument(typ, self, index)
+            for index, typ in enumerate(types, len(self._args))
+        ]
+        self._args = FrozenList(list(self._args) + new_args)
+        self._args.freeze()
+        self._mark_parent_op_dirty()
+        return new_args
+
     def erase_arg(self, arg: BlockArgument, safe_erase: bool = True) -> None:
         """
         Erase a block argument.
@@ -580,6 +1218,12 @@ class Block:
         self._args = FrozenList(
             list(self._args[:arg.index]) + list(self._args[arg.index + 1:]))
         arg.erase(safe_erase=safe_erase)
+        self._mark_parent_op_dirty()
+
+    def _mark_parent_op_dirty(self) -> None:
+        """Mark the operation containing the block as modified."""
+        if (region := self.parent) is not None and region.parent is not None:
+            region.parent._dirty = True
 
     def _attach_op(self, operation: Operation) -> None:
         """Attach an operation to the block, and check that it has no parents."""
@@ -587,19 +1231,102 @@ class Block:
             raise ValueError(
                 "Can't add to a block an operation already attached to a block."
             )
-        if operation.is_ancestor(self):
+        # An operation without regions cannot contain the block
+        if operation._regions and operation.is_ancestor(self):
             raise ValueError(
                 "Can't add an operation to a block contained in the operation."
             )
         operation.parent = self
 
+    def _link_op(self, operation: Operation,
+                 next_op: Operation | None) -> None:
+        """
+        Link an attached operation in the operation list, before `next_op`.
+        If `next_op` is None, the operation is linked at the end of the block.
+        """
+        prev_op = self._last_op if next_op is None else next_op._prev_op
+        operation._prev_op = prev_op
+        operation._next_op = next_op
+        if prev_op is None:
+            self._first_op = operation
+        else:
+            prev_op._next_op = operation
+        if next_op is None:
+            self._last_op = operation
+        else:
+            next_op._prev_op = operation
+        self._num_ops += 1
+        if self._op_order_valid:
+            self._update_op_order(operation)
+        self._mark_parent_op_dirty()
+
+    def _unlink_op(self, operation: Operation) -> None:
+        """Remove an operation from the operation list."""
+        prev_op = operation._prev_op
+        next_op = operation._next_op
+        if prev_op is None:
+            self._first_op = next_op
+        else:
+            prev_op._next_op = next_op
+        if next_op is None:
+            self._last_op = prev_op
+        else:
+            next_op._prev_op = prev_op
+        operation._prev_op = None
+        operation._next_op = None
+        self._num_ops -= 1
+        # Removing an operation keeps the order of the others valid.
+        self._mark_parent_op_dirty()
+
+    def _update_op_order(self, operation: Operation) -> None:
+        """
+        Give an order index to a newly linked operation, using the gap
+        between its neighbours. If there is no gap left, invalidate the
+        order of the block, which will be recomputed on the next query.
+        """
+        prev_op = operation._prev_op
+        next_op = operation._next_op
+        if prev_op is None and next_op is None:
+            operation._order_index = 0
+        elif prev_op is None:
+            operation._order_index = next_op._order_index - _OP_ORDER_STRIDE
+        elif next_op is None:
+            operation._order_index = prev_op._order_index + _OP_ORDER_STRIDE
+        elif next_op._order_index - prev_op._order_index > 1:
+            operation._order_index = (prev_op._order_index +
+                                      next_op._order_index) // 2
+        else:
+            self._op_order_valid = False
+
+    def _recompute_op_order(self) -> None:
+        """Renumber all operations of the block, leaving gaps between them."""
+        for idx, op in enumerate(self.ops):
+            op._order_index = idx * _OP_ORDER_STRIDE
+        self._op_order_valid = True
+
+    def _insert_ops_before(self, ops: list[Operation],
+                           next_op: Operation | None,
+                           name: str | None) -> None:
+        """
+        Insert operations before `next_op`, or at the end of the block
+        if `next_op` is None.
+        """
+        if name:
+            for curr_op in ops:
+                for res in curr_op._results:
+                    res.name = name
+        for op in ops:
+            self._attach_op(op)
+        for op in ops:
+            self._link_op(op, next_op)
+
     def add_op(self, operation: Operation) -> None:
         """
         Add an operation at the end of the block.
         The operation should not be attached to another block already.
         """
         self._attach_op(operation)
-        self.ops.append(operation)
+        self._link_op(operation, None)
 
     def add_ops(self, ops: list[Operation]) -> None:
         """
@@ -616,6 +1343,8 @@ class Block:
         """
         Insert one or multiple operations at a given index in the block.
         The operations should not be attached to another block.
+        Finding the index position is linear, use `insert_op_before` or
+        `insert_op_after` to insert relative to an existing operation.
         """
         if index < 0 or index > len(self.ops):
             raise ValueError(
@@ -623,13 +1352,40 @@ class Block:
             )
         if not isinstance(ops, list):
             ops = [ops]
-        if name:
-            for curr_op in ops:
-                for res in curr_op.results:
-                    res.name = name
-        for op in ops:
-            self._attach_op(op)
-        self.ops = self.ops[:index] + ops + self.ops[index:]
+        next_op = None if index == self._num_ops else self.ops[index]
+        self._insert_ops_before(ops, next_op, name)
+
+    def insert_op_before(self,
+                         ops: Operation | list[Operation],
+                         existing_op: Operation,
+                         name: str | None = None) -> None:
+        """
+        Insert one or multiple operations before an operation of the block.
+        The operations should not be attached to another block.
+        """
+        if existing_op.parent is not self:
+            raise ValueError(
+                "Can't insert operations before an operation that is not "
+                "a child of the block.")
+        if not isinstance(ops, list):
+            ops = [ops]
+        self._insert_ops_before(ops, existing_op, name)
+
+    def insert_op_after(self,
+                        ops: Operation | list[Operation],
+                        existing_op: Operation,
+                        name: str | None = None) -> None:
+        """
+        Insert one or multiple operations after an operation of the block.
+        The operations should not be attached to another block.
+        """
+        if existing_op.parent is not self:
+            raise ValueError(
+                "Can't insert operations after an operation that is not "
+                "a child of the block.")
+        if not isinstance(ops, list):
+            ops = [ops]
+        self._insert_ops_before(ops, existing_op._next_op, name)
 
     def get_operation_index(self, op: Operation) -> int:
         """Get the operation position in a block."""
@@ -645,15 +1401,12 @@ class Block:
         Detach an operation from the block.
         Returns the detached operation.
         """
-        if isinstance(op, Operation):
-            op_idx = self.get_operation_index(op)
-        else:
-            op_idx = op
-            op = self.ops[op_idx]
+        if not isinstance(op, Operation):
+            op = self.ops[op]
         if op.parent is not self:
             raise Exception("Cannot detach operation from a different block.")
         op.parent = None
-        self.ops = self.ops[:op_idx] + self.ops[op_idx + 1:]
+        self._unlink_op(op)
         return op
 
     def erase_op(self, op: int | Operation, safe_erase: bool = True) -> None:
@@ -708,8 +1461,21 @@ class Block:
     def __hash__(self) -> int:
         return id(self)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """
+        Pickle the block in the flat form of `xdsl.serialization`. The
+        unpickled block has no parent, and the values it uses that are
+        defined outside of it are pickled separately.
+        """
+        from xdsl.serialization import deserialize_block, serialize_block
+        return deserialize_block, (serialize_block(self,
+                                                   allow_external=True), )
 
-@dataclass
+    def __copy__(self) -> Block:
+        return _shallow_copy(self)
+
+
+@dataclass(slots=True)
 class Region:
     """A region contains a CFG of blocks. Regions are contained in operations."""
 
@@ -759,7 +1525,7 @@ class Region:
         raise TypeError(f"Can't build a region with argument {arg}")
 
     @property
-    def ops(self) -> list[Operation]:
+    def ops(self) -> BlockOps:
         """
         Get the operations of a single-block region.
         Returns an exception if the region is not single-block.
@@ -779,17 +1545,24 @@ class Region:
         if len(self.blocks) != 1 or len(self.blocks[0].ops) != 1:
             raise ValueError("'op' property of Region class is only available "
                              "for single-operation single-block regions.")
-        return self.blocks[0].ops[0]
+        return self.blocks[0].first_op
 
     def _attach_block(self, block: Block) -> None:
         """Attach a block to the region, and check that it has no parents."""
         if block.parent is not None:
             raise ValueError(
                 "Can't add to a region a block already attached to a region.")
-        if block.is_ancestor(self):
+        # An empty block cannot contain the region
+        if block._first_op is not None and block.is_ancestor(self):
             raise ValueError(
                 "Can't add a block to a region contained in the block.")
         block.parent = self
+        self._mark_parent_dirty()
+
+    def _mark_parent_dirty(self) -> None:
+        """Mark the operation containing the region as modified."""
+        if self.parent is not None:
+            self.parent._dirty = True
 
     def add_block(self, block: Block) -> None:
         """Add a block to the region."""
@@ -834,6 +1607,7 @@ class Region:
             raise Exception("Cannot detach block from a different region.")
         block.parent = None
         self.blocks = self.blocks[:block_idx] + self.blocks[block_idx + 1:]
+        self._mark_parent_dirty()
         return block
 
     def erase_block(self, block: int | Block, safe_erase: bool = True) -> None:
@@ -853,24 +1627,15 @@ class Region:
         Clone all block of this region into `dest` to position `insert_index`
         """
         assert (dest is not None)
-        assert (dest != self)
+        assert (dest is not self)
         if insert_index is None:
             insert_index = len(dest.blocks)
         if value_mapper is None:
             value_mapper = {}
         if block_mapper is None:
             block_mapper = {}
-
-        for block in self.blocks:
-            new_block = Block()
-            block_mapper[block] = new_block
-            for idx, block_arg in enumerate(block.args):
-                new_block.insert_arg(block_arg.typ, idx)
-                value_mapper[block_arg] = new_block.args[idx]
-            for op in block.ops:
-                new_block.add_op(op.clone(value_mapper, block_mapper))
-            dest.insert_block(new_block, insert_index)
-            insert_index += 1
+        _clone_regions([(self, dest, insert_index)], value_mapper,
+                       block_mapper)
 
     def walk(self, fun: Callable[[Operation], None]) -> None:
         """Call a function on all operations contained in the region."""
@@ -907,6 +1672,8 @@ class Region:
         self.blocks = []
         for block in region.blocks:
             block.parent = region
+        self._mark_parent_dirty()
+        region._mark_parent_dirty()
 
     def get_toplevel_object(self) -> Operation | Block | Region:
         """Get the operation, block, or region ancestor that has no parents."""
@@ -914,10 +1681,85 @@ class Region:
             return self
         return self.parent.get_toplevel_object()
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """
+        Pickle the region in the flat form of `xdsl.serialization`. The
+        unpickled region has no parent, and the values it uses that are
+        defined outside of it are pickled separately.
+        """
+        from xdsl.serialization import deserialize_region, serialize_region
+        return deserialize_region, (serialize_region(self,
+                                                     allow_external=True), )
+
+    def __copy__(self) -> Region:
+        return _shallow_copy(self)
+
     def is_ancestor(self, op: Operation | Block | Region) -> bool:
         """Returns true if the region is an ancestor of the operation, block, or region."""
-        if op is self:
-            return True
-        if op.parent is None:
-            return False
-        return self.is_ancestor(op.parent)
+        node: Operation | Block | Region | None = op
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+
+def _clone_regions(regions: list[tuple[Region, Region, int]],
+                   value_mapper: dict[SSAValue, SSAValue],
+                   block_mapper: dict[Block, Block]) -> None:
+    """
+    Clone the blocks of each region into its destination region, at the
+    given index. Nested regions are cloned with an explicit worklist rather
+    than by recursion, so that deep nests can be cloned. Cloned blocks are
+    only attached once their nested regions are cloned, so that attaching
+    them never walks up a deep nest. Values used before their definition in
+    preorder, as in a block that comes before the block dominating it, are
+    mapped once all operations are cloned.
+    """
+    # The worklist holds regions to clone, and blocks to attach to a region
+    # once the regions nested in them are cloned
+    worklist: list[tuple[Region, Region, int]
+                   | tuple[None, Region, int, list[Block]]] = []
+    worklist.extend(reversed(regions))
+    cloned_ops = list[Operation]()
+    has_cfg = False
+    while worklist:
+        item = worklist.pop()
+        if item[0] is None:
+            _, dest, index, blocks = item
+            dest.insert_block(blocks, index)
+            continue
+        region, dest, index = item
+
+        # All blocks are created first, so that successors are mapped even
+        # when they come later in the region
+        blocks = region.blocks
+        if len(blocks) > 1:
+            has_cfg = True
+        cloned_blocks = list[Block]()
+        for block in blocks:
+            args = block.args
+            cloned_block = Block.from_arg_types([arg.typ for arg in args])
+            block_mapper[block] = cloned_block
+            for arg, cloned_arg in zip(args, cloned_block.args):
+                value_mapper[arg] = cloned_arg
+            cloned_blocks.append(cloned_block)
+        worklist.append((None, dest, index, cloned_blocks))
+
+        for block, cloned_block in zip(blocks, cloned_blocks):
+            for op in block.ops:
+                cloned_op = op.clone_without_regions(value_mapper,
+                                                     block_mapper)
+                cloned_block.add_op(cloned_op)
+                cloned_ops.append(cloned_op)
+                worklist.extend(
+                    zip(op._regions, cloned_op._regions,
+                        [0] * len(op._regions)))
+
+    # Only regions with several blocks can use values before their definition
+    if not has_cfg:
+        return
+    for cloned_op in cloned_ops:
+        for idx, operand in enumerate(cloned_op.operands):
+            if (mapped := value_mapper.get(operand)) is not None:
+                cloned_op.replace_operand(idx, mapped)
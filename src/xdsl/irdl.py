@@ -393,7 +393,7 @@ class OptResultDef(VarResultDef, OptionalDef):
     """An IRDL optional result definition."""
 
 
-@dataclass
+@dataclass(slots=True)
 class RegionDef(Region):
     """
     An IRDL region definition.
@@ -403,7 +403,7 @@ class RegionDef(Region):
     blocks: list[Block] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class SingleBlockRegionDef(RegionDef):
     """An IRDL region definition that expects exactly one block."""
     pass
@@ -484,7 +484,9 @@ def get_variadic_sizes(op: Operation, op_def: OpDef,
                      for arg_name, arg_def in operand_or_result_defs
                      if isinstance(arg_def, VariadicDef)]
 
-    op_defs = op.operands if is_operand else op.results
+    # The private fields are read, so that reading the sizes does not
+    # allocate the empty containers of the operation
+    op_defs = op.operands if is_operand else op._results
     def_type_name = "operand" if is_operand else "result"
 
     # If the size is in the attributes, fetch it
@@ -492,11 +494,12 @@ def get_variadic_sizes(op: Operation, op_def: OpDef,
     ) if is_operand else AttrSizedResultSegments()
     if attribute_option in op_def.options:
         size_attribute_name = AttrSizedOperandSegments.attribute_name if is_operand else AttrSizedResultSegments.attribute_name
-        if size_attribute_name not in op.attributes:
+        attributes = op._attributes or {}
+        if size_attribute_name not in attributes:
             raise VerifyException(
                 f"Expected {size_attribute_name} attribute in {op.name} operation."
             )
-        attribute = op.attributes[size_attribute_name]
+        attribute = attributes[size_attribute_name]
         if not isinstance(attribute, DenseIntOrFPElementsAttr):
             raise VerifyException(
                 f"{size_attribute_name} attribute is expected to be a DenseIntOrFPElementsAttr."
@@ -544,7 +547,7 @@ def get_operand_or_result(
     :return:
     """
     argument_defs = op_def.operands if is_operand else op_def.results
-    op_arguments = op.operands if is_operand else op.results
+    op_arguments = op.operands if is_operand else op._results
 
     variadic_sizes = get_variadic_sizes(op, op_def, is_operand)
 
@@ -587,6 +590,12 @@ def irdl_op_verify(op: Operation, op_def: OpDef) -> None:
 
             current_operand += 1
 
+    # The private fields are read, so that verification does not allocate
+    # the empty containers of the operation
+    results = op._results
+    regions = op._regions
+    attributes = op._attributes or {}
+
     # Verify results
     # get_variadic_sizes already verify that the variadic result sizes match the number of results.
     result_sizes = get_variadic_sizes(op, op_def, is_operand=False)
@@ -595,48 +604,47 @@ def irdl_op_verify(op: Operation, op_def: OpDef) -> None:
     for _, result_def in op_def.results:
         if isinstance(result_def, VarResultDef):
             for _ in range(result_sizes[current_var_result]):
-                result_def.constr.verify(op.results[current_result].typ)
+                result_def.constr.verify(results[current_result].typ)
                 current_result += 1
         else:
-            result_def.constr.verify(op.results[current_result].typ)
+            result_def.constr.verify(results[current_result].typ)
             current_result += 1
 
-    if len(op_def.regions) != len(op.regions):
+    if len(op_def.regions) != len(regions):
         raise VerifyException(
-            f"op has {len(op.regions)} regions, but {len(op_def.regions)} were expected"
+            f"op has {len(regions)} regions, but {len(op_def.regions)} were expected"
         )
 
     for idx, (region_name, region_def) in enumerate(op_def.regions):
-        if isinstance(
-                region_def,
-                SingleBlockRegionDef) and len(op.regions[idx].blocks) != 1:
+        if isinstance(region_def,
+                      SingleBlockRegionDef) and len(regions[idx].blocks) != 1:
             raise VerifyException(
-                f"region {region_name} at position {idx} should have a single block, but got {len(op.regions[idx].blocks)} blocks"
+                f"region {region_name} at position {idx} should have a single block, but got {len(regions[idx].blocks)} blocks"
             )
         if region_def.block_args is not None:
-            if len(op.regions[idx].blocks) == 0:
+            if len(regions[idx].blocks) == 0:
                 raise VerifyException(
                     f"region {region_name} at position {idx} should have at least one block"
                 )
             expected_num_args = len(region_def.block_args)
-            num_args = len(op.regions[idx].blocks[0].args)
+            num_args = len(regions[idx].blocks[0].args)
             if num_args != expected_num_args:
                 raise VerifyException(
                     f"region {region_name} at position {idx} should have {expected_num_args} argument, but got {num_args}"
                 )
-            for arg_idx, arg_type in enumerate(op.regions[idx].blocks[0].args):
-                typ = op.regions[idx].blocks[0].args[arg_idx]
+            for arg_idx, arg_type in enumerate(regions[idx].blocks[0].args):
+                typ = regions[idx].blocks[0].args[arg_idx]
                 if arg_type != typ:
                     raise VerifyException(
                         f"argument at position {arg_idx} in region {region_name} at position {idx} should be of type {arg_type}, but {typ}"
                     )
 
     for attr_name, attr_def in op_def.attributes.items():
-        if attr_name not in op.attributes:
+        if attr_name not in attributes:
             if isinstance(attr_def, OptAttributeDef):
                 continue
             raise VerifyException(f"attribute {attr_name} expected")
-        attr_def.constr.verify(op.attributes[attr_name])
+        attr_def.constr.verify(attributes[attr_name])
 
 
 def irdl_build_attribute(irdl_def: AttrConstraint, result: Any) -> Attribute:
@@ -792,13 +800,13 @@ def irdl_op_definition(cls: type[_OpT]) -> type[_OpT]:
 
     for region_idx, (region_name, _) in enumerate(op_def.regions):
         new_attrs[region_name] = property(
-            lambda self, idx=region_idx: self.regions[idx])
+            lambda self, idx=region_idx: self._regions[idx])
 
     for attribute_name, attr_def in op_def.attributes.items():
         if isinstance(attr_def, OptAttributeDef):
             new_attrs[attribute_name] = property(
-                lambda self, name=attribute_name: self.attributes.get(
-                    name, None))
+                lambda self, name=attribute_name: self._attributes.get(
+                    name, None) if self._attributes else None)
         else:
             new_attrs[attribute_name] = property(
                 lambda self, name=attribute_name: self.attributes[name])
@@ -827,7 +835,17 @@ def irdl_op_definition(cls: type[_OpT]) -> type[_OpT]:
     new_attrs["build"] = classmethod(builder)
     new_attrs["irdl_definition"] = classmethod(property(lambda cls: op_def))
 
-    return type(cls.__name__, cls.__mro__, {**cls.__dict__, **new_attrs})
+    # The operation class is recreated from the definition parents, with no
+    # instance dictionary, so that operations only use the Operation slots.
+    cls_attrs = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in ("__dict__", "__weakref__")
+    }
+    return type(cls.__name__, cls.__bases__, {
+        **cls_attrs,
+        **new_attrs, "__slots__": ()
+    })
 
 
 #     _   _   _        _ _           _
@@ -905,9 +923,54 @@ def irdl_data_verify(data: Data[_DT], typ: type[_DT]) -> None:
 T = TypeVar('T', bound=Data[Any])
 
 
+def irdl_data_eq(attr: Data[Any], other: object) -> bool:
+    """
+    Equality of Data attributes.
+    Interned attributes are compared by identity before comparing their data.
+    """
+    if attr is other:
+        return True
+    if other.__class__ is not attr.__class__:
+        return NotImplemented
+    return attr.data == cast(Data[Any], other).data
+
+
+def irdl_data_hash(attr: Data[Any]) -> int:
+    """
+    Hash of Data attributes.
+    The hash is computed on the first call, and cached in the attribute.
+    """
+    try:
+        return attr.__dict__["_cached_hash"]
+    except KeyError:
+        data = attr.data
+        if isinstance(data, list):
+            data = tuple(cast(list[Any], data))
+        attr_hash = hash((attr.name, data))
+        object.__setattr__(attr, "_cached_hash", attr_hash)
+        return attr_hash
+
+
+def irdl_attr_getstate(attr: Attribute) -> dict[str, Any]:
+    """
+    Get the state of an attribute for pickling and copying.
+    The cached hash is not part of the state, as it may differ between
+    processes.
+    """
+    return {
+        name: value
+        for name, value in attr.__dict__.items() if name != "_cached_hash"
+    }
+
+
 def irdl_data_definition(cls: type[T]) -> type[T]:
     """Decorator to transform an IRDL Data definition to a Python class."""
     new_attrs = dict[str, Any]()
+    if "__eq__" not in cls.__dict__:
+        new_attrs["__eq__"] = irdl_data_eq
+    if "__hash__" not in cls.__dict__:
+        new_attrs["__hash__"] = irdl_data_hash
+        new_attrs["__getstate__"] = irdl_attr_getstate
 
     # Build method is added for all definitions.
     if "build" in cls.__dict__:
@@ -1060,6 +1123,34 @@ def irdl_attr_builder(cls: type[_PAttrT],
         f"No available {cls.__name__} builders for arguments {args}")
 
 
+def irdl_param_attr_eq(attr: ParametrizedAttribute, other: object) -> bool:
+    """
+    Equality of parametrized attributes.
+    Interned attributes are compared by identity before comparing their
+    parameters.
+    """
+    if attr is other:
+        return True
+    if other.__class__ is not attr.__class__:
+        return NotImplemented
+    return attr.parameters == cast(ParametrizedAttribute, other).parameters
+
+
+def irdl_param_attr_hash(attr: ParametrizedAttribute) -> int:
+    """
+    Hash of parametrized attributes.
+    The hash is computed on the first call, and cached in the attribute.
+    Parameter hashes are themselves cached, so nested attributes are
+    only traversed once.
+    """
+    try:
+        return attr.__dict__["_cached_hash"]
+    except KeyError:
+        attr_hash = hash((attr.name, *attr.parameters))
+        object.__setattr__(attr, "_cached_hash", attr_hash)
+        return attr_hash
+
+
 def irdl_param_attr_definition(cls: type[_PAttrT]) -> type[_PAttrT]:
     """Decorator used on classes to define a new attribute definition."""
 
@@ -1098,6 +1189,11 @@ def irdl_param_attr_definition(cls: type[_PAttrT]) -> type[_PAttrT]:
     new_fields["build"] = lambda *args: irdl_attr_builder(cls, builders, *args)
 
     new_fields["irdl_definition"] = classmethod(property(lambda cls: attr_def))
+    if "__eq__" not in cls.__dict__:
+        new_fields["__eq__"] = irdl_param_attr_eq
+    if "__hash__" not in cls.__dict__:
+        new_fields["__hash__"] = irdl_param_attr_hash
+        new_fields["__getstate__"] = irdl_attr_getstate
 
     return dataclass(frozen=True, init=False)(type(cls.__name__, (cls, ), {
         **cls.__dict__,
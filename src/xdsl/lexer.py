@@ -0,0 +1,261 @@
+"""
+Lexer for the xDSL textual format.
+
+The lexer splits the input into tokens on demand, using a single compiled
+regular expression that also skips whitespace and `//` comments. Tokens
+keep their position in the input, so that the parser can still fall back
+to character-level parsing when needed. The input is either a string, or a
+file that is read in chunks, so that it never has to be held in memory as
+a whole.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from enum import Enum
+from mmap import mmap
+from typing import IO, Callable, Iterator, TypeAlias
+
+
+class TokenKind(Enum):
+    WORD = "WORD"
+    """Identifiers, keywords and integers, matching `[\\w.]+`."""
+
+    SSA_NAME = "SSA_NAME"
+    """An SSA value name, such as `%0`."""
+
+    BLOCK_NAME = "BLOCK_NAME"
+    """A block name, such as `^bb0`."""
+
+    SYMBOL = "SYMBOL"
+    """A symbol reference, such as `@main`."""
+
+    STRING = "STRING"
+    """A string literal, with `\\\\`, `\\n`, `\\t`, `\\r` and `\\"` escapes."""
+
+    PUNCT = "PUNCT"
+    """Any other single character."""
+
+    EOF = "EOF"
+    """The end of the input."""
+
+
+@dataclass(slots=True)
+class Token:
+    kind: TokenKind
+    """The kind of the token."""
+
+    text: str
+    """The text of the token, including its prefix or quotes."""
+
+    start: int
+    """The position of the first character of the token in the input."""
+
+    end: int
+    """The position following the last character of the token."""
+
+    @property
+    def value(self) -> str:
+        """The text of the token, without its prefix or quotes."""
+        if self.kind in (TokenKind.SSA_NAME, TokenKind.BLOCK_NAME,
+                         TokenKind.SYMBOL):
+            return self.text[1:]
+        if self.kind == TokenKind.STRING:
+            return self.text[1:-1]
+        return self.text
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?:\s|//[^\n]*)*
+    (?:
+        (?P<WORD>[\w.]+)
+      | (?P<SSA_NAME>%[\w.]+)
+      | (?P<BLOCK_NAME>\^[\w.]+)
+      | (?P<SYMBOL>@[\w.]+)
+      | (?P<STRING>"[^"\\]*(?:\\[\\ntr"][^"\\]*)*")
+      | (?P<PUNCT>.)
+    )?""", re.VERBOSE | re.DOTALL)
+
+_TOKEN_KINDS = {kind.value: kind for kind in TokenKind}
+
+_NON_BRACES_RE = re.compile(
+    r"""
+    (?:
+        [^{}"/]+
+      | //[^\n]*
+      | /
+      | "[^"\\]*(?:\\.[^"\\]*)*"
+    )*""", re.VERBOSE)
+"""Match anything up to the next brace that is not in a string or comment."""
+
+LexerInput: TypeAlias = str | IO[str] | IO[bytes] | mmap
+"""
+The input of the lexer, either a string, a text or binary file, or a
+memory-mapped file. Binary inputs are decoded as UTF-8.
+"""
+
+
+class Lexer:
+    """
+    Split an input into tokens.
+    The lexer keeps a single token of lookahead, and can be moved forward to
+    any position of the input, which discards the lookahead.
+    Files are read in chunks of `chunk_size` characters or bytes, and only
+    the part of the input following the last consumed token is kept.
+    """
+
+    def __init__(self, input: LexerInput, chunk_size: int = 1 << 16):
+        self.pos: int = 0
+        """The position following the last consumed token."""
+        self._peeked: Token | None = None
+        self._buffer: str = ""
+        """The part of the input that has been read and not consumed yet."""
+        self._offset: int = 0
+        """The position of the first character of the buffer in the input."""
+        self._stream: IO[str] | IO[bytes] | mmap | None = None
+        """The stream to read the next chunks from, if any."""
+        self._chunk_size: int = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+        if isinstance(input, str):
+            self._buffer = input
+        else:
+            self._stream = input
+
+    def peek(self) -> Token:
+        """Return the next token, without consuming it."""
+        token = self._peeked
+        if token is None:
+            token = self._peeked = self._lex()
+        return token
+
+    def next(self) -> Token:
+        """Consume and return the next token."""
+        token = self._peeked
+        if token is None:
+            token = self._lex()
+        else:
+            self._peeked = None
+        self.pos = token.end
+        return token
+
+    def reset(self, pos: int) -> None:
+        """Move the lexer forward to a position of the input."""
+        assert pos >= self._offset, "Cannot move before the read input"
+        self.pos = pos
+        self._peeked = None
+
+    def __iter__(self) -> Iterator[Token]:
+        """Consume the remaining tokens, excluding the end of input."""
+        while (token := self.next()).kind != TokenKind.EOF:
+            yield token
+
+    def next_brace(self) -> Token:
+        """
+        Consume the input up to the next `{` or `}` that is not part of a
+        string or a comment, and return the brace token, or the end of input.
+        This is faster than consuming each token in between.
+        """
+        while True:
+            buffer, offset = self._buffer, self._offset
+            match = _NON_BRACES_RE.match(buffer, self.pos - offset)
+            assert match is not None
+            end = match.end()
+            if end < len(buffer) and buffer[end] in "{}":
+                self.reset(end + offset + 1)
+                return Token(TokenKind.PUNCT, buffer[end], end + offset,
+                             end + offset + 1)
+            if not self._read():
+                break
+        if end < len(buffer):
+            self._check_string(end)
+        self.reset(end + offset)
+        return self.peek()
+
+    def read_while(self, cond: Callable[[str], bool]) -> str:
+        """Consume the characters satisfying `cond`, and return them."""
+        start = idx = self.pos
+        while True:
+            buffer, offset = self._buffer, self._offset
+            local_idx = idx - offset
+            while local_idx < len(buffer) and cond(buffer[local_idx]):
+                local_idx += 1
+            idx = local_idx + offset
+            if local_idx < len(buffer) or not self._read():
+                break
+        res = self._buffer[start - self._offset:idx - self._offset]
+        self.reset(idx)
+        return res
+
+    def startswith(self, prefix: str, pos: int) -> bool:
+        """Check if the input starts with `prefix` at `pos`."""
+        while (pos + len(prefix) > self._offset + len(self._buffer)
+               and self._read()):
+            pass
+        return self._buffer.startswith(prefix, pos - self._offset)
+
+    def _read(self) -> bool:
+        """
+        Read the next chunk of the input, and drop the consumed part of the
+        buffer. Return False at the end of the input.
+        """
+        while self._stream is not None:
+            chunk = self._stream.read(self._chunk_size)
+            if isinstance(chunk, bytes):
+                text = self._decoder.decode(chunk, final=not chunk)
+            else:
+                text = chunk
+            if not chunk:
+                self._stream = None
+            if text:
+                self._buffer = self._buffer[self.pos - self._offset:] + text
+                self._offset = self.pos
+                return True
+        return False
+
+    def _lex(self) -> Token:
+        while True:
+            buffer = self._buffer
+            match = _TOKEN_RE.match(buffer, self.pos - self._offset)
+            assert match is not None
+            group = match.lastgroup
+            # Whitespace, comments, tokens and unterminated strings at the
+            # end of the buffer may continue in the next chunk.
+            if self._stream is not None and (
+                    match.end() == len(buffer) or
+                (group == "PUNCT" and buffer[match.start(group)] == '"')):
+                if self._read():
+                    continue
+            break
+
+        offset = self._offset
+        if group is None:
+            end = match.end() + offset
+            return Token(TokenKind.EOF, "", end, end)
+        start, end = match.span(group)
+        text = buffer[start:end]
+        if text == '"':
+            self._check_string(start)
+        return Token(_TOKEN_KINDS[group], text, start + offset, end + offset)
+
+    def _check_string(self, start: int) -> None:
+        """
+        Raise an error for an invalid string literal starting at `start` in
+        the buffer.
+        """
+        input = self._buffer
+        idx = start + 1
+        while idx < len(input):
+            char = input[idx]
+            if char == '\\':
+                if idx + 1 >= len(input):
+                    raise Exception("Unexpected end of file")
+                if input[idx + 1] not in ['\\', 'n', 't', 'r', '"']:
+                    raise Exception(
+                        f"Unrecognized escaped character: \\{input[idx + 1]}")
+                idx += 1
+            idx += 1
+        raise Exception("'\"' expected")
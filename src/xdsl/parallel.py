@@ -0,0 +1,269 @@
+"""
+Parallel processing of modules with a pool of worker processes.
+
+The top-level operations of a module only refer to each other through
+symbols, so they can be processed independently in separate processes.
+Operations are sent between processes in the compact form of
+`xdsl.serialization`, and the worker processes use their own context with
+the same registered operations and attributes. When printing or running
+passes, forked worker processes use the operations of the module they
+inherit instead.
+"""
+
+from __future__ import annotations
+
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.ir import Attribute, MLContext, Operation
+from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager, PassTiming
+from xdsl.printer import Printer
+from xdsl.rewriter import Rewriter
+from xdsl.serialization import SerializedOps, deserialize_ops, serialize_ops
+
+_worker_ctx: MLContext | None = None
+"""The context of the current worker process."""
+
+
+def _init_worker(registered_ops: dict[str, type[Operation]],
+                 registered_attrs: dict[str, type[Attribute]]) -> None:
+    global _worker_ctx
+    _worker_ctx = MLContext(_registeredOps=registered_ops,
+                            _registeredAttrs=registered_attrs)
+
+
+def _get_worker_ctx() -> MLContext:
+    assert _worker_ctx is not None, "Worker process is not initialized"
+    return _worker_ctx
+
+
+def new_pool(ctx: MLContext, num_workers: int | None) -> ProcessPoolExecutor:
+    """
+    Create a pool of worker processes, that have a context with the same
+    registered operations and attributes as `ctx`.
+    """
+    return ProcessPoolExecutor(num_workers,
+                               initializer=_init_worker,
+                               initargs=(ctx._registeredOps,
+                                         ctx._registeredAttrs))
+
+
+def _parse_chunk(input: str) -> SerializedOps:
+    parser = Parser(_get_worker_ctx(), input)
+    ops = list(parser.parse_toplevel_ops())
+    parser.parse_end_of_input()
+    return serialize_ops(ops)
+
+
+def split_module(input: str, num_chunks: int) -> list[str]:
+    """
+    Split the body of a module into at most `num_chunks` chunks of
+    top-level operations of similar sizes.
+    """
+    spans = Parser(MLContext(), input).split_module_ops()
+    if not spans:
+        return []
+    target_size = (spans[-1][1] - spans[0][0]) / num_chunks
+    chunks = list[str]()
+    chunk_start = spans[0][0]
+    for _, end in spans:
+        if end - chunk_start >= target_size:
+            chunks.append(input[chunk_start:end])
+            chunk_start = end
+    if chunk_start != spans[-1][1]:
+        chunks.append(input[chunk_start:spans[-1][1]])
+    return chunks
+
+
+def parse_module_parallel(ctx: MLContext,
+                          input: str,
+                          num_workers: int | None = None,
+                          chunks_per_worker: int = 4) -> ModuleOp:
+    """
+    Parse a module, by parsing its top-level operations in a pool of
+    `num_workers` processes. The top-level operations should not use the
+    results of other top-level operations.
+    The module is split into `chunks_per_worker` chunks per worker, so
+    that the work is balanced between the workers.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    chunks = split_module(input, num_workers * chunks_per_worker)
+
+    ops = list[Operation]()
+    with new_pool(ctx, num_workers) as pool:
+        for data in pool.map(_parse_chunk, chunks):
+            ops.extend(deserialize_ops(data, ctx))
+    return ModuleOp.from_region_or_ops(ops)
+
+
+_PrinterOptions = tuple[bool, bool, bool, int]
+"""The options of a printer that are forwarded to the worker processes."""
+
+_printed_module: ModuleOp | None = None
+"""
+The module printed by `print_module_parallel`, which is inherited by the
+worker processes when they are forked.
+"""
+
+
+def _print_chunk(chunk: SerializedOps | tuple[int, int],
+                 options: _PrinterOptions) -> list[str]:
+    if isinstance(chunk, SerializedOps):
+        ops = deserialize_ops(chunk)
+    else:
+        assert _printed_module is not None, "Module is not inherited"
+        ops = _printed_module.ops[chunk[0]:chunk[1]]
+
+    generic_format, operand_types, result_types, cache_size = options
+    printer = Printer(print_generic_format=generic_format,
+                      print_operand_types=operand_types,
+                      print_result_types=result_types,
+                      attribute_cache_size=cache_size,
+                      local_ssa_names=True)
+    # The operations are printed as the operations of a module body
+    return [printer.print_op_to_string(op, indent=1) for op in ops]
+
+
+def print_module_parallel(printer: Printer,
+                          module: ModuleOp,
+                          num_workers: int | None = None,
+                          chunks_per_worker: int = 4) -> None:
+    """
+    Print a module, by printing its top-level operations in a pool of
+    `num_workers` processes. The output is the same as the output of
+    `printer` with `local_ssa_names` set, so the top-level operations should
+    not use the results of other top-level operations.
+    Modules with diagnostic messages are printed sequentially.
+    """
+    if printer.diagnostic.op_messages:
+        local_ssa_names = printer.local_ssa_names
+        printer.local_ssa_names = True
+        try:
+            printer.print_op(module)
+        finally:
+            printer.local_ssa_names = local_ssa_names
+        return
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    ops = module.ops
+    num_chunks = max(1, min(len(ops), num_workers * chunks_per_worker))
+    bounds = [len(ops) * idx // num_chunks for idx in range(num_chunks + 1)]
+    # Forked workers inherit the module, and print their operations directly.
+    # Otherwise, the operations are sent to the workers.
+    chunks: list[SerializedOps | tuple[int, int]]
+    if multiprocessing.get_start_method() == "fork":
+        chunks = list(zip(bounds, bounds[1:]))
+    else:
+        chunks = [
+            serialize_ops(ops[begin:end])
+            for begin, end in zip(bounds, bounds[1:])
+        ]
+    options = (printer.print_generic_format, printer.print_operand_types,
+               printer.print_result_types, printer.attribute_cache_size)
+
+    global _printed_module
+    _printed_module = module
+    texts = list[str]()
+    try:
+        with ProcessPoolExecutor(num_workers) as pool:
+            for chunk_texts in pool.map(_print_chunk, chunks,
+                                        [options] * len(chunks)):
+                texts.extend(chunk_texts)
+    finally:
+        _printed_module = None
+
+    printer.print_op(module, printed_ops=dict(zip(ops, texts)))
+
+
+_pipeline: tuple[PassManager, list[Operation]] | None = None
+"""
+The pass manager run by `run_pipeline_parallel` and the operations it runs
+on, which are inherited by the worker processes when they are forked.
+"""
+
+
+def _run_pipeline_chunk(
+        chunk: SerializedOps | tuple[int, int],
+        pass_manager: PassManager | None,
+        timed: bool) -> tuple[SerializedOps, PassTiming | None]:
+    if isinstance(chunk, SerializedOps):
+        assert pass_manager is not None
+        pass_manager.ctx = _get_worker_ctx()
+        ops = deserialize_ops(chunk, pass_manager.ctx)
+        # The operations are run on in a module, as in the original IR
+        ModuleOp.from_region_or_ops(ops)
+    else:
+        assert _pipeline is not None, "Pass manager is not inherited"
+        pass_manager, all_ops = _pipeline
+        ops = all_ops[chunk[0]:chunk[1]]
+
+    timing = PassTiming(pass_manager.name) if timed else None
+    for op in ops:
+        pass_manager._run(op, timing)
+    return serialize_ops(ops), timing
+
+
+def run_pipeline_parallel(pass_manager: PassManager,
+                          ops: list[Operation],
+                          timing: PassTiming | None = None,
+                          num_workers: int | None = None,
+                          chunks_per_worker: int = 4) -> None:
+    """
+    Run a pass manager on each operation of a list, in a pool of
+    `num_workers` processes, and replace the operations in place with the
+    results. The operations keep their order, so the result is the same as
+    running the pass manager on each operation sequentially.
+    The operations should not use values defined outside of them, and the
+    passes should only modify the operations they run on. Unless the worker
+    processes are forked, the pass manager should be picklable.
+    If `timing` is given, the timings of the passes in the workers are added
+    to its children. The pass manager should not have a callback, as it
+    would be called in the worker processes.
+    """
+    if pass_manager.callback is not None:
+        raise ValueError(
+            "Callbacks are not supported in pipelines run by worker processes")
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_chunks = max(1, min(len(ops), num_workers * chunks_per_worker))
+    bounds = [len(ops) * idx // num_chunks for idx in range(num_chunks + 1)]
+    # Forked workers inherit the operations, and only send back the results.
+    # Otherwise, the operations and the pass manager are sent to the workers.
+    chunks: list[SerializedOps | tuple[int, int]]
+    pass_managers: list[PassManager | None]
+    if multiprocessing.get_start_method() == "fork":
+        chunks = list(zip(bounds, bounds[1:]))
+        pass_managers = [None] * num_chunks
+    else:
+        chunks = [
+            serialize_ops(ops[begin:end])
+            for begin, end in zip(bounds, bounds[1:])
+        ]
+        pass_managers = [pass_manager] * num_chunks
+
+    global _pipeline
+    _pipeline = (pass_manager, ops)
+    new_ops = list[Operation]()
+    # Moving the existing objects out of the collected generations avoids
+    # that the garbage collector of forked workers copies their pages
+    gc.freeze()
+    try:
+        with new_pool(pass_manager.ctx, num_workers) as pool:
+            for data, chunk_timing in pool.map(
+                    _run_pipeline_chunk, chunks, pass_managers,
+                [timing is not None] * num_chunks):
+                new_ops.extend(deserialize_ops(data, pass_manager.ctx))
+                if timing is not None and chunk_timing is not None:
+                    timing.merge_children(chunk_timing)
+    finally:
+        gc.unfreeze()
+        _pipeline = None
+
+    for op, new_op in zip(ops, new_ops):
+        Rewriter.replace_op(op, new_op)
@@ -2,55 +2,87 @@ from __future__ import annotations
 from xdsl.ir import (SSAValue, Block, Callable, Attribute, Operation, Region,
                      BlockArgument, MLContext)
 from xdsl.dialects.builtin import (IntegerType, StringAttr, FlatSymbolRefAttr,
-                                   IntegerAttr, ArrayAttr)
+                                   IntegerAttr, ArrayAttr, ModuleOp)
 from xdsl.irdl import Data
+from xdsl.lexer import Lexer, LexerInput, TokenKind
 
-from typing import TypeVar, Dict, Optional, Tuple, List
+import re
+from typing import Iterator, TypeVar, Dict, Optional, Tuple, List
 
 indentNumSpaces = 2
 
+_IDENT_RE = re.compile(r"(?:[^\W\d]|\.)+")
+_ALPHA_NUM_RE = re.compile(r"[\w.]+")
+_INT_RE = re.compile(r"\d+")
+
+_NAME_PREFIXES = {
+    TokenKind.SSA_NAME: "%",
+    TokenKind.BLOCK_NAME: "^",
+    TokenKind.SYMBOL: "@",
+}
+
 
 class Parser:
 
-    def __init__(self, ctx: MLContext, _str: str):
+    def __init__(self, ctx: MLContext, _str: LexerInput):
+        """
+        Create a parser over a string, a file, or a memory-mapped file.
+        Files are read in chunks while parsing.
+        """
         self._ctx: MLContext = ctx
-        self._str: str = _str
-        self._idx: int = 0
+        self._lexer: Lexer = Lexer(_str)
         self._ssaValues: Dict[str, SSAValue] = dict()
         self._blocks: Dict[str, Block] = dict()
 
     def skip_white_space(self) -> None:
-        while self._idx < len(self._str):
-            if self._str[self._idx].isspace():
-                self._idx += 1
-            # TODO: rewrite this hack to support comments
-            elif self._idx < len(self._str) - 1 and self._str[
-                    self._idx] == self._str[self._idx + 1] == '/':
-                self.parse_while(lambda x: x != '\n', False)
-
-            else:
-                return
+        self._lexer.reset(self._lexer.peek().start)
 
     def parse_while(self,
                     cond: Callable[[str], bool],
                     skip_white_space=True) -> str:
         if skip_white_space:
             self.skip_white_space()
-        start_idx = self._idx
-        while self._idx < len(self._str):
-            char = self._str[self._idx]
-            if not cond(char):
-                return self._str[start_idx:self._idx]
-            self._idx += 1
-        return self._str[start_idx:]
+        return self._lexer.read_while(cond)
+
+    def _parse_optional_word(self, pattern: re.Pattern[str],
+                             skip_white_space: bool) -> Optional[str]:
+        """
+        Parse the longest prefix of the next word token matching `pattern`.
+        The rest of the word, if any, is left for the next token.
+        """
+        token = self._lexer.peek()
+        if token.kind != TokenKind.WORD:
+            return None
+        if not skip_white_space and token.start != self._lexer.pos:
+            return None
+        match = pattern.match(token.text)
+        if match is None:
+            return None
+        if match.end() == len(token.text):
+            self._lexer.next()
+        else:
+            self._lexer.reset(token.start + match.end())
+        return match.group()
+
+    def _parse_optional_prefixed_name(self, kind: TokenKind,
+                                      skip_white_space: bool) -> Optional[str]:
+        """
+        Parse a name prefixed by a character, such as `%0` or `^bb0`.
+        If `skip_white_space` is set, the name may also be separated from
+        its prefix.
+        """
+        token = self._lexer.peek()
+        if token.kind == kind:
+            self._lexer.next()
+            return token.text[1:]
+        if token.text != _NAME_PREFIXES[kind]:
+            return None
+        self._lexer.next()
+        return self.parse_alpha_num(skip_white_space=skip_white_space)
 
     # TODO why two different functions, no nums in ident?
     def parse_optional_ident(self, skip_white_space=True) -> Optional[str]:
-        res = self.parse_while(lambda x: x.isalpha() or x == "_" or x == ".",
-                               skip_white_space=skip_white_space)
-        if len(res) == 0:
-            return None
-        return res
+        return self._parse_optional_word(_IDENT_RE, skip_white_space)
 
     def parse_ident(self, skip_white_space=True) -> str:
         res = self.parse_optional_ident(skip_white_space=skip_white_space)
@@ -59,11 +91,7 @@ class Parser:
         return res
 
     def parse_optional_alpha_num(self, skip_white_space=True) -> Optional[str]:
-        res = self.parse_while(lambda x: x.isalnum() or x == "_" or x == ".",
-                               skip_white_space=skip_white_space)
-        if len(res) == 0:
-            return None
-        return res
+        return self._parse_optional_word(_ALPHA_NUM_RE, skip_white_space)
 
     def parse_alpha_num(self, skip_white_space=True) -> str:
         res = self.parse_optional_alpha_num(skip_white_space=skip_white_space)
@@ -72,28 +100,11 @@ class Parser:
         return res
 
     def parse_optional_str_literal(self) -> Optional[str]:
-        parsed = self.parse_optional_char('"')
-        if parsed is None:
+        token = self._lexer.peek()
+        if token.kind != TokenKind.STRING:
             return None
-        start_idx = self._idx
-        while self._idx < len(self._str):
-            char = self._str[self._idx]
-            if char == '\\':
-                if self._idx + 1 < len(self._str):
-                    if self._str[self._idx + 1] in ['\\', 'n', 't', 'r', '"']:
-                        self._idx += 1
-                    else:
-                        raise Exception(
-                            f"Unrecognized escaped character: \\{self._str[self._idx + 1]}"
-                        )
-                else:
-                    raise Exception("Unexpected end of file")
-            elif char == '"':
-                break
-            self._idx += 1
-        res = self._str[start_idx:self._idx]
-        self.parse_char('"')
-        return res
+        self._lexer.next()
+        return token.text[1:-1]
 
     def parse_str_literal(self) -> str:
         res = self.parse_optional_str_literal()
@@ -103,8 +114,8 @@ class Parser:
 
     def parse_optional_int_literal(self) -> Optional[int]:
         is_negative = self.parse_optional_char("-")
-        res = self.parse_while(lambda char: char.isnumeric())
-        if len(res) == 0:
+        res = self._parse_optional_word(_INT_RE, skip_white_space=True)
+        if res is None:
             if is_negative is not None:
                 raise Exception("int literal expected")
             return None
@@ -117,19 +128,23 @@ class Parser:
         return res
 
     def peek_char(self, char: str) -> Optional[bool]:
-        self.skip_white_space()
-        if self._idx == len(self._str):
-            return None
-        if self._str[self._idx] == char:
+        text = self._lexer.peek().text
+        if text and text[0] == char:
             return True
         return None
 
     def parse_optional_char(self, char: str) -> Optional[bool]:
         assert (len(char) == 1)
-        res = self.peek_char(char)
-        if res:
-            self._idx += 1
-        return res
+        token = self._lexer.peek()
+        text = token.text
+        if not text or text[0] != char:
+            return None
+        # Only consume the first character of longer tokens
+        if len(text) == 1:
+            self._lexer.next()
+        else:
+            self._lexer.reset(token.start + 1)
+        return True
 
     def parse_char(self, char: str) -> bool:
         assert (len(char) == 1)
@@ -139,13 +154,11 @@ class Parser:
         return True
 
     def parse_string(self, contents: List[str]) -> bool:
-        self.skip_white_space()
-        for char in contents:
-            if self._idx >= len(self._str):
-                raise Exception(f"{contents} expected")
-            if self._str[self._idx] != char:
-                raise Exception(f"{contents} expected")
-            self._idx += 1
+        string = "".join(contents)
+        start_idx = self._lexer.peek().start
+        if not self._lexer.startswith(string, start_idx):
+            raise Exception(f"{contents} expected")
+        self._lexer.reset(start_idx + len(string))
         return True
 
     T = TypeVar('T')
@@ -177,9 +190,10 @@ class Parser:
         return name, BlockArgument(typ, None, 0)
 
     def parse_optional_named_block(self) -> Optional[Block]:
-        if self.parse_optional_char("^") is None:
+        block_name = self._parse_optional_prefixed_name(TokenKind.BLOCK_NAME,
+                                                        skip_white_space=False)
+        if block_name is None:
             return None
-        block_name = self.parse_alpha_num(skip_white_space=False)
         if block_name in self._blocks:
             block = self._blocks[block_name]
         else:
@@ -229,10 +243,8 @@ class Parser:
         return region
 
     def parse_optional_ssa_name(self) -> Optional[str]:
-        if self.parse_optional_char("%") is None:
-            return None
-        name = self.parse_alpha_num()
-        return name
+        return self._parse_optional_prefixed_name(TokenKind.SSA_NAME,
+                                                  skip_white_space=True)
 
     def parse_optional_ssa_value(self) -> Optional[SSAValue]:
         name = self.parse_optional_ssa_name()
@@ -291,6 +303,13 @@ class Parser:
         return res
 
     def parse_optional_attribute(self) -> Optional[Attribute]:
+        attr = self._parse_optional_attribute()
+        if attr is None:
+            return None
+        # Structurally equal attributes are shared across the parsed IR
+        return self._ctx.intern_attr(attr)
+
+    def _parse_optional_attribute(self) -> Optional[Attribute]:
         # Shorthand for StringAttr
         string_lit = self.parse_optional_str_literal()
         if string_lit is not None:
@@ -314,25 +333,22 @@ class Parser:
             return ArrayAttr.from_list(array)
 
         # Shorthand for FlatSymbolRefAttr
-        parse_at = self.parse_optional_char("@")
-        if parse_at:
-            symbol_name = self.parse_alpha_num(skip_white_space=False)
+        symbol_name = self._parse_optional_prefixed_name(
+            TokenKind.SYMBOL, skip_white_space=False)
+        if symbol_name is not None:
             return FlatSymbolRefAttr.from_str(symbol_name)
 
         parsed = self.parse_optional_char("!")
         if parsed is None:
             return None
 
-        parsed = self.parse_optional_char("i")
+        attr_def_name = self.parse_alpha_num(skip_white_space=True)
 
         # shorthand for integer types
-        if parsed:
-            num = self.parse_optional_int_literal()
-            if num:
-                return IntegerType.from_width(num)
-            attr_def_name = "i" + self.parse_alpha_num(skip_white_space=True)
-        else:
-            attr_def_name = self.parse_alpha_num(skip_white_space=True)
+        if attr_def_name[0] == "i" and _INT_RE.fullmatch(attr_def_name, 1):
+            width = int(attr_def_name[1:])
+            if width:
+                return IntegerType.from_width(width)
 
         attr_def = self._ctx.get_attr(attr_def_name)
         if self.parse_optional_char("<") is None:
@@ -370,10 +386,10 @@ class Parser:
         return {name: attr for (name, attr) in attrs_with_names}
 
     def parse_optional_successor(self) -> Optional[Block]:
-        parsed = self.parse_optional_char("^")
-        if parsed is None:
+        bb_name = self._parse_optional_prefixed_name(TokenKind.BLOCK_NAME,
+                                                     skip_white_space=False)
+        if bb_name is None:
             return None
-        bb_name = self.parse_alpha_num(skip_white_space=False)
         if bb_name in self._blocks:
             block = self._blocks[bb_name]
             pass
@@ -462,3 +478,77 @@ class Parser:
         if res is None:
             raise Exception("operation expected")
         return res
+
+    def parse_end_of_input(self) -> None:
+        if self._lexer.peek().kind != TokenKind.EOF:
+            raise Exception("end of input expected")
+
+    def _parse_module_header(self) -> None:
+        """Parse a module up to the beginning of its single block."""
+        op_name, _ = self._parse_op_name()
+        if op_name != ModuleOp.name:
+            raise Exception("Expected module as toplevel operation")
+        if self.parse_operands() or self.parse_successors():
+            raise Exception("Expected module without operands or successors")
+        if self.parse_op_attributes():
+            raise Exception("Expected module without attributes")
+        self.parse_char("{")
+        if self.peek_char("^"):
+            raise Exception("Expected module with a single unnamed block")
+
+    def parse_toplevel_ops(self) -> Iterator[Operation]:
+        """
+        Parse and yield operations one at a time, until no operation can be
+        parsed. The names of the SSA values and blocks are released after
+        each operation, so operations cannot use the results of previous
+        operations.
+        """
+        while (op := self.parse_optional_op()) is not None:
+            self._ssaValues = dict()
+            self._blocks = dict()
+            yield op
+
+    def parse_module_ops(self) -> Iterator[Operation]:
+        """
+        Parse a module, and yield its top-level operations one at a time,
+        without creating the module operation itself.
+        The names of the SSA values and blocks are released after each
+        top-level operation, so that the memory used by the parser is bounded
+        by the largest top-level operation. As a consequence, top-level
+        operations cannot use the results of previous top-level operations.
+        """
+        self._parse_module_header()
+        yield from self.parse_toplevel_ops()
+        self.parse_char("}")
+
+    def split_module_ops(self) -> list[tuple[int, int]]:
+        """
+        Parse the header of a module, and return the spans of its top-level
+        operations in the input, without parsing the operations.
+        Spans are only split after the last region of an operation, so an
+        operation without regions shares the span of the next operation.
+        """
+        self._parse_module_header()
+        spans = list[tuple[int, int]]()
+        start = self._lexer.pos
+        # The start of the first token of the current span
+        content_start = self._lexer.peek().start
+        depth = 0
+        while True:
+            token = self._lexer.next_brace()
+            if token.kind == TokenKind.EOF:
+                raise Exception("'}' expected")
+            if token.text == "{":
+                depth += 1
+            elif depth == 0:
+                break
+            else:
+                depth -= 1
+                next_token = self._lexer.peek()
+                if depth == 0 and next_token.text != "{":
+                    spans.append((start, token.end))
+                    start = token.end
+                    content_start = next_token.start
+        if content_start < token.start:
+            spans.append((start, token.start))
+        return spans
@@ -0,0 +1,257 @@
+"""
+Pass pipelines, with nested pipelines running on the operations of a given
+type, and an optional timing of each pass.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import IO, Callable
+
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.ir import MLContext, Operation
+
+Pass = Callable[[MLContext, Operation], None]
+"""A pass, applied on an operation in place."""
+
+
+def count_ops(op: Operation) -> int:
+    """Count the operations contained in an operation, including itself."""
+    num_ops = 0
+
+    def count(_: Operation) -> None:
+        nonlocal num_ops
+        num_ops += 1
+
+    op.walk(count)
+    return num_ops
+
+
+@dataclass(eq=False)
+class PassTiming:
+    """The timing of a pass or of a pipeline, summed over its runs."""
+
+    name: str
+    """The name of the pass or pipeline."""
+
+    wall_time: float = field(default=0.0)
+    """The elapsed time, in seconds."""
+
+    cpu_time: float = field(default=0.0)
+    """The CPU time of the process, in seconds."""
+
+    num_runs: int = field(default=0)
+    """The number of times the pass or pipeline was run."""
+
+    ops_delta: int = field(default=0)
+    """The change in the number of operations in the operations it ran on."""
+
+    children: list[PassTiming] = field(default_factory=list)
+    """The timings of the passes of a pipeline."""
+
+    def merge_children(self, other: PassTiming) -> None:
+        """Add the timings of the passes of another run of the pipeline."""
+        for idx, other_child in enumerate(other.children):
+            if idx == len(self.children):
+                self.children.append(PassTiming(other_child.name))
+            child = self.children[idx]
+            child.wall_time += other_child.wall_time
+            child.cpu_time += other_child.cpu_time
+            child.num_runs += other_child.num_runs
+            child.ops_delta += other_child.ops_delta
+            child.merge_children(other_child)
+
+
+@dataclass(eq=False)
+class PassManager:
+    """
+    A pipeline of passes running on operations of a given type.
+    A nested pass manager, created with `nest`, runs its passes on each
+    operation of its type directly nested in the regions of the operation
+    its parent runs on, such as each function of a module. These operations
+    can be processed by a pool of worker processes, as described in
+    `xdsl.parallel.run_pipeline_parallel`.
+    """
+
+    ctx: MLContext
+    """The context given to the passes."""
+
+    op_type: type[Operation] = field(default=ModuleOp)
+    """The type of the operations the passes run on."""
+
+    verify_each: bool = field(default=True)
+    """Verify the operation after each pass of the top-level pipeline."""
+
+    verify_incremental: bool = field(default=False)
+    """
+    Only verify the operations modified by each pass, with
+    `Operation.verify_incremental`, instead of the whole operation.
+    """
+
+    callback: Callable[[str, Operation], None] | None = field(default=None)
+    """
+    A function called with the name of each pass and its operation. It is
+    not supported in nested pipelines run by worker processes.
+    """
+
+    num_workers: int | None = field(default=1)
+    """
+    The number of worker processes running a nested pipeline, or None for
+    the number of CPUs. Pipelines with one worker run in the current
+    process.
+    """
+
+    passes: list[tuple[str, Pass | PassManager]] = field(default_factory=list,
+                                                         init=False)
+    """The passes and nested pipelines, with their names, in order."""
+
+    timing: PassTiming | None = field(default=None, init=False)
+    """The timing of the passes, if enabled."""
+
+    verifier_timing: PassTiming | None = field(default=None, init=False)
+    """The timing of the verification after each pass, if enabled."""
+
+    @property
+    def name(self) -> str:
+        """The name of the pipeline, which is the name of its operations."""
+        return f"'{self.op_type.name}' Pipeline"
+
+    def add_pass(self, name: str, pass_: Pass) -> None:
+        """Add a pass at the end of the pipeline."""
+        self.passes.append((name, pass_))
+
+    def nest(self,
+             op_type: type[Operation],
+             num_workers: int | None = 1) -> PassManager:
+        """
+        Add a nested pipeline at the end of the pipeline, running on the
+        operations of the given type in `num_workers` processes, and return
+        it. The pipeline should not have a callback if `num_workers` is not
+        1.
+        """
+        if self.callback is not None and num_workers != 1:
+            raise ValueError(
+                "Callbacks are not supported in nested pipelines run by "
+                "worker processes")
+        nested = PassManager(self.ctx,
+                             op_type,
+                             verify_each=False,
+                             callback=self.callback,
+                             num_workers=num_workers)
+        self.passes.append((nested.name, nested))
+        return nested
+
+    def enable_timing(self) -> None:
+        """Record the time spent in each pass, and the IR size changes."""
+        self.timing = PassTiming("Total")
+        self.verifier_timing = PassTiming("Verifier")
+
+    def run(self, op: Operation) -> None:
+        """Run the pipeline on an operation."""
+        if not isinstance(op, self.op_type):
+            raise ValueError(
+                f"Expected the pipeline to run on a {self.op_type.name} "
+                f"operation, but got {op.name}")
+        if self.timing is None:
+            self._run(op, None)
+            return
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        self._run(op, self.timing)
+        self.timing.wall_time += time.perf_counter() - wall_start
+        self.timing.cpu_time += time.process_time() - cpu_start
+        self.timing.num_runs += 1
+
+    def _run(self, op: Operation, timing: PassTiming | None) -> None:
+        if timing is not None:
+            for name, _ in self.passes[len(timing.children):]:
+                timing.children.append(PassTiming(name))
+        for idx, (name, pass_) in enumerate(self.passes):
+            if timing is None:
+                self._run_pass(pass_, op, None)
+            else:
+                pass_timing = timing.children[idx]
+                num_ops = count_ops(op)
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+                self._run_pass(pass_, op, pass_timing)
+                pass_timing.wall_time += time.perf_counter() - wall_start
+                pass_timing.cpu_time += time.process_time() - cpu_start
+                pass_timing.num_runs += 1
+                pass_timing.ops_delta += count_ops(op) - num_ops
+            if self.verify_each:
+                self._verify(op)
+            if self.callback is not None and not isinstance(
+                    pass_, PassManager):
+                self.callback(name, op)
+
+    def _run_pass(self, pass_: Pass | PassManager, op: Operation,
+                  timing: PassTiming | None) -> None:
+        if not isinstance(pass_, PassManager):
+            pass_(self.ctx, op)
+            return
+        # The operations are collected first, as the passes may modify the
+        # regions they are in
+        nested_ops = [
+            nested_op for region in op.regions for block in region.blocks
+            for nested_op in block.ops if isinstance(nested_op, pass_.op_type)
+        ]
+        if pass_.num_workers != 1 and len(nested_ops) > 1:
+            from xdsl.parallel import run_pipeline_parallel
+            run_pipeline_parallel(pass_, nested_ops, timing, pass_.num_workers)
+            return
+        for nested_op in nested_ops:
+            pass_._run(nested_op, timing)
+
+    def _verify(self, op: Operation) -> None:
+        verify = op.verify_incremental if self.verify_incremental else op.verify
+        if self.verifier_timing is None:
+            verify()
+            return
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        verify()
+        self.verifier_timing.wall_time += time.perf_counter() - wall_start
+        self.verifier_timing.cpu_time += time.process_time() - cpu_start
+        self.verifier_timing.num_runs += 1
+
+    def print_timing(self, stream: IO[str] = sys.stderr) -> None:
+        """Print the timing of the passes, in the format of MLIR."""
+        if self.timing is None:
+            raise ValueError("Pass timing is not enabled")
+        total = self.timing
+        rule = "===" + "-" * 73 + "==="
+        title = "... Execution time report ..."
+        print(rule, file=stream)
+        print(f"{title:^79}".rstrip(), file=stream)
+        print(rule, file=stream)
+        print(f"  Total Execution Time: {total.wall_time:.4f} seconds\n",
+              file=stream)
+        print(
+            "  ----User Time----  ----Wall Time----  ----IR Size----  "
+            "----Name----",
+            file=stream)
+
+        def percent(value: float, total_value: float) -> float:
+            return 100 * value / total_value if total_value else 0.0
+
+        def print_row(timing: PassTiming, depth: int, delta: str) -> None:
+            print(
+                f"  {timing.cpu_time:>8.4f} "
+                f"({percent(timing.cpu_time, total.cpu_time):5.1f}%)  "
+                f"{timing.wall_time:>8.4f} "
+                f"({percent(timing.wall_time, total.wall_time):5.1f}%)  "
+                f"{delta:>15}  {'  ' * depth}{timing.name}",
+                file=stream)
+
+        def print_rows(timings: list[PassTiming], depth: int) -> None:
+            for timing in timings:
+                print_row(timing, depth, f"{timing.ops_delta:+d}")
+                print_rows(timing.children, depth + 1)
+
+        print_rows(total.children, 0)
+        if self.verifier_timing is not None and self.verifier_timing.num_runs:
+            print_row(self.verifier_timing, 0, "")
+        print_row(total, 0, "")
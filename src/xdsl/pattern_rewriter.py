@@ -1,8 +1,13 @@
 from __future__ import annotations
 import inspect
+import json
+import sys
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Callable
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from typing import IO, Callable, Iterable, Iterator
 
 from xdsl.dialects.builtin import ModuleOp
 from xdsl.ir import (Operation, OpResult, Region, Block, BlockArgument,
@@ -34,25 +39,87 @@ class PatternRewriter:
     has_done_action: bool = field(default=False, init=False)
     """Has the rewriter done any action during the current match."""
 
+    num_created_ops: int = field(default=0, init=False)
+    """The number of operations inserted during the current match."""
+
+    num_erased_ops: int = field(default=0, init=False)
+    """The number of operations erased during the current match."""
+
+    _toplevel_object: Operation | Block | Region | None = field(default=None,
+                                                                init=False)
+    """The ancestor of the matched operation that has no parent, if known."""
+
+    _modifiable_blocks: dict[Block, bool] = field(default_factory=dict,
+                                                  init=False)
+    """
+    The blocks whose ancestor relation with the matched operation is known,
+    mapped to whether they are contained in the matched operation.
+    """
+
+    def reset(self, op: Operation) -> None:
+        """Reuse the rewriter to match another operation."""
+        self.current_operation = op
+        if self.has_done_action:
+            self.has_done_action = False
+            self.has_erased_matched_operation = False
+            self.num_created_ops = 0
+            self.num_erased_ops = 0
+            # New lists are used, as the previous ones may still be read
+            if self.added_operations_before:
+                self.added_operations_before = []
+            if self.added_operations_after:
+                self.added_operations_after = []
+        self._toplevel_object = None
+        if self._modifiable_blocks:
+            self._modifiable_blocks.clear()
+
+    def _can_modify(self, node: Operation | Block | Region) -> bool:
+        """
+        Check if an operation, block, or region, and its children can be
+        modified by this rewriter. They can if they are contained in the
+        matched operation, or if they are not attached to the IR of the
+        matched operation.
+        The parent chain is only walked until the matched operation, or a
+        block whose relation with it is known. Since the parent block of the
+        matched operation is known to be outside of it, checks do not
+        depend on the depth of the matched operation.
+        """
+        current = self.current_operation
+        modifiable_blocks = self._modifiable_blocks
+        if not modifiable_blocks and current.parent is not None:
+            modifiable_blocks[current.parent] = False
+        path = list[Block]()
+        while node is not current:
+            if isinstance(node, Block):
+                if (result := modifiable_blocks.get(node)) is not None:
+                    break
+                path.append(node)
+            if node.parent is None:
+                # Detached blocks and regions are not cached, as they may
+                # be attached anywhere afterwards
+                if not isinstance(node, Operation):
+                    return True
+                if self._toplevel_object is None:
+                    self._toplevel_object = current.get_toplevel_object()
+                return self._toplevel_object is not node
+            node = node.parent
+        else:
+            result = True
+        for block in path:
+            modifiable_blocks[block] = result
+        return result
+
     def _can_modify_op(self, op: Operation) -> bool:
         """Check if the operation and its children can be modified by this rewriter."""
-        if op == self.current_operation:
-            return True
-        if op.parent is None:
-            return self.current_operation.get_toplevel_object() is not op
-        return self._can_modify_block(op.parent)
+        return self._can_modify(op)
 
     def _can_modify_block(self, block: Block) -> bool:
         """Check if the block and its children can be modified by this rewriter."""
-        if block.parent is None:
-            return True  # Toplevel operation of current_operation is always a ModuleOp
-        return self._can_modify_region(block.parent)
+        return self._can_modify(block)
 
     def _can_modify_region(self, region: Region) -> bool:
         """Check if the region and its children can be modified by this rewriter."""
-        if region.parent is None:
-            return True  # Toplevel operation of current_operation is always a ModuleOp
-        return self._can_modify_op(region.parent)
+        return self._can_modify(region)
 
     def insert_op_before_matched_op(self, op: (Operation | list[Operation])):
         """Insert operations before the matched operation."""
@@ -64,9 +131,9 @@ class PatternRewriter:
         op = op if isinstance(op, list) else [op]
         if len(op) == 0:
             return
-        op_idx = block.get_operation_index(self.current_operation)
-        block.insert_op(op, op_idx)
+        block.insert_op_before(op, self.current_operation)
         self.added_operations_before += op
+        self.num_created_ops += len(op)
 
     def insert_op_after_matched_op(self, op: (Operation | list[Operation])):
         """Insert operations after the matched operation."""
@@ -78,9 +145,9 @@ class PatternRewriter:
         op = op if isinstance(op, list) else [op]
         if len(op) == 0:
             return
-        op_idx = block.get_operation_index(self.current_operation)
-        block.insert_op(op, op_idx + 1)
+        block.insert_op_after(op, self.current_operation)
         self.added_operations_after += op
+        self.num_created_ops += len(op)
 
     def insert_op_at_pos(self, op: Operation | list[Operation], block: Block,
                          pos: int):
@@ -92,6 +159,7 @@ class PatternRewriter:
         if len(op) == 0:
             return
         block.insert_op(op, pos)
+        self.num_created_ops += len(op)
 
     def insert_op_before(self, op: Operation | list[Operation],
                          target_op: Operation):
@@ -106,8 +174,8 @@ class PatternRewriter:
         op = op if isinstance(op, list) else [op]
         if len(op) == 0:
             return
-        target_op.parent.insert_op(op,
-                                   target_block.get_operation_index(target_op))
+        target_block.insert_op_before(op, target_op)
+        self.num_created_ops += len(op)
 
     def insert_op_after(self, op: Operation | list[Operation],
                         target_op: Operation):
@@ -122,9 +190,8 @@ class PatternRewriter:
         op = op if isinstance(op, list) else [op]
         if len(op) == 0:
             return
-        target_op.parent.insert_op(
-            op,
-            target_block.get_operation_index(target_op) + 1)
+        target_block.insert_op_after(op, target_op)
+        self.num_created_ops += len(op)
 
     def erase_matched_op(self, safe_erase: bool = True):
         """
@@ -135,6 +202,7 @@ class PatternRewriter:
         self.has_done_action = True
         self.has_erased_matched_operation = True
         Rewriter.erase_op(self.current_operation, safe_erase=safe_erase)
+        self.num_erased_ops += 1
 
     def erase_op(self, op: Operation, safe_erase: bool = True):
         """
@@ -150,6 +218,7 @@ class PatternRewriter:
                 "PatternRewriter can only erase operations that are the matched operation"
                 ", or that are contained in the matched operation.")
         Rewriter.erase_op(op, safe_erase=safe_erase)
+        self.num_erased_ops += 1
 
     def replace_matched_op(self,
                            new_ops: Operation | list[Operation],
@@ -170,6 +239,8 @@ class PatternRewriter:
                             new_results,
                             safe_erase=safe_erase)
         self.added_operations_before += new_ops
+        self.num_created_ops += len(new_ops)
+        self.num_erased_ops += 1
 
     def replace_op(self,
                    op: Operation,
@@ -191,6 +262,9 @@ class PatternRewriter:
                 "PatternRewriter can only replace operations that are the matched operation"
                 ", or that are contained in the matched operation.")
         Rewriter.replace_op(op, new_ops, new_results, safe_erase=safe_erase)
+        self.num_created_ops += len(new_ops) if isinstance(new_ops,
+                                                           list) else 1
+        self.num_erased_ops += 1
 
     def modify_block_argument_type(self, arg: BlockArgument,
                                    new_type: Attribute):
@@ -364,23 +438,154 @@ def op_type_rewrite_pattern(func):
 
     if not is_method:
 
+        @wraps(func)
         def op_type_rewrite_pattern_static_wrapper(
                 op: Operation, rewriter: PatternRewriter) -> None:
             if not isinstance(op, expected_type):
                 return None
             func(op, rewriter)
 
+        op_type_rewrite_pattern_static_wrapper.root_op_type = expected_type
         return op_type_rewrite_pattern_static_wrapper
 
+    @wraps(func)
     def op_type_rewrite_pattern_method_wrapper(
             self, op: Operation, rewriter: PatternRewriter) -> None:
         if not isinstance(op, expected_type):
             return None
         func(self, op, rewriter)
 
+    op_type_rewrite_pattern_method_wrapper.root_op_type = expected_type
     return op_type_rewrite_pattern_method_wrapper
 
 
+def get_root_op_type(pattern: RewritePattern) -> type[Operation] | None:
+    """
+    Get the operation type a pattern matches on, as declared with
+    `op_type_rewrite_pattern`, or None if the pattern may match any operation.
+    """
+    if isinstance(pattern, AnonymousRewritePattern):
+        return getattr(pattern.func, "root_op_type", None)
+    return getattr(pattern.match_and_rewrite, "root_op_type", None)
+
+
+def get_pattern_name(pattern: RewritePattern) -> str:
+    """
+    Get the name of a pattern, which is the name of its class, or of its
+    function for anonymous patterns.
+    """
+    if isinstance(pattern, AnonymousRewritePattern):
+        return pattern.func.__qualname__
+    return type(pattern).__qualname__
+
+
+@dataclass
+class PatternStatistics:
+    """The statistics of the rewrites done by a pattern."""
+
+    num_attempts: int = field(default=0)
+    """The number of operations the pattern was applied on."""
+
+    num_rewrites: int = field(default=0)
+    """The number of applications where the pattern modified the IR."""
+
+    num_created_ops: int = field(default=0)
+    """The number of operations inserted by the pattern."""
+
+    num_erased_ops: int = field(default=0)
+    """The number of operations erased by the pattern."""
+
+    time: float = field(default=0.0)
+    """The time spent in `match_and_rewrite`, in seconds."""
+
+
+@dataclass(eq=False)
+class RewriteStatistics:
+    """
+    Statistics of the rewrites done by each pattern, collected by the pattern
+    appliers, walkers and drivers while `collect` is active. Patterns are
+    identified by their name, and pattern appliers are not recorded
+    themselves, only the patterns they apply.
+    When no statistics are collected, the rewriters only check a global
+    variable once per matched operation.
+    """
+
+    patterns: dict[str, PatternStatistics] = field(default_factory=dict)
+    """The statistics of each pattern, indexed by pattern name."""
+
+    @contextmanager
+    def collect(self) -> Iterator[RewriteStatistics]:
+        """Collect the statistics of the rewrites done in the context."""
+        global _statistics
+        previous = _statistics
+        _statistics = self
+        try:
+            yield self
+        finally:
+            _statistics = previous
+
+    def apply(self, patterns: Iterable[RewritePattern], op: Operation,
+              rewriter: PatternRewriter) -> None:
+        """
+        Apply patterns in order until one modifies the IR, and record their
+        statistics.
+        """
+        for pattern in patterns:
+            if isinstance(
+                    pattern,
+                (GreedyRewritePatternApplier, IndexedRewritePatternApplier)):
+                pattern.match_and_rewrite(op, rewriter)
+                if rewriter.has_done_action:
+                    return
+                continue
+
+            name = get_pattern_name(pattern)
+            if (stats := self.patterns.get(name)) is None:
+                stats = self.patterns[name] = PatternStatistics()
+            num_created_ops = rewriter.num_created_ops
+            num_erased_ops = rewriter.num_erased_ops
+            stats.num_attempts += 1
+            start = time.perf_counter()
+            try:
+                pattern.match_and_rewrite(op, rewriter)
+            finally:
+                stats.time += time.perf_counter() - start
+            if rewriter.has_done_action:
+                stats.num_rewrites += 1
+                stats.num_created_ops += \
+                    rewriter.num_created_ops - num_created_ops
+                stats.num_erased_ops += \
+                    rewriter.num_erased_ops - num_erased_ops
+                return
+
+    def print_table(self, stream: IO[str] = sys.stdout) -> None:
+        """Print the statistics as a table, from the slowest pattern."""
+        rows = [(name, stats) for name, stats in self.patterns.items()]
+        rows.sort(key=lambda row: row[1].time, reverse=True)
+        width = max([len("Pattern")] + [len(name) for name, _ in rows])
+        print(
+            f"{'Pattern':<{width}} {'Attempts':>9} {'Rewrites':>9} "
+            f"{'Created':>8} {'Erased':>8} {'Time (ms)':>10}",
+            file=stream)
+        for name, stats in rows:
+            print(
+                f"{name:<{width}} {stats.num_attempts:>9} "
+                f"{stats.num_rewrites:>9} {stats.num_created_ops:>8} "
+                f"{stats.num_erased_ops:>8} {stats.time * 1e3:>10.3f}",
+                file=stream)
+
+    def to_json(self) -> str:
+        """Export the statistics as a JSON object indexed by pattern name."""
+        return json.dumps(
+            {name: asdict(stats)
+             for name, stats in self.patterns.items()},
+            indent=2)
+
+
+_statistics: RewriteStatistics | None = None
+"""The statistics being collected, if any."""
+
+
 @dataclass(eq=False, repr=False)
 class GreedyRewritePatternApplier(RewritePattern):
     """Apply a list of patterns in order until one pattern matches, and then use this rewrite."""
@@ -390,6 +595,8 @@ class GreedyRewritePatternApplier(RewritePattern):
 
     def match_and_rewrite(self, op: Operation,
                           rewriter: PatternRewriter) -> None:
+        if _statistics is not None:
+            return _statistics.apply(self.rewrite_patterns, op, rewriter)
         for pattern in self.rewrite_patterns:
             pattern.match_and_rewrite(op, rewriter)
             if rewriter.has_done_action:
@@ -397,6 +604,56 @@ class GreedyRewritePatternApplier(RewritePattern):
         return
 
 
+@dataclass(eq=False, repr=False)
+class IndexedRewritePatternApplier(RewritePattern):
+    """
+    Apply a list of patterns in order until one pattern matches, and then use
+    this rewrite. Unlike GreedyRewritePatternApplier, only the patterns that
+    can match the operation type are tried. Patterns are indexed by the
+    operation type declared with `op_type_rewrite_pattern`, and the other
+    patterns are tried on all operations.
+    The list of patterns should not be modified once the applier is used.
+    """
+
+    rewrite_patterns: list[RewritePattern]
+    """The list of rewrites to apply in order."""
+
+    _root_op_types: list[type[Operation] | None] = field(init=False)
+    """The operation type each pattern matches on, if declared."""
+
+    _candidates: dict[type[Operation],
+                      list[RewritePattern]] = field(default_factory=dict,
+                                                    init=False)
+    """The patterns to try, in order, for each operation type."""
+
+    def __post_init__(self):
+        self._root_op_types = [
+            get_root_op_type(pattern) for pattern in self.rewrite_patterns
+        ]
+
+    def candidate_patterns(self,
+                           op_type: type[Operation]) -> list[RewritePattern]:
+        """Get the patterns that can match operations of the given type."""
+        if (patterns := self._candidates.get(op_type)) is None:
+            patterns = self._candidates[op_type] = [
+                pattern for pattern, root_op_type in zip(
+                    self.rewrite_patterns, self._root_op_types)
+                if root_op_type is None or issubclass(op_type, root_op_type)
+            ]
+        return patterns
+
+    def match_and_rewrite(self, op: Operation,
+                          rewriter: PatternRewriter) -> None:
+        patterns = self.candidate_patterns(type(op))
+        if _statistics is not None:
+            return _statistics.apply(patterns, op, rewriter)
+        for pattern in patterns:
+            pattern.match_and_rewrite(op, rewriter)
+            if rewriter.has_done_action:
+                return
+        return
+
+
 @dataclass(eq=False, repr=False)
 class PatternRewriteWalker:
     """
@@ -418,60 +675,210 @@ class PatternRewriteWalker:
     walk_reverse: bool = field(default=False)
     """Walk the regions and blocks in reverse order. That way, all uses are replaced before the definitions."""
 
+    _rewriter: PatternRewriter | None = field(default=None, init=False)
+    """The rewriter, reset for each matched operation."""
+
     def rewrite_module(self, op: ModuleOp):
         """Rewrite an entire module operation."""
         self._rewrite_op(op)
 
-    def _rewrite_op(self, op: Operation) -> int:
+    def _rewrite_op(self, op: Operation) -> Operation | None:
         """
         Rewrite an operation, along with its regions.
-        Returns by how much operations the walker should move.
+        Returns the next operation the walker should rewrite in the block.
         """
+        # The neighbours of the operation cannot be modified by the rewriter,
+        # so they are used to find where the walk should continue.
+        block = op.parent
+        prev_op = op.prev_op
+        next_op = op.next_op
+
         # First, we rewrite the regions if needed
         if self.walk_regions_first:
             self._rewrite_op_regions(op)
 
         # We then match for a pattern in the current operation
-        rewriter = PatternRewriter(op)
-        self.pattern.match_and_rewrite(op, rewriter)
+        rewriter = self._rewriter
+        if rewriter is None:
+            rewriter = self._rewriter = PatternRewriter(op)
+        else:
+            rewriter.reset(op)
+        if _statistics is None:
+            self.pattern.match_and_rewrite(op, rewriter)
+        else:
+            _statistics.apply((self.pattern, ), op, rewriter)
 
         if rewriter.has_done_action:
+            # The pattern may have modified the operation in place
+            if not rewriter.has_erased_matched_operation:
+                op.mark_dirty()
             # If we produce new operations, we rewrite them recursively if requested
             if self.apply_recursively:
-                return len(rewriter.added_operations_before) + len(
-                    rewriter.added_operations_after) - int(
-                        rewriter.has_erased_matched_operation
-                    ) if self.walk_reverse else 0
+                if block is None:
+                    return None
+                if self.walk_reverse:
+                    return block.last_op if next_op is None else next_op.prev_op
+                return block.first_op if prev_op is None else prev_op.next_op
             # Else, we rewrite only their regions if they are supposed to be rewritten after
             else:
                 if not self.walk_regions_first:
+                    # The rewriter is reset while rewriting the regions
+                    added_operations_after = rewriter.added_operations_after
+                    has_erased_matched_operation = \
+                        rewriter.has_erased_matched_operation
                     for new_op in rewriter.added_operations_before:
                         self._rewrite_op_regions(new_op)
-                    if not rewriter.has_erased_matched_operation:
+                    if not has_erased_matched_operation:
                         self._rewrite_op_regions(op)
-                    for new_op in rewriter.added_operations_after:
+                    for new_op in added_operations_after:
                         self._rewrite_op_regions(new_op)
-                return -1 if self.walk_reverse else len(
-                    rewriter.added_operations_before) + len(
-                        rewriter.added_operations_after) + int(
-                            not rewriter.has_erased_matched_operation)
+                return prev_op if self.walk_reverse else next_op
 
         # Otherwise, we only rewrite the regions of the operation if needed
         if not self.walk_regions_first:
             self._rewrite_op_regions(op)
-        return -1 if self.walk_reverse else 1
+        return prev_op if self.walk_reverse else next_op
 
     def _rewrite_op_regions(self, op: Operation):
         """Rewrite the regions of an operation, and update the operation with the new regions."""
         if not self.walk_reverse:
             for region in op.regions:
                 for block in region.blocks:
-                    idx = 0
-                    while idx < len(block.ops):
-                        idx += self._rewrite_op(block.ops[idx])
+                    curr_op = block.first_op
+                    while curr_op is not None:
+                        curr_op = self._rewrite_op(curr_op)
         else:
             for region in op.regions:
                 for block in reversed(region.blocks):
-                    idx = len(block.ops) - 1
-                    while idx >= 0:
-                        idx += self._rewrite_op(block.ops[idx])
+                    curr_op = block.last_op
+                    while curr_op is not None:
+                        curr_op = self._rewrite_op(curr_op)
+
+
+@dataclass(eq=False, repr=False)
+class GreedyPatternRewriteDriver:
+    """
+    Rewrite the operations nested in an operation with a worklist, until no
+    pattern applies anymore.
+    The worklist is seeded with all nested operations, in preorder. Once a
+    pattern rewrites an operation, the operation if it still exists, the
+    users of its results, the operations defining its operands, and the
+    operations added before or after it, along with the users of their
+    results, are added back to the worklist. Since a pattern may also modify
+    operations that are not tracked this way, the walk is repeated until an
+    iteration does not rewrite anything, or until `max_iterations` or
+    `max_rewrites` is reached.
+    """
+
+    pattern: RewritePattern
+    """Pattern to apply."""
+
+    max_iterations: int = field(default=10)
+    """The maximum number of iterations over the whole IR."""
+
+    max_rewrites: int | None = field(default=None)
+    """
+    The maximum number of rewrites, if any. This bounds the rewrites of
+    patterns that would otherwise rewrite their own results indefinitely.
+    """
+
+    num_iterations: int = field(default=0, init=False)
+    """The number of iterations done by the last rewrite."""
+
+    num_rewrites: int = field(default=0, init=False)
+    """The number of rewrites done by the last rewrite."""
+
+    _worklist: list[Operation] = field(default_factory=list, init=False)
+    """The operations to rewrite, the last one being rewritten first."""
+
+    _in_worklist: set[Operation] = field(default_factory=set, init=False)
+    """The operations in the worklist, used to avoid duplicates."""
+
+    _rewriter: PatternRewriter | None = field(default=None, init=False)
+    """The rewriter, reset for each matched operation."""
+
+    def rewrite_module(self, op: ModuleOp) -> bool:
+        """
+        Rewrite an entire module operation.
+        Returns True if a fixpoint was reached.
+        """
+        return self.rewrite_op(op)
+
+    def rewrite_op(self, op: Operation) -> bool:
+        """
+        Rewrite the operations nested in an operation, but not the operation
+        itself. Returns True if a fixpoint was reached.
+        """
+        self.num_iterations = 0
+        self.num_rewrites = 0
+        changed = True
+        while changed and self.num_iterations < self.max_iterations and \
+                self.num_rewrites != self.max_rewrites:
+            self.num_iterations += 1
+            ops = list[Operation]()
+            for region in op.regions:
+                region.walk(ops.append)
+            for nested_op in reversed(ops):
+                self._add_to_worklist(nested_op)
+            changed = self._process_worklist()
+        self._worklist.clear()
+        self._in_worklist.clear()
+        return not changed
+
+    def _add_to_worklist(self, op: Operation) -> None:
+        if op not in self._in_worklist:
+            self._in_worklist.add(op)
+            self._worklist.append(op)
+
+    def _add_users_to_worklist(self, op: Operation) -> None:
+        for result in op.results:
+            for use in result.uses:
+                self._add_to_worklist(use.operation)
+
+    def _process_worklist(self) -> bool:
+        """Rewrite the operations in the worklist until it is empty."""
+        changed = False
+        worklist = self._worklist
+        in_worklist = self._in_worklist
+        while worklist:
+            if self.num_rewrites == self.max_rewrites:
+                return True
+            op = worklist.pop()
+            in_worklist.remove(op)
+            # Skip the operations that were erased
+            if op.parent is None:
+                continue
+
+            rewriter = self._rewriter
+            if rewriter is None:
+                rewriter = self._rewriter = PatternRewriter(op)
+            else:
+                rewriter.reset(op)
+            if _statistics is None:
+                self.pattern.match_and_rewrite(op, rewriter)
+            else:
+                _statistics.apply((self.pattern, ), op, rewriter)
+            if not rewriter.has_done_action:
+                continue
+            changed = True
+            self.num_rewrites += 1
+            # The pattern may have modified the operation in place
+            if not rewriter.has_erased_matched_operation:
+                op.mark_dirty()
+
+            # The operand slots of an erased operation still refer to its
+            # former operands
+            for operand in op.operands:
+                if isinstance(operand, OpResult):
+                    self._add_to_worklist(operand.op)
+            new_ops = rewriter.added_operations_before + \
+                rewriter.added_operations_after
+            if not rewriter.has_erased_matched_operation:
+                new_ops.append(op)
+            for new_op in reversed(new_ops):
+                self._add_users_to_worklist(new_op)
+                nested_ops = list[Operation]()
+                new_op.walk(nested_ops.append)
+                for nested_op in reversed(nested_ops):
+                    self._add_to_worklist(nested_op)
+        return changed
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
 from xdsl.diagnostic import Diagnostic
-from typing import TypeVar, Any, Dict, Optional, List
+from typing import ClassVar, TypeAlias, TypeVar, Any, Dict, Optional, List
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from xdsl.ir import (SSAValue, Block, Callable, Attribute, Region, Operation)
 from xdsl.dialects.builtin import (IntegerType, StringAttr, FlatSymbolRefAttr,
                                    IntegerAttr, ArrayAttr,
-                                   ParametrizedAttribute, IntAttr)
+                                   ParametrizedAttribute, IntAttr, ModuleOp)
 from xdsl.irdl import Data
 
 indentNumSpaces = 2
 
+_AttributeT = TypeVar('_AttributeT', bound=Attribute)
+
+AttributePrinter: TypeAlias = "Callable[[Printer, Any], None]"
+"""A function printing an attribute with a printer."""
+
+_FLUSH_SIZE = 8192
+"""The number of buffered fragments after which the printer flushes."""
+
 
 @dataclass(eq=False, repr=False)
 class Printer:
@@ -21,14 +30,48 @@ class Printer:
     print_operand_types: bool = field(default=True)
     print_result_types: bool = field(default=True)
     diagnostic: Diagnostic = field(default_factory=Diagnostic)
+    attribute_cache_size: int = field(default=1024)
+    """
+    The maximal number of rendered attributes kept in the attribute cache.
+    A size of 0 disables the cache.
+    """
+    attribute_cache_hits: int = field(default=0, init=False)
+    """The number of attributes printed from the attribute cache."""
+    attribute_cache_misses: int = field(default=0, init=False)
+    """The number of attributes rendered and added to the attribute cache."""
+    _attribute_cache: OrderedDict[Attribute,
+                                  str] = field(default_factory=OrderedDict,
+                                               init=False)
+    """The rendered text of attributes, in least recently used order."""
+    _attribute_cache_generation: int = field(default=0, init=False)
+    """
+    The generation of the attribute printers the attribute cache was filled
+    with.
+    """
+    local_ssa_names: bool = field(default=False)
+    """
+    Number the SSA values and blocks of each top-level operation of a module
+    independently, so that the text of a top-level operation does not depend
+    on the operations printed before it. Top-level operations should then not
+    use the results of other top-level operations.
+    """
+    _printed_ops: Dict[Operation, str] = field(default_factory=dict,
+                                               init=False)
+    """The text of operations that were already printed elsewhere."""
     _indent: int = field(default=0, init=False)
     _ssa_values: Dict[SSAValue, str] = field(default_factory=dict, init=False)
     _ssa_names: Dict[str, int] = field(default_factory=dict, init=False)
     _block_names: Dict[Block, int] = field(default_factory=dict, init=False)
     _next_valid_name_id: int = field(default=0, init=False)
     _next_valid_block_id: int = field(default=0, init=False)
-    _current_line: int = field(default=0, init=False)
-    _current_column: int = field(default=0, init=False)
+    _column: int = field(default=0, init=False)
+    """The current column, or the column at the start of the buffer."""
+    _buffer: Optional[List[str]] = field(default=None, init=False)
+    """
+    The fragments printed since the last flush, when printing an operation.
+    Columns are not tracked while buffering, and are only computed from the
+    buffer when needed for messages.
+    """
     _next_line_callback: List[Callable[[], None]] = field(default_factory=list,
                                                           init=False)
 
@@ -53,14 +96,39 @@ class Printer:
             self.print_string(text)
 
     def print_string(self, text) -> None:
-        lines = text.split('\n')
-        if len(lines) != 1:
-            self._current_line += len(lines) - 1
-            self._current_column = len(lines[-1])
-        else:
-            self._current_column += len(lines[-1])
+        if self._buffer is not None:
+            self._buffer.append(text)
+            return
+        self._column = self._column_after(text, self._column)
         print(text, end='', file=self.stream)
 
+    @staticmethod
+    def _column_after(text: str, column: int) -> int:
+        """The column after printing `text` from `column`."""
+        newline_idx = text.rfind('\n')
+        if newline_idx == -1:
+            return column + len(text)
+        return len(text) - newline_idx - 1
+
+    @property
+    def _current_column(self) -> int:
+        if self._buffer is None:
+            return self._column
+        column = 0
+        for text in reversed(self._buffer):
+            newline_idx = text.rfind('\n')
+            if newline_idx != -1:
+                return column + len(text) - newline_idx - 1
+            column += len(text)
+        return self._column + column
+
+    def _flush(self) -> None:
+        """Write the buffered fragments to the stream."""
+        if self._buffer:
+            self._column = self._current_column
+            print("".join(self._buffer), end='', file=self.stream)
+            self._buffer.clear()
+
     def _add_message_on_next_line(self, message: str, begin_pos: int,
                                   end_pos: int):
         """Add a message that will be displayed on the next line."""
@@ -80,18 +148,18 @@ class Printer:
         """
         indent = self._indent if indent is None else indent
         indent_size = indent * indentNumSpaces
-        self.print(" " * indent_size)
+        self.print_string(" " * indent_size)
         message_end_pos = max(map(len, message.split("\n"))) + indent_size + 2
         first_line = (begin_pos - indent_size) * "-" + (
             end_pos - begin_pos) * "^" + (max(message_end_pos, end_pos) -
                                           end_pos) * "-"
-        self.print(first_line)
+        self.print_string(first_line)
         self._print_new_line(indent=indent, print_message=False)
         for message_line in message.split("\n"):
-            self.print("| ")
-            self.print(message_line)
+            self.print_string("| ")
+            self.print_string(message_line)
             self._print_new_line(indent=indent, print_message=False)
-        self.print("-" * (max(message_end_pos, end_pos) - indent_size))
+        self.print_string("-" * (max(message_end_pos, end_pos) - indent_size))
         self._print_new_line(indent=0, print_message=False)
 
     T = TypeVar('T')
@@ -102,17 +170,26 @@ class Printer:
             return
         print_fn(elems[0])
         for elem in elems[1:]:
-            self.print(", ")
+            self.print_string(", ")
             print_fn(elem)
 
     def _print_new_line(self, indent=None, print_message=True) -> None:
         indent = self._indent if indent is None else indent
-        self.print("\n")
-        if print_message:
+        self.print_string("\n")
+        if print_message and self._next_line_callback:
             for callback in self._next_line_callback:
                 callback()
             self._next_line_callback = []
-        self.print(" " * indent * indentNumSpaces)
+        self.print_string(" " * indent * indentNumSpaces)
+        if self._buffer is not None and len(self._buffer) >= _FLUSH_SIZE:
+            self._flush()
+
+    def _reset_names(self) -> None:
+        self._ssa_values.clear()
+        self._ssa_names.clear()
+        self._block_names.clear()
+        self._next_valid_name_id = 0
+        self._next_valid_block_id = 0
 
     def _get_new_valid_name_id(self) -> str:
         self._next_valid_name_id += 1
@@ -123,10 +200,9 @@ class Printer:
         return self._next_valid_block_id - 1
 
     def _print_result_value(self, op: Operation, idx: int) -> None:
-        val = op.results[idx]
-        self.print("%")
-        if val in self._ssa_values.keys():
-            name = self._ssa_values[val]
+        val = op._results[idx]
+        if (name := self._ssa_values.get(val)) is not None:
+            pass
         elif val.name:
             curr_ind = self._ssa_names.get(val.name, 0)
             name = val.name + (str(curr_ind) if curr_ind != 0 else "")
@@ -135,13 +211,15 @@ class Printer:
         else:
             name = self._get_new_valid_name_id()
             self._ssa_values[val] = name
-        self.print("%s" % name)
+        self.print_string(f"%{name}")
         if self.print_result_types:
-            self.print(" : ")
+            self.print_string(" : ")
             self.print_attribute(val.typ)
 
     def _print_results(self, op: Operation) -> None:
-        results = op.results
+        # The private field is read, so that printing does not allocate the
+        # empty containers of the operation
+        results = op._results
         # No results
         if len(results) == 0:
             return
@@ -149,23 +227,23 @@ class Printer:
         # One result
         if len(results) == 1:
             self._print_result_value(op, 0)
-            self.print(" = ")
+            self.print_string(" = ")
             return
 
         # Multiple results
-        self.print("(")
+        self.print_string("(")
         self._print_result_value(op, 0)
         for idx in range(1, len(results)):
-            self.print(", ")
+            self.print_string(", ")
             self._print_result_value(op, idx)
-        self.print(") = ")
+        self.print_string(") = ")
 
     def print_ssa_value(self, value: SSAValue) -> None:
         if ssa_val := self._ssa_values.get(value):
-            self.print(f"%{ssa_val}")
+            self.print_string(f"%{ssa_val}")
         else:
             begin_pos = self._current_column
-            self.print("%<UNKNOWN>")
+            self.print_string("%<UNKNOWN>")
             end_pos = self._current_column
             self._add_message_on_next_line(
                 "ERROR: SSAValue is not part of the IR, are you sure all operations are added before their uses?",
@@ -175,7 +253,7 @@ class Printer:
         self.print_ssa_value(operand)
 
         if self.print_operand_types:
-            self.print(" : ")
+            self.print_string(" : ")
             self.print_attribute(operand.typ)
 
     def _print_ops(self, ops: List[Operation]) -> None:
@@ -188,46 +266,44 @@ class Printer:
             self._print_new_line()
 
     def print_block_name(self, block: Block) -> None:
-        self.print("^")
         if block not in self._block_names:
             self._block_names[block] = self._get_new_valid_block_id()
-        self.print(self._block_names[block])
+        self.print_string(f"^{self._block_names[block]}")
 
     def _print_named_block(self, block: Block) -> None:
         self.print_block_name(block)
         if len(block.args) > 0:
-            self.print("(")
+            self.print_string("(")
             self.print_list(block.args, self._print_block_arg)
-            self.print(")")
-        self.print(":")
+            self.print_string(")")
+        self.print_string(":")
         if len(block.ops) > 0:
             self._print_ops(block.ops)
         else:
             self._print_new_line()
 
     def _print_block_arg(self, arg: BlockArgument) -> None:
-        self.print("%")
         name = self._get_new_valid_name_id()
         self._ssa_values[arg] = name
-        self.print("%s : " % name)
+        self.print_string(f"%{name} : ")
         self.print_attribute(arg.typ)
 
     def print_region(self, region: Region) -> None:
         if len(region.blocks) == 0:
-            self.print(" {}")
+            self.print_string(" {}")
             return
 
         if len(region.blocks) == 1 and len(region.blocks[0].args) == 0:
-            self.print(" {")
+            self.print_string(" {")
             self._print_ops(region.blocks[0].ops)
-            self.print("}")
+            self.print_string("}")
             return
 
-        self.print(" {")
+        self.print_string(" {")
         self._print_new_line()
         for block in region.blocks:
             self._print_named_block(block)
-        self.print("}")
+        self.print_string("}")
 
     def print_regions(self, regions: List[Region]) -> None:
         for region in regions:
@@ -235,98 +311,207 @@ class Printer:
 
     def _print_operands(self, operands: FrozenList[SSAValue]) -> None:
         if len(operands) == 0:
-            self.print("()")
+            self.print_string("()")
             return
 
-        self.print("(")
+        self.print_string("(")
         self._print_operand(operands[0])
         for operand in operands[1:]:
-            self.print(", ")
+            self.print_string(", ")
             self._print_operand(operand)
-        self.print(")")
+        self.print_string(")")
 
-    def print_attribute(self, attribute: Attribute) -> None:
-        if isinstance(attribute, IntegerType):
-            width = attribute.parameters[0]
-            assert isinstance(width, IntAttr)
-            self.print(f'!i{width.data}')
-            return
+    _attribute_printers: ClassVar[dict[type[Attribute], AttributePrinter]] = {}
+    """The printer of each attribute class, resolved on its first use."""
 
-        if isinstance(attribute, StringAttr):
-            self.print(f'"{attribute.data}"')
-            return
+    _custom_attribute_printers: ClassVar[dict[type[Attribute],
+                                              AttributePrinter]] = {}
+    """The printers registered for attribute classes and their subclasses."""
 
-        if isinstance(attribute, FlatSymbolRefAttr):
-            self.print(f'@{attribute.parameters[0].data}')
-            return
+    _attribute_printers_generation: ClassVar[int] = 0
+    """
+    The number of changes to the registered printers, so that the attribute
+    caches filled with other printers are cleared.
+    """
 
-        if isinstance(attribute, IntegerAttr):
-            width = attribute.parameters[0]
-            typ = attribute.parameters[1]
-            assert (isinstance(width, IntAttr))
-            self.print(width.data)
-            self.print(" : ")
-            self.print_attribute(typ)
-            return
+    @classmethod
+    def register_attribute_printer(
+            cls, attr_type: type[_AttributeT],
+            printer: Callable[[Printer, _AttributeT], None]) -> None:
+        """
+        Register a custom printer for an attribute class and its subclasses,
+        replacing the default `!name<...>` format.
+        """
+        cls._custom_attribute_printers[attr_type] = printer
+        cls._invalidate_attribute_printers(attr_type)
 
-        if isinstance(attribute, ArrayAttr):
-            self.print_string("[")
-            self.print_list(attribute.data, self.print_attribute)
-            self.print_string("]")
-            return
+    @classmethod
+    def unregister_attribute_printer(cls, attr_type: type[Attribute]) -> None:
+        """
+        Remove the custom printer registered for an attribute class, so that
+        it is printed again with the printer of its closest base class.
+        """
+        del cls._custom_attribute_printers[attr_type]
+        cls._invalidate_attribute_printers(attr_type)
+
+    @classmethod
+    def _invalidate_attribute_printers(cls,
+                                       attr_type: type[Attribute]) -> None:
+        """
+        Resolve the printers of the subclasses again on their next use, and
+        clear the rendered attributes of all printers.
+        """
+        Printer._attribute_printers_generation += 1
+        for resolved_type in list(cls._attribute_printers):
+            if issubclass(resolved_type, attr_type):
+                del cls._attribute_printers[resolved_type]
+
+    @classmethod
+    def get_attribute_printer(cls,
+                              attr_type: type[Attribute]) -> AttributePrinter:
+        """
+        Get the printer of an attribute class. This is the custom printer of
+        the closest class in its MRO, or the default printer.
+        """
+        if (printer := cls._attribute_printers.get(attr_type)) is not None:
+            return printer
+        for base in attr_type.__mro__:
+            if (printer :=
+                    cls._custom_attribute_printers.get(base)) is not None:
+                break
+        else:
+            if issubclass(attr_type, Data):
+                printer = Printer._print_data
+            else:
+                printer = Printer._print_parametrized_attribute
+        cls._attribute_printers[attr_type] = printer
+        return printer
 
-        if isinstance(attribute, Data):
-            self.print(f'!{attribute.name}<')
-            attribute.print_parameter(attribute.data, self)
-            self.print(">")
+    def print_attribute(self, attribute: Attribute) -> None:
+        if not self.attribute_cache_size:
+            self._render_attribute(attribute)
             return
 
-        assert isinstance(attribute, ParametrizedAttribute)
+        cache = self._attribute_cache
+        if (self._attribute_cache_generation !=
+                Printer._attribute_printers_generation):
+            cache.clear()
+            self._attribute_cache_generation = (
+                Printer._attribute_printers_generation)
+        try:
+            text = cache.get(attribute)
+        except TypeError:
+            # Attributes with unhashable data are not cached
+            self._render_attribute(attribute)
+            return
+        if text is not None:
+            self.attribute_cache_hits += 1
+            cache.move_to_end(attribute)
+            self.print_string(text)
+            return
 
-        self.print(f'!{attribute.name}')
+        self.attribute_cache_misses += 1
+        buffer = self._buffer
+        self._buffer = []
+        try:
+            self._render_attribute(attribute)
+            text = "".join(self._buffer)
+        finally:
+            self._buffer = buffer
+        cache[attribute] = text
+        if len(cache) > self.attribute_cache_size:
+            cache.popitem(last=False)
+        self.print_string(text)
+
+    def _render_attribute(self, attribute: Attribute) -> None:
+        printer = self._attribute_printers.get(type(attribute))
+        if printer is None:
+            printer = self.get_attribute_printer(type(attribute))
+        printer(self, attribute)
+
+    def _print_data(self, attribute: Data[Any]) -> None:
+        self.print_string(f'!{attribute.name}<')
+        attribute.print_parameter(attribute.data, self)
+        self.print_string(">")
+
+    def _print_parametrized_attribute(
+            self, attribute: ParametrizedAttribute) -> None:
+        self.print_string(f'!{attribute.name}')
         if len(attribute.parameters) != 0:
-            self.print("<")
+            self.print_string("<")
             self.print_list(attribute.parameters, self.print_attribute)
-            self.print(">")
+            self.print_string(">")
+
+    def _print_integer_type(self, attribute: IntegerType) -> None:
+        width = attribute.parameters[0]
+        assert isinstance(width, IntAttr)
+        self.print_string(f'!i{width.data}')
+
+    def _print_string_attr(self, attribute: StringAttr) -> None:
+        self.print_string(f'"{attribute.data}"')
+
+    def _print_flat_symbol_ref_attr(self,
+                                    attribute: FlatSymbolRefAttr) -> None:
+        self.print_string(f'@{attribute.parameters[0].data}')
+
+    def _print_integer_attr(self, attribute: IntegerAttr[Any]) -> None:
+        width = attribute.parameters[0]
+        typ = attribute.parameters[1]
+        assert (isinstance(width, IntAttr))
+        self.print_string(f"{width.data} : ")
+        self.print_attribute(typ)
+
+    def _print_array_attr(self, attribute: ArrayAttr[Any]) -> None:
+        self.print_string("[")
+        self.print_list(attribute.data, self.print_attribute)
+        self.print_string("]")
 
     def print_successors(self, successors: List[Block]):
         if len(successors) == 0:
             return
-        self.print(" (")
+        self.print_string(" (")
         self.print_list(successors, self.print_block_name)
-        self.print(")")
+        self.print_string(")")
 
     def _print_op_attributes(self, attributes: Dict[str, Attribute]) -> None:
         if len(attributes) == 0:
             return
 
-        self.print(" ")
-        self.print("[")
+        self.print_string(" [")
 
         attribute_list = [p for p in attributes.items()]
-        self.print("\"%s\" = " % attribute_list[0][0])
+        self.print_string("\"%s\" = " % attribute_list[0][0])
         self.print_attribute(attribute_list[0][1])
         for (attr_name, attr) in attribute_list[1:]:
-            self.print(", \"%s\" = " % attr_name)
+            self.print_string(", \"%s\" = " % attr_name)
             self.print_attribute(attr)
-        self.print("]")
+        self.print_string("]")
 
     def print_op_with_default_format(self, op: Operation) -> None:
         self._print_operands(op.operands)
-        self.print_successors(op.successors)
-        self._print_op_attributes(op.attributes)
-        self.print_regions(op.regions)
+        # The private fields are read, so that printing does not allocate
+        # the empty containers of the operation
+        self.print_successors(op._successors)
+        self._print_op_attributes(op._attributes or {})
+        self.print_regions(op._regions)
 
     def _print_op(self, op: Operation) -> None:
-        begin_op_pos = self._current_column
+        if self._printed_ops and (text := self._printed_ops.get(op)):
+            self.print_string(text)
+            return
+        if self.local_ssa_names and isinstance(op.parent_op(), ModuleOp):
+            self._reset_names()
+        messages = self.diagnostic.op_messages.get(op)
+        if messages:
+            begin_op_pos = self._current_column
         self._print_results(op)
         if self.print_generic_format:
-            self.print(f'"{op.name}"')
+            self.print_string(f'"{op.name}"')
         else:
-            self.print(op.name)
-        end_op_pos = self._current_column
-        if op in self.diagnostic.op_messages:
-            for message in self.diagnostic.op_messages[op]:
+            self.print_string(op.name)
+        if messages:
+            end_op_pos = self._current_column
+            for message in messages:
                 self._add_message_on_next_line(message, begin_op_pos,
                                                end_op_pos)
         if self.print_generic_format:
@@ -334,6 +519,57 @@ class Printer:
         else:
             op.print(self)
 
-    def print_op(self, op: Operation) -> None:
-        self._print_op(op)
-        self._print_new_line()
+    def print_op(self,
+                 op: Operation,
+                 printed_ops: Dict[Operation, str] | None = None) -> None:
+        """
+        Print an operation. The nested operations in `printed_ops` are not
+        printed again, and their text, as returned by `print_op_to_string`,
+        is used instead.
+        """
+        if printed_ops:
+            self._printed_ops = printed_ops
+            try:
+                self.print_op(op)
+            finally:
+                self._printed_ops = {}
+            return
+
+        if self._buffer is not None:
+            self._print_op(op)
+            self._print_new_line()
+            return
+
+        # Buffer the printed fragments, and write them in large blocks
+        self._buffer = []
+        try:
+            self._print_op(op)
+            self._print_new_line()
+        finally:
+            self._flush()
+            self._buffer = None
+
+    def print_op_to_string(self, op: Operation, indent: int = 0) -> str:
+        """
+        Print an operation to a string rather than to the stream, as if it
+        was nested `indent` times, and without a trailing new line. The SSA
+        values and blocks are numbered from zero, so that the text of the
+        operation does not depend on the operations printed before it.
+        """
+        buffer, self._buffer = self._buffer, []
+        outer_indent, self._indent = self._indent, indent
+        self._reset_names()
+        try:
+            self._print_op(op)
+            return "".join(self._buffer)
+        finally:
+            self._buffer = buffer
+            self._indent = outer_indent
+
+
+Printer.register_attribute_printer(IntegerType, Printer._print_integer_type)
+Printer.register_attribute_printer(StringAttr, Printer._print_string_attr)
+Printer.register_attribute_printer(FlatSymbolRefAttr,
+                                   Printer._print_flat_symbol_ref_attr)
+Printer.register_attribute_printer(IntegerAttr, Printer._print_integer_attr)
+Printer.register_attribute_printer(ArrayAttr, Printer._print_array_attr)
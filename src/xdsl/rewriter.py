@@ -50,12 +50,11 @@ class Rewriter:
             else:
                 old_result.replace_by(new_result)
 
-        op_idx = block.get_operation_index(op)
-        block.erase_op(op_idx, safe_erase=safe_erase)
         if len(op.results) == 0:
-            block.insert_op(new_ops, op_idx)
-            return
-        block.insert_op(new_ops, op_idx, op.results[0].name)
+            block.insert_op_before(new_ops, op)
+        else:
+            block.insert_op_before(new_ops, op, op.results[0].name)
+        block.erase_op(op, safe_erase=safe_erase)
 
     @staticmethod
     def inline_block_at_pos(block: Block, target_block: Block, pos: int):
@@ -64,6 +63,21 @@ class Rewriter:
         This block should not be a parent of the block to move to.
         The block operations should not use the block arguments.
         """
+        if pos < 0 or pos > len(target_block.ops):
+            raise ValueError(
+                f"Can't insert operation in index {pos} in a block with {len(target_block.ops)} operations."
+            )
+        next_op = None if pos == len(
+            target_block.ops) else target_block.ops[pos]
+        Rewriter._inline_block_ops(block, target_block, next_op)
+
+    @staticmethod
+    def _inline_block_ops(block: Block, target_block: Block,
+                          next_op: Operation | None):
+        """
+        Move the block operations before `next_op` in another block,
+        or at its end if `next_op` is None.
+        """
         if block.is_ancestor(target_block):
             raise Exception("Cannot inline a block in a child block.")
         for op in block.ops:
@@ -76,7 +90,10 @@ class Rewriter:
         ops = block.ops.copy()
         for op in ops:
             op.detach()
-        target_block.insert_op(ops, pos)
+        if next_op is None:
+            target_block.add_ops(ops)
+        else:
+            target_block.insert_op_before(ops, next_op)
 
     @staticmethod
     def inline_block_before(block: Block, op: Operation):
@@ -88,9 +105,7 @@ class Rewriter:
         if op.parent is None:
             raise Exception(
                 "Cannot inline a block before a toplevel operation")
-        op_block = op.parent
-        op_pos = op_block.get_operation_index(op)
-        Rewriter.inline_block_at_pos(block, op_block, op_pos)
+        Rewriter._inline_block_ops(block, op.parent, op)
 
     @staticmethod
     def inline_block_after(block: Block, op: Operation):
@@ -102,9 +117,7 @@ class Rewriter:
         if op.parent is None:
             raise Exception(
                 "Cannot inline a block before a toplevel operation")
-        op_block = op.parent
-        op_pos = op_block.get_operation_index(op)
-        Rewriter.inline_block_at_pos(block, op_block, op_pos + 1)
+        Rewriter._inline_block_ops(block, op.parent, op.next_op)
 
     @staticmethod
     def insert_block_after(block: Block | List[Block], target: Block):
@@ -144,4 +157,5 @@ class Rewriter:
             block.parent = None
             new_region.add_block(block)
         region.blocks = []
+        region._mark_parent_dirty()
         return new_region
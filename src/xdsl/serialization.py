@@ -0,0 +1,449 @@
+"""
+Compact serialization of operations.
+
+Operations are encoded as a flat stream of integers, in preorder, which
+refers to tables of operation types, attributes and strings. Each table
+entry appears once, so that structurally equal attributes are only stored
+once. The serialized form can be pickled cheaply, and is used to send
+operations between processes.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from xdsl.ir import (Attribute, Block, MLContext, OpResult, Operation, Region,
+                     SSAValue)
+
+
+@dataclass
+class SerializedOps:
+    """
+    A list of operations, a region, or a block, serialized with
+    `serialize_ops`, `serialize_region`, or `serialize_block`.
+    """
+
+    op_types: list[type[Operation]] = field(default_factory=list)
+    """The operation types used by the operations."""
+
+    attributes: list[Attribute] = field(default_factory=list)
+    """The attributes and types used by the operations."""
+
+    strings: list[str] = field(default_factory=list)
+    """The attribute names and SSA value names used by the operations."""
+
+    stream: array[int] = field(default_factory=lambda: array("I"))
+    """
+    The operations in preorder. Each operation is encoded as:
+    - its type index, and its number of operands followed by their operand
+      indices,
+    - its number of successors followed by their block indices,
+    - its number of attributes followed by pairs of name and attribute
+      indices,
+    - its number of results followed by pairs of type and name indices,
+    - its number of regions, each encoded as a number of blocks followed by
+      the blocks. A block is encoded as its index, its number of arguments
+      followed by pairs of type and name indices, and its number of
+      operations followed by the operations.
+    Names are encoded as 0 if they are not set, and as their string index
+    plus one otherwise. Values are numbered in the order of their
+    definition, and blocks in the order of their first appearance. The
+    results of an operation are defined after its regions. An operand
+    index is twice the value index for a value defined before its use, and
+    twice the forward reference index plus one otherwise.
+    A list of operations starts with the number of operations.
+    """
+
+    forward_refs: list[tuple[int, int]] = field(default_factory=list)
+    """
+    The value and type indices of the values used before their definition
+    in preorder, such as values defined in a block that dominates their use
+    but appears after it in its region.
+    """
+
+    external_values: dict[int, SSAValue] = field(default_factory=dict)
+    """
+    The values used by the operations but defined outside of them, by
+    forward reference index. Their value index is -1. These are only
+    allowed when requested, as when pickling operations, and are kept as
+    references to the original values.
+    """
+
+
+@dataclass(slots=True)
+class _ForwardRef(SSAValue):
+    """
+    A placeholder for a value used before its definition, which is replaced
+    by the value once it is decoded.
+    """
+
+    def __hash__(self) -> int:
+        return id(self)
+
+
+class _Encoder:
+
+    def __init__(self, allow_external: bool = False):
+        self.data = SerializedOps()
+        self.allow_external = allow_external
+        self.op_type_indices: dict[type[Operation], int] = {}
+        self.attr_indices: dict[Attribute, int] = {}
+        self.string_indices: dict[str, int] = {}
+        # Values and blocks are indexed by their identity
+        self.value_indices: dict[int, int] = {}
+        self.block_indices: dict[int, int] = {}
+        # The values used before their definition, with their forward
+        # reference index
+        self.forward_values: dict[int, tuple[int, SSAValue]] = {}
+
+    def encode_op_type(self, op_type: type[Operation]) -> int:
+        if (index := self.op_type_indices.get(op_type)) is None:
+            index = self.op_type_indices[op_type] = len(self.data.op_types)
+            self.data.op_types.append(op_type)
+        return index
+
+    def encode_attr(self, attr: Attribute) -> int:
+        if (index := self.attr_indices.get(attr)) is None:
+            index = self.attr_indices[attr] = len(self.data.attributes)
+            self.data.attributes.append(attr)
+        return index
+
+    def encode_string(self, string: str) -> int:
+        if (index := self.string_indices.get(string)) is None:
+            index = self.string_indices[string] = len(self.data.strings)
+            self.data.strings.append(string)
+        return index
+
+    def encode_name(self, name: str | None) -> int:
+        return 0 if name is None else self.encode_string(name) + 1
+
+    def encode_forward_ref(self, value: SSAValue) -> int:
+        if (entry := self.forward_values.get(id(value))) is None:
+            entry = self.forward_values[id(value)] = (len(self.forward_values),
+                                                      value)
+        return entry[0] * 2 + 1
+
+    def resolve_forward_refs(self) -> None:
+        """
+        Record the value indices of the values used before their definition.
+        This should be called once all operations are encoded.
+        """
+        for ref, value in self.forward_values.values():
+            if (index := self.value_indices.get(id(value))) is None:
+                if not self.allow_external:
+                    raise ValueError(f"Operand {value} is not defined in the "
+                                     "serialized operations")
+                self.data.external_values[ref] = value
+                index = -1
+            self.data.forward_refs.append((index, self.encode_attr(value.typ)))
+
+    def encode_block(self, block: Block) -> int:
+        if (index := self.block_indices.get(id(block))) is None:
+            index = self.block_indices[id(block)] = len(self.block_indices)
+        return index
+
+    def define_values(self, values: Sequence[SSAValue]) -> None:
+        value_indices = self.value_indices
+        for value in values:
+            value_indices[id(value)] = len(value_indices)
+
+    def encode_op(self, op: Operation) -> None:
+        stream = self.data.stream
+        append = stream.append
+        append(self.encode_op_type(type(op)))
+        operands = op.operands
+        append(len(operands))
+        value_indices = self.value_indices
+        for operand in operands:
+            if (index := value_indices.get(id(operand))) is None:
+                append(self.encode_forward_ref(operand))
+            else:
+                append(index * 2)
+        successors = op.successors
+        append(len(successors))
+        for block in successors:
+            append(self.encode_block(block))
+        attributes = op.attributes
+        append(len(attributes))
+        encode_attr = self.encode_attr
+        for name, attr in attributes.items():
+            append(self.encode_string(name))
+            append(encode_attr(attr))
+        results = op.results
+        append(len(results))
+        for result in results:
+            append(encode_attr(result.typ))
+            append(self.encode_name(result.name))
+        append(len(op.regions))
+
+    def encode_block_header(self, block: Block) -> None:
+        stream = self.data.stream
+        stream.append(self.encode_block(block))
+        stream.append(len(block.args))
+        for arg in block.args:
+            stream.append(self.encode_attr(arg.typ))
+            stream.append(self.encode_name(arg.name))
+        self.define_values(block.args)
+        stream.append(len(block.ops))
+
+    def encode(self, items: list[Operation | Region | Block]) -> None:
+        """
+        Encode operations, regions and blocks, and their contents, in the
+        reverse order of `items`. The nested operations are encoded with an
+        explicit stack, so that deeply nested IR can be encoded.
+        """
+        # The stack also holds the results of operations, which are defined
+        # once the regions of their operation are encoded
+        stack: list[Operation | Region | Block | list[OpResult]] = []
+        stack.extend(items)
+        stream = self.data.stream
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Operation):
+                self.encode_op(item)
+                if item.regions:
+                    stack.append(item.results)
+                    stack.extend(reversed(item.regions))
+                else:
+                    self.define_values(item.results)
+            elif isinstance(item, Region):
+                stream.append(len(item.blocks))
+                stack.extend(reversed(item.blocks))
+            elif isinstance(item, Block):
+                self.encode_block_header(item)
+                stack.extend(reversed(item.ops))
+            else:
+                self.define_values(item)
+        self.resolve_forward_refs()
+
+
+# The kinds of the frames of the decoder, named after the kind of their
+# children
+_REGIONS = 0
+_BLOCKS = 1
+_OPS = 2
+
+
+class _Decoder:
+
+    def __init__(self, data: SerializedOps, ctx: MLContext | None):
+        self.data = data
+        self.read: Callable[[], int] = iter(data.stream).__next__
+        self.attributes = data.attributes
+        if ctx is not None:
+            self.attributes = [
+                ctx.intern_attr(attr) for attr in data.attributes
+            ]
+        self.values: list[SSAValue] = []
+        self.blocks: dict[int, Block] = {}
+        # The placeholders of the values used before their definition, by
+        # forward reference index
+        self.forward_values: dict[int, SSAValue] = {}
+
+    def decode_name(self) -> str | None:
+        index = self.read()
+        return None if index == 0 else self.data.strings[index - 1]
+
+    def decode_block(self) -> Block:
+        index = self.read()
+        if (block := self.blocks.get(index)) is None:
+            block = self.blocks[index] = Block()
+        return block
+
+    def decode_forward_ref(self, index: int) -> SSAValue:
+        ref = index >> 1
+        if (value := self.forward_values.get(ref)) is None:
+            typ = self.attributes[self.data.forward_refs[ref][1]]
+            value = self.forward_values[ref] = _ForwardRef(typ)
+        return value
+
+    def resolve_forward_refs(self) -> None:
+        """
+        Replace the placeholders of the values used before their definition.
+        This should be called once all operations are decoded.
+        """
+        external_values = self.data.external_values
+        for ref, placeholder in self.forward_values.items():
+            if (value := external_values.get(ref)) is None:
+                value = self.values[self.data.forward_refs[ref][0]]
+            placeholder.replace_by(value)
+
+    def decode_op(self) -> tuple[Operation, int]:
+        """Decode an operation without its regions, and its region count."""
+        read = self.read
+        strings = self.data.strings
+        attributes = self.attributes
+        values = self.values
+        op_type = self.data.op_types[read()]
+        operands = [
+            values[index >> 1]
+            if not (index := read()) & 1 else self.decode_forward_ref(index)
+            for _ in range(read())
+        ]
+        successors = [self.decode_block() for _ in range(read())]
+        op_attributes = {
+            strings[read()]: attributes[read()]
+            for _ in range(read())
+        }
+        num_results = read()
+        result_types = list[Attribute]()
+        result_names = list[str | None]()
+        for _ in range(num_results):
+            result_types.append(attributes[read()])
+            index = read()
+            result_names.append(None if index == 0 else strings[index - 1])
+
+        op = op_type._create_unchecked(operands, result_types, op_attributes,
+                                       successors)
+        for result, name in zip(op.results, result_names):
+            result.name = name
+        return op, read()
+
+    def decode_block_header(self) -> tuple[Block, int]:
+        """Decode a block with its arguments, and its operation count."""
+        read = self.read
+        index = read()
+        arg_types = list[Attribute]()
+        arg_names = list[str | None]()
+        for _ in range(read()):
+            arg_types.append(self.attributes[read()])
+            arg_names.append(self.decode_name())
+        if (block := self.blocks.get(index)) is None:
+            block = self.blocks[index] = Block.from_arg_types(arg_types)
+            args = block.args
+        else:
+            # The block was created as a successor of a previous operation
+            args = block.add_args(arg_types)
+        for arg, name in zip(args, arg_names):
+            arg.name = name
+        self.values.extend(args)
+        return block, read()
+
+    def decode(self, kind: int, count: int, add: Callable[[Any],
+                                                          None]) -> None:
+        """
+        Decode `count` operations, regions or blocks, depending on `kind`,
+        and their contents, and pass them to `add`. The nested operations
+        are decoded with an explicit stack, so that deeply nested IR can be
+        decoded.
+        """
+        # Each frame holds the kind and count of the children to decode, the
+        # function adding them to their parent, the parent, and the function
+        # adding the parent to its own parent. Parents are only added once
+        # they are complete, so that they are attached bottom-up.
+        stack: list[list[Any]] = [[kind, count, add, None, None]]
+        values = self.values
+        read = self.read
+        while stack:
+            frame = stack[-1]
+            kind, count, add, parent, add_parent = frame
+            if count == 0:
+                stack.pop()
+                if isinstance(parent, Operation):
+                    # The results are only visible after the regions
+                    values.extend(parent.results)
+                if add_parent is not None:
+                    add_parent(parent)
+                continue
+            frame[1] = count - 1
+
+            if kind == _OPS:
+                op, num_regions = self.decode_op()
+                if num_regions:
+                    stack.append(
+                        [_REGIONS, num_regions, op.add_region, op, add])
+                else:
+                    values.extend(op.results)
+                    add(op)
+            elif kind == _REGIONS:
+                region = Region()
+                stack.append([_BLOCKS, read(), region.add_block, region, add])
+            else:
+                block, num_ops = self.decode_block_header()
+                stack.append([_OPS, num_ops, block.add_op, block, add])
+        self.resolve_forward_refs()
+
+
+def serialize_ops(ops: Sequence[Operation],
+                  allow_external: bool = False) -> SerializedOps:
+    """
+    Serialize a list of operations.
+    The operands of the operations should be defined by the operations
+    themselves, unless `allow_external` is set, in which case the other
+    operands are kept as references to the original values.
+    """
+    encoder = _Encoder(allow_external)
+    encoder.data.stream.append(len(ops))
+    encoder.encode(list(reversed(ops)))
+    return encoder.data
+
+
+def deserialize_ops(data: SerializedOps,
+                    ctx: MLContext | None = None) -> list[Operation]:
+    """
+    Deserialize a list of operations serialized with `serialize_ops`.
+    If a context is given, the attributes are interned in it.
+    """
+    decoder = _Decoder(data, ctx)
+    ops = list[Operation]()
+    decoder.decode(_OPS, decoder.read(), ops.append)
+    return ops
+
+
+def serialize_region(region: Region,
+                     allow_external: bool = False) -> SerializedOps:
+    """
+    Serialize a region. The operands of its operations should be defined in
+    the region, unless `allow_external` is set, as in `serialize_ops`.
+    """
+    encoder = _Encoder(allow_external)
+    encoder.encode([region])
+    return encoder.data
+
+
+def deserialize_region(data: SerializedOps,
+                       ctx: MLContext | None = None) -> Region:
+    """Deserialize a region serialized with `serialize_region`."""
+    regions = list[Region]()
+    _Decoder(data, ctx).decode(_REGIONS, 1, regions.append)
+    return regions[0]
+
+
+def serialize_block(block: Block,
+                    allow_external: bool = False) -> SerializedOps:
+    """
+    Serialize a block. The operands of its operations should be defined in
+    the block, unless `allow_external` is set, as in `serialize_ops`.
+    """
+    encoder = _Encoder(allow_external)
+    encoder.encode([block])
+    return encoder.data
+
+
+def deserialize_block(data: SerializedOps,
+                      ctx: MLContext | None = None) -> Block:
+    """Deserialize a block serialized with `serialize_block`."""
+    blocks = list[Block]()
+    _Decoder(data, ctx).decode(_BLOCKS, 1, blocks.append)
+    return blocks[0]
+
+
+def deserialize_op(data: SerializedOps) -> Operation:
+    """
+    Deserialize a single operation serialized with `serialize_ops`.
+    This is used to unpickle operations.
+    """
+    return deserialize_ops(data)[0]
+
+
+def copy_ops(ops: Sequence[Operation]) -> list[Operation]:
+    """
+    Copy a list of operations, with all their regions. The values and
+    blocks are mapped across the operations, so that the copies refer to
+    each other, and operands defined outside of the operations are kept.
+    """
+    value_mapper: dict[SSAValue, SSAValue] = {}
+    block_mapper: dict[Block, Block] = {}
+    return [op.clone(value_mapper, block_mapper) for op in ops]
@@ -1,12 +1,15 @@
 import argparse
 import sys
 import os
-from io import IOBase, StringIO
+from io import BytesIO, IOBase, StringIO
 
-from xdsl.ir import MLContext
+from xdsl.bytecode import read_bytecode, write_bytecode
+from xdsl.ir import MLContext, Operation
 from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager
+from xdsl.pattern_rewriter import RewriteStatistics
 from xdsl.printer import Printer
-from xdsl.dialects.func import Func
+from xdsl.dialects.func import Func, FuncOp
 from xdsl.dialects.scf import Scf
 from xdsl.dialects.arith import Arith
 from xdsl.dialects.affine import Affine
@@ -18,7 +21,7 @@ from xdsl.diagnostic import DiagnosticException
 from xdsl.dialects.llvm import LLVM
 from xdsl.dialects.irdl import IRDL
 
-from typing import Dict, Callable, List
+from typing import Dict, Callable, Set
 
 
 class xDSLOptMain:
@@ -46,8 +49,14 @@ class xDSLOptMain:
     stream.
     """
 
-    pipeline: List[tuple[str, Callable[[ModuleOp], None]]]
-    """ The pass-pipeline to be applied. """
+    binary_targets: Set[str] = set()
+    """
+    The names of the targets that write bytes instead of text to their
+    stream.
+    """
+
+    pass_manager: PassManager
+    """ The pass manager running the pass-pipeline. """
 
     def __init__(self, description='xDSL modular optimizer driver'):
         self.ctx = MLContext()
@@ -68,6 +77,26 @@ class xDSLOptMain:
         Executes the different steps.
         """
         module = self.parse_input()
+        statistics = None
+        if self.args.rewrite_stats or self.args.rewrite_stats_json:
+            statistics = RewriteStatistics()
+            with statistics.collect():
+                self.run_passes(module)
+        else:
+            self.run_passes(module)
+        if statistics is not None:
+            self.output_rewrite_statistics(statistics)
+        if self.args.timing:
+            self.pass_manager.print_timing(sys.stderr)
+
+        contents = self.output_resulting_program(module)
+        self.print_to_output_stream(contents)
+
+    def run_passes(self, module: ModuleOp):
+        """
+        Apply the passes, and print the triggered diagnostics if they are
+        expected.
+        """
         if not self.args.verify_diagnostics:
             self.apply_passes(module)
         else:
@@ -77,9 +106,6 @@ class xDSLOptMain:
                 print(e)
                 exit(0)
 
-        contents = self.output_resulting_program(module)
-        self.print_to_output_stream(contents)
-
     def register_all_arguments(self, arg_parser: argparse.ArgumentParser):
         """
         Registers all the command line arguments that are used by this tool.
@@ -114,6 +140,11 @@ class xDSLOptMain:
         arg_parser.add_argument("--disable-verify",
                                 default=False,
                                 action='store_true')
+        arg_parser.add_argument("--verify-mode",
+                                choices=["full", "incremental"],
+                                default="full",
+                                help="Verify the whole IR after each pass, "
+                                "or only the operations modified by the pass")
         arg_parser.add_argument("-o",
                                 "--output-file",
                                 type=str,
@@ -135,6 +166,25 @@ class xDSLOptMain:
                                 action='store_true',
                                 help="Print the IR between each pass")
 
+        arg_parser.add_argument("--timing",
+                                default=False,
+                                action='store_true',
+                                help="Print the time spent in each pass to "
+                                "stderr")
+
+        arg_parser.add_argument("--rewrite-stats",
+                                default=False,
+                                action='store_true',
+                                help="Print the statistics of each rewrite "
+                                "pattern applied by the passes to stderr")
+
+        arg_parser.add_argument("--rewrite-stats-json",
+                                type=str,
+                                required=False,
+                                help="Write the statistics of each rewrite "
+                                "pattern applied by the passes as JSON to a "
+                                "file")
+
         arg_parser.add_argument("--verify-diagnostics",
                                 default=False,
                                 action='store_true',
@@ -166,15 +216,26 @@ class xDSLOptMain:
         """
 
         def parse_xdsl(f: IOBase):
-            input_str = f.read()
-            parser = Parser(self.ctx, input_str)
+            # The file is read in chunks by the parser
+            parser = Parser(self.ctx, f)
             module = parser.parse_op()
             if not (isinstance(module, ModuleOp)):
                 raise Exception(
                     "Expected module or program as toplevel operation")
             return module
 
+        def parse_bytecode(f: IOBase):
+            # The bytecode is read from the binary stream of text streams.
+            # Function bodies are read eagerly, as they are all verified and
+            # output anyway.
+            module = read_bytecode(self.ctx, getattr(f, 'buffer', f))
+            if not (isinstance(module, ModuleOp)):
+                raise Exception(
+                    "Expected module or program as toplevel operation")
+            return module
+
         self.available_frontends['xdsl'] = parse_xdsl
+        self.available_frontends['xdslbc'] = parse_bytecode
 
     def register_all_passes(self):
         """
@@ -200,7 +261,13 @@ class xDSLOptMain:
             mlir_module = converter.convert_module(prog)
             print(mlir_module, file=output)
 
+        def _output_bytecode(prog: ModuleOp, output: IOBase):
+            # Function bodies can then be read lazily by other tools
+            write_bytecode(prog, output, body_op_types=(FuncOp, ))
+
         self.available_targets['xdsl'] = _output_xdsl
+        self.available_targets['xdslbc'] = _output_bytecode
+        self.binary_targets.add('xdslbc')
         try:
             from xdsl.mlir_converter import MLIRConverter
             self.available_targets['mlir'] = _output_mlir
@@ -222,8 +289,22 @@ class xDSLOptMain:
             if p not in self.available_passes:
                 raise Exception(f"Unrecognized pass: {p}")
 
-        self.pipeline = [(p, lambda op, p=p: self.available_passes[p]
-                          (self.ctx, op)) for p in pipeline]
+        def print_between_passes(pass_name: str, op: Operation):
+            print(f"IR after {pass_name}:")
+            printer = Printer(stream=sys.stdout)
+            printer.print_op(op)
+            print("\n\n")
+
+        self.pass_manager = PassManager(
+            self.ctx,
+            verify_each=not self.args.disable_verify,
+            verify_incremental=self.args.verify_mode == "incremental",
+            callback=print_between_passes
+            if self.args.print_between_passes else None)
+        for p in pipeline:
+            self.pass_manager.add_pass(p, self.available_passes[p])
+        if self.args.timing:
+            self.pass_manager.enable_timing()
 
     def parse_input(self) -> ModuleOp:
         """
@@ -252,29 +333,41 @@ class xDSLOptMain:
         assert isinstance(prog, ModuleOp)
         if not self.args.disable_verify:
             prog.verify()
-        for pass_name, p in self.pipeline:
-            p(prog)
-            assert isinstance(prog, ModuleOp)
-            if not self.args.disable_verify:
-                prog.verify()
-            if self.args.print_between_passes:
-                print(f"IR after {pass_name}:")
-                printer = Printer(stream=sys.stdout)
-                printer.print_op(prog)
-                print("\n\n")
-
-    def output_resulting_program(self, prog: ModuleOp) -> str:
-        """Get the resulting program."""
-        output = StringIO()
+        self.pass_manager.run(prog)
+
+    def output_rewrite_statistics(self, statistics: RewriteStatistics):
+        """Output the statistics of the rewrite patterns."""
+        if self.args.rewrite_stats:
+            statistics.print_table(sys.stderr)
+        if self.args.rewrite_stats_json:
+            with open(self.args.rewrite_stats_json, 'w') as output_stream:
+                output_stream.write(statistics.to_json())
+
+    def output_resulting_program(self, prog: ModuleOp) -> str | bytes:
+        """
+        Get the resulting program, as bytes for binary targets and as text
+        otherwise.
+        """
         if self.args.target not in self.available_targets:
             raise Exception(f"Unknown target {self.args.target}")
+        output: IOBase
+        if self.args.target in self.binary_targets:
+            output = BytesIO()
+        else:
+            output = StringIO()
 
         self.available_targets[self.args.target](prog, output)
         return output.getvalue()
 
-    def print_to_output_stream(self, contents: str):
+    def print_to_output_stream(self, contents: str | bytes):
         """Print the contents in the expected stream."""
-        if self.args.output_file is None:
+        if isinstance(contents, bytes):
+            if self.args.output_file is None:
+                sys.stdout.buffer.write(contents)
+            else:
+                with open(self.args.output_file, 'wb') as output_stream:
+                    output_stream.write(contents)
+        elif self.args.output_file is None:
             print(contents)
         else:
             output_stream = open(self.args.output_file, 'w')
@@ -9,6 +9,7 @@ from typing import Any, TypeVar, cast, Annotated, Generic, TypeAlias
 
 import pytest
 
+from xdsl.dialects.builtin import ArrayAttr, IntegerType, VectorType
 from xdsl.ir import Attribute, Data, ParametrizedAttribute
 from xdsl.irdl import (AttrConstraint, GenericData, ParameterDef,
                        VerifyException, irdl_attr_definition, builder,
@@ -613,3 +614,14 @@ def test_irdl_definition():
     assert ParamAttrDefAttr.irdl_definition == ParamAttrDef(
         "test.param_attr_def_attr", [("arg1", AnyAttr()),
                                      ("arg2", BaseAttr(BoolData))])
+
+
+def test_attribute_hash_is_cached():
+    """Test that attribute hashes are computed once and are structural."""
+    vec1 = VectorType.from_type_and_list(IntegerType.from_width(32), [2, 3])
+    vec2 = VectorType.from_type_and_list(IntegerType.from_width(32), [2, 3])
+    assert hash(vec1) == hash(vec2)
+    assert {vec1: 0}[vec2] == 0
+    assert vec1.__dict__["_cached_hash"] == hash(vec1)
+    assert hash(ArrayAttr.from_list([vec1
+                                     ])) == hash(ArrayAttr.from_list([vec2]))
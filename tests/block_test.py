@@ -0,0 +1,111 @@
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import i32
+from xdsl.ir import Block
+
+
+def _constants(num: int) -> list[Constant]:
+    return [Constant.from_int_constant(i, i32) for i in range(num)]
+
+
+def test_block_ops_view():
+    """Test that the operation view behaves like a list."""
+    ops = _constants(4)
+    block = Block.from_ops(ops)
+
+    assert len(block.ops) == 4
+    assert list(block.ops) == ops
+    assert list(reversed(block.ops)) == ops[::-1]
+    assert block.ops == ops
+    assert block.ops[0] is ops[0]
+    assert block.ops[3] is ops[3]
+    assert block.ops[-1] is ops[3]
+    assert block.ops[1:3] == ops[1:3]
+    assert ops[2] in block.ops
+    assert block.first_op is ops[0]
+    assert block.last_op is ops[3]
+    assert ops[1].prev_op is ops[0]
+    assert ops[1].next_op is ops[2]
+    assert ops[0].prev_op is None
+    assert ops[3].next_op is None
+
+
+def test_insert_op_before_after():
+    """Test insertion relative to an existing operation."""
+    ops = _constants(5)
+    block = Block.from_ops([ops[1], ops[3]])
+
+    block.insert_op_before(ops[0], ops[1])
+    block.insert_op_after(ops[2], ops[1])
+    block.insert_op_after(ops[4], ops[3])
+
+    assert block.ops == ops
+    assert block.first_op is ops[0]
+    assert block.last_op is ops[4]
+    assert all(op.parent is block for op in ops)
+
+
+def test_insert_op_index():
+    ops = _constants(4)
+    block = Block.from_ops([ops[0], ops[3]])
+    block.insert_op([ops[1], ops[2]], 1)
+    assert block.ops == ops
+    assert block.get_operation_index(ops[2]) == 2
+
+
+def test_detach_op():
+    ops = _constants(3)
+    block = Block.from_ops(ops)
+
+    detached = block.detach_op(ops[1])
+    assert detached is ops[1]
+    assert detached.parent is None
+    assert detached.prev_op is None and detached.next_op is None
+    assert block.ops == [ops[0], ops[2]]
+    assert ops[0].next_op is ops[2]
+
+    block.detach_op(0)
+    block.detach_op(ops[2])
+    assert len(block.ops) == 0
+    assert block.first_op is None and block.last_op is None
+
+
+def test_erase_during_iteration():
+    """Test that the current operation can be erased while iterating."""
+    ops = _constants(4)
+    block = Block.from_ops(ops)
+    for op in block.ops:
+        if op is ops[1] or op is ops[2]:
+            block.erase_op(op)
+    assert block.ops == [ops[0], ops[3]]
+
+
+def test_is_before_in_block():
+    ops = _constants(3)
+    Block.from_ops(ops)
+    assert ops[0].is_before_in_block(ops[2])
+    assert not ops[2].is_before_in_block(ops[1])
+    assert not ops[1].is_before_in_block(ops[1])
+
+
+def test_is_before_in_block_after_inserts():
+    """Test that the order stays correct when gaps are exhausted."""
+    first, last = _constants(2)
+    block = Block.from_ops([first, last])
+    assert first.is_before_in_block(last)
+
+    # Repeatedly insert right after the first operation, until the gap between
+    # the two first operations is exhausted and the block is renumbered.
+    inserted = []
+    for op in _constants(40):
+        block.insert_op_after(op, first)
+        inserted.append(op)
+        assert first.is_before_in_block(op)
+        assert op.is_before_in_block(last)
+        if len(inserted) > 1:
+            assert op.is_before_in_block(inserted[-2])
+
+    new_first = Constant.from_int_constant(0, i32)
+    block.insert_op_before(new_first, first)
+    assert new_first.is_before_in_block(first)
+    block.detach_op(first)
+    assert new_first.is_before_in_block(inserted[0])
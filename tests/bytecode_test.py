@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import sys
+from io import BytesIO
+from typing import Callable
+
+import pytest
+
+from xdsl.bytecode import (MAGIC, _LazyRegions, from_bytecode, map_bytecode,
+                           read_bytecode, to_bytecode, write_bytecode)
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import IntegerType, ModuleOp
+from xdsl.dialects.func import FuncOp
+from xdsl.dialects.scf import If, Scf, Yield
+from xdsl.ir import Data, MLContext, Operation
+from xdsl.irdl import irdl_attr_definition
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+@irdl_attr_definition
+class FloatData(Data[float]):
+    name = "float_data"
+
+    @staticmethod
+    def parse_parameter(parser: Parser) -> float:
+        return float(parser.parse_str_literal())
+
+    @staticmethod
+    def print_parameter(data: float, printer: Printer) -> None:
+        printer.print_string(f'"{data}"')
+
+
+@pytest.fixture
+def ctx(ctx: MLContext) -> MLContext:
+    """The shared test context, with the float_data attribute."""
+    ctx.register_attr(FloatData)
+    return ctx
+
+
+prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+    ^0(%0 : !i32):
+      %1 : !i32 = arith.constant() ["value" = -1 : !i32, "float" = !float_data<"0.5">]
+      %sum : !i32 = arith.addi(%0 : !i32, %1 : !i32)
+      func.return(%sum : !i32)
+  }
+  %0 : !i64 = arith.constant() ["value" = 2 : !i64]
+}"""
+
+
+def test_bytecode_roundtrip(ctx: MLContext, print_op: Callable[[Operation],
+                                                               str]):
+    module = Parser(ctx, prog).parse_op()
+    output = BytesIO()
+    write_bytecode(module, output)
+    data = output.getvalue()
+    assert data.startswith(MAGIC)
+
+    decoded = read_bytecode(ctx, BytesIO(data))
+    decoded.verify()
+    assert print_op(decoded) == print_op(module)
+
+
+def test_bytecode_deduplicates_attributes(ctx: MLContext):
+    """Test that equal attributes are stored once, and shared when read."""
+    module = Parser(ctx, prog).parse_op()
+    data = to_bytecode(module)
+    assert data.count(b"sym_name") == 1
+
+    decoded = from_bytecode(ctx, data)
+    types = set[int]()
+    decoded.walk(lambda op: types.update(
+        id(res.typ) for res in op.results
+        if res.typ == IntegerType.from_width(32)))
+    assert len(types) == 1
+
+
+def test_bytecode_lazy_bodies(tmp_path, ctx: MLContext,
+                              print_op: Callable[[Operation], str]):
+    """Test that function bodies are read on their first access."""
+    module = Parser(ctx, prog).parse_op()
+    path = tmp_path / "module.xdslbc"
+    with open(path, "wb") as f:
+        write_bytecode(module, f, body_op_types=(FuncOp, ))
+
+    with open(path, "rb") as f, map_bytecode(ctx, f) as decoded:
+        func = decoded.regions[0].blocks[0].first_op
+        assert isinstance(func, FuncOp)
+        regions = func.regions
+        assert isinstance(regions, _LazyRegions) and not regions.is_loaded
+
+        assert len(func.body.blocks[0].ops) == 3
+        assert regions.is_loaded
+        assert type(func.regions) is list
+        assert func.body.parent is func
+    decoded.verify()
+    assert print_op(decoded) == print_op(module)
+
+
+def test_bytecode_unmapped_bodies(tmp_path, ctx: MLContext):
+    """Test that bodies not read before the file is unmapped raise."""
+    module = Parser(ctx, prog).parse_op()
+    path = tmp_path / "module.xdslbc"
+    with open(path, "wb") as f:
+        write_bytecode(module, f, body_op_types=(FuncOp, ))
+
+    with open(path, "rb") as f, map_bytecode(ctx, f) as decoded:
+        func = decoded.regions[0].blocks[0].first_op
+        regions = func.regions
+        assert isinstance(regions, _LazyRegions)
+        data = regions._reader.data
+    assert data.closed
+    with pytest.raises(ValueError):
+        func.body
+    assert not regions.is_loaded
+
+
+def test_bytecode_body_with_outer_values(ctx: MLContext,
+                                         print_op: Callable[[Operation], str]):
+    """Test that bodies using outer values are stored inline."""
+    module = Parser(
+        ctx, """module() {
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  func.func() ["sym_name" = "f", "function_type" = !fun<[], [!i32]>, "sym_visibility" = "private"] {
+    func.return(%0 : !i32)
+  }
+}""").parse_op()
+    decoded = from_bytecode(ctx,
+                            to_bytecode(module, body_op_types=(FuncOp, )),
+                            lazy=True)
+    func = decoded.regions[0].blocks[0].ops[1]
+    assert type(func.regions) is list
+    assert print_op(decoded) == print_op(module)
+
+
+def test_bytecode_invalid_input(ctx: MLContext):
+    with pytest.raises(ValueError) as e:
+        from_bytecode(ctx, b"module() {}")
+    assert e.value.args[0] == "Input is not in the xDSL bytecode format"
+
+    with pytest.raises(ValueError) as e:
+        from_bytecode(ctx, MAGIC + b"\x7f")
+    assert e.value.args[0] == ("Unsupported bytecode version 127, "
+                               "expected version 3")
+
+
+def test_bytecode_forward_reference(ctx: MLContext,
+                                    print_op: Callable[[Operation], str]):
+    """
+    Test that values used in a block appearing before the block defining
+    them are supported, in bodies and inline.
+    """
+    module = Parser(
+        ctx, """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+  ^0(%x : !i32):
+    cf.br()(^1)
+  ^1:
+    %y : !i32 = arith.addi(%x : !i32, %x : !i32)
+    cf.br()(^2)
+  ^2:
+    func.return(%y : !i32, %y : !i32)
+  }
+}""").parse_op()
+    # Move the block using %y before the block defining it
+    func_region = module.ops[0].regions[0]
+    func_region.insert_block(func_region.detach_block(2), 1)
+
+    for body_op_types in [(), (FuncOp, )]:
+        decoded = from_bytecode(ctx, to_bytecode(module, body_op_types))
+        assert print_op(decoded) == print_op(module)
+        blocks = decoded.ops[0].regions[0].blocks
+        ret = blocks[1].first_op
+        assert ret.operands[0] is ret.operands[1]
+        assert ret.operands[0] is blocks[2].first_op.results[0]
+        assert len(blocks[2].first_op.results[0].uses) == 2
+
+
+def test_bytecode_body_with_later_outer_value(ctx: MLContext):
+    """
+    Test that bodies using outer values defined after them are stored
+    inline.
+    """
+    module = Parser(
+        ctx, """module() {
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  func.func() ["sym_name" = "f", "function_type" = !fun<[], [!i32]>, "sym_visibility" = "private"] {
+    func.return(%0 : !i32)
+  }
+}""").parse_op()
+    block = module.regions[0].blocks[0]
+    block.add_op(block.detach_op(0))
+
+    decoded = from_bytecode(ctx, to_bytecode(module, (FuncOp, )), lazy=True)
+    func, constant = decoded.ops
+    assert type(func.regions) is list
+    assert func.regions[0].blocks[0].first_op.operands[0] is constant.results[0]
+
+
+def test_bytecode_undefined_operand(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    addi = module.ops[0].regions[0].blocks[0].ops[1]
+    with pytest.raises(ValueError):
+        to_bytecode(addi)
+
+
+def test_bytecode_deeply_nested_ops(ctx: MLContext):
+    """Test that IR nested deeper than the recursion limit is supported."""
+    Scf(ctx)
+    inner: list[Operation] = [Yield.get()]
+    depth = sys.getrecursionlimit()
+    for _ in range(depth):
+        cond = Constant.from_int_constant(1, 1)
+        inner = [cond, If.get(cond, [], inner, [Yield.get()]), Yield.get()]
+    module = ModuleOp.from_region_or_ops(inner[:2])
+
+    # The regions of the operations are stored inline, or as bodies
+    for body_op_types, lazy in [((), False), ((If, ), False), ((If, ), True)]:
+        decoded = from_bytecode(ctx, to_bytecode(module, body_op_types), lazy)
+        block = decoded.regions[0].blocks[0]
+        for _ in range(depth - 1):
+            block = block.ops[1].regions[0].blocks[0]
+        assert isinstance(block.ops[1], If)
+        assert block.ops[1].cond is block.ops[0].results[0]
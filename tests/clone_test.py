@@ -0,0 +1,68 @@
+import sys
+from typing import Callable
+
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.dialects.scf import If, Yield
+from xdsl.ir import MLContext, Operation, Region
+from xdsl.parser import Parser
+
+prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i1, !i32], [!i32]>, "sym_visibility" = "private"] {
+  ^0(%0 : !i1, %1 : !i32):
+    %2 : !i32 = arith.addi(%1 : !i32, %1 : !i32)
+    cf.cond_br(%0 : !i1, %2 : !i32, %1 : !i32) (^2, ^1) ["operand_segment_sizes" = !dense<!vector<[2 : !i64], !i32>, [1 : !i32, 1 : !i32]>]
+  ^1(%3 : !i32):
+    func.return(%3 : !i32)
+  ^2(%4 : !i32):
+    cf.br(%4 : !i32) (^1)
+  }
+}"""
+
+
+def test_clone(ctx: MLContext, print_op: Callable[[Operation], str]):
+    module = Parser(ctx, prog).parse_op()
+    cloned = module.clone()
+    cloned.verify()
+    assert print_op(cloned) == print_op(module)
+
+    blocks = cloned.ops[0].regions[0].blocks
+    entry_ops = list(blocks[0].ops)
+    assert entry_ops[1].operands[1] is entry_ops[0].results[0]
+    assert entry_ops[0].operands[0] is blocks[0].args[1]
+    # Successors appearing before their block are mapped as well
+    assert entry_ops[1].successors == [blocks[2], blocks[1]]
+    assert blocks[2].first_op.successors == [blocks[1]]
+
+
+def test_clone_into(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    region = module.ops[0].regions[0]
+    dest = Region()
+    region.clone_into(dest)
+    region.clone_into(dest, 1)
+    assert len(dest.blocks) == 6
+    assert all(block.parent is dest for block in dest.blocks)
+    assert dest.blocks[0].last_op.successors == [
+        dest.blocks[5], dest.blocks[4]
+    ]
+    assert dest.blocks[1].last_op.successors == [
+        dest.blocks[3], dest.blocks[2]
+    ]
+
+
+def test_clone_deeply_nested_ops():
+    """Test that nesting deeper than the recursion limit is supported."""
+    cond = Constant.from_int_constant(1, 1)
+    inner: list[Operation] = [Yield.get()]
+    depth = sys.getrecursionlimit()
+    for _ in range(depth):
+        inner = [If.get(cond, [], inner, [Yield.get()]), Yield.get()]
+    module = ModuleOp.from_region_or_ops([cond, inner[0]])
+
+    cloned = module.clone()
+    op = cloned.ops[1]
+    for _ in range(depth - 1):
+        op = op.regions[0].blocks[0].first_op
+    assert isinstance(op, If)
+    assert op.cond is cloned.ops[0].results[0]
@@ -0,0 +1,34 @@
+from io import StringIO
+from typing import Callable
+
+import pytest
+
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import Builtin
+from xdsl.dialects.cf import Cf
+from xdsl.dialects.func import Func
+from xdsl.ir import MLContext, Operation
+from xdsl.printer import Printer
+
+
+@pytest.fixture
+def ctx() -> MLContext:
+    """A context with the builtin, func, arith and cf dialects."""
+    ctx = MLContext()
+    Builtin(ctx)
+    Func(ctx)
+    Arith(ctx)
+    Cf(ctx)
+    return ctx
+
+
+@pytest.fixture
+def print_op() -> Callable[[Operation], str]:
+    """A function printing an operation to a string."""
+
+    def print_op(op: Operation) -> str:
+        file = StringIO()
+        Printer(stream=file).print_op(op)
+        return file.getvalue()
+
+    return print_op
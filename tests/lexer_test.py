@@ -0,0 +1,102 @@
+from io import BytesIO, StringIO
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+
+import pytest
+
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import Builtin, IndexType, IntegerType, i32
+from xdsl.ir import MLContext, Operation
+from xdsl.lexer import Lexer, Token, TokenKind
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+
+
+def test_token_kinds_and_positions():
+    tokens = list(Lexer('%0 : !i32 = "a\\"b"(^bb0) @f'))
+    assert tokens == [
+        Token(TokenKind.SSA_NAME, "%0", 0, 2),
+        Token(TokenKind.PUNCT, ":", 3, 4),
+        Token(TokenKind.PUNCT, "!", 5, 6),
+        Token(TokenKind.WORD, "i32", 6, 9),
+        Token(TokenKind.PUNCT, "=", 10, 11),
+        Token(TokenKind.STRING, '"a\\"b"', 12, 18),
+        Token(TokenKind.PUNCT, "(", 18, 19),
+        Token(TokenKind.BLOCK_NAME, "^bb0", 19, 23),
+        Token(TokenKind.PUNCT, ")", 23, 24),
+        Token(TokenKind.SYMBOL, "@f", 25, 27),
+    ]
+    assert [token.value for token in tokens[5::2]] == ['a\\"b', "bb0", "f"]
+
+
+def test_comments_are_skipped():
+    lexer = Lexer("a // b c\n  // d\nd")
+    assert [token.text for token in lexer] == ["a", "d"]
+    assert lexer.peek().kind == TokenKind.EOF
+    assert lexer.peek().start == 17
+
+
+@pytest.mark.parametrize("string, error", [
+    ('"a\\q"', "Unrecognized escaped character: \\q"),
+    ('"a\\', "Unexpected end of file"),
+    ('"abc', "'\"' expected"),
+])
+def test_invalid_string(string: str, error: str):
+    with pytest.raises(Exception) as e:
+        Lexer(string).next()
+    assert e.value.args[0] == error
+
+
+def test_parser_splits_tokens():
+    """Test that the parser can consume a prefix of a token."""
+    parser = Parser(MLContext(), "abc12 %x")
+    assert parser.parse_optional_ident() == "abc"
+    assert parser.parse_int_literal() == 12
+    assert parser.parse_optional_char("%")
+    assert parser.parse_ident(skip_white_space=False) == "x"
+
+
+def test_parse_integer_type_shorthand():
+    ctx = MLContext()
+    Builtin(ctx)
+    assert Parser(ctx, "!i32").parse_attribute() == i32
+    assert Parser(ctx, "!i1").parse_attribute() == IntegerType.from_width(1)
+    assert Parser(ctx, "!index").parse_attribute() == IndexType()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_chunked_input(chunk_size: int):
+    """Test that tokens spanning several chunks are lexed as a whole."""
+    input = '%val : !i32 = "a \\"b\\" é" // comment\n^bb0 @sym 12345 / /'
+    expected = list(Lexer(input))
+    assert list(Lexer(StringIO(input), chunk_size)) == expected
+    assert list(Lexer(BytesIO(input.encode()), chunk_size)) == expected
+
+
+def test_chunked_invalid_string():
+    with pytest.raises(Exception) as e:
+        list(Lexer(StringIO('a "b\\"c'), 2))
+    assert e.value.args[0] == "'\"' expected"
+
+
+def test_parse_file(tmp_path: Path):
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+    prog = """module() {
+  %0 : !i32 = arith.constant() ["value" = 42 : !i32]
+  %1 : !i32 = arith.addi(%0 : !i32, %0 : !i32)
+}
+"""
+    path = tmp_path / "prog.xdsl"
+    path.write_text(prog)
+
+    def print_op(op: Operation) -> str:
+        file = StringIO()
+        Printer(stream=file).print_op(op)
+        return file.getvalue()
+
+    with open(path) as f:
+        assert print_op(Parser(ctx, f).parse_op()) == prog
+    with open(path, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as m:
+        assert print_op(Parser(ctx, m).parse_op()) == prog
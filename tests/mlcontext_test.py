@@ -0,0 +1,74 @@
+import gc
+import pickle
+
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import (ArrayAttr, Builtin, IntegerAttr,
+                                   IntegerType, StringAttr, VectorType, i32)
+from xdsl.ir import MLContext
+from xdsl.parser import Parser
+
+
+def test_intern_attr():
+    ctx = MLContext()
+    attr1 = ctx.intern_attr(IntegerType.from_width(32))
+    attr2 = ctx.intern_attr(IntegerType.from_width(32))
+    attr3 = ctx.intern_attr(IntegerType.from_width(64))
+    assert attr1 is attr2
+    assert attr1 is not attr3
+
+
+def test_intern_nested_attr():
+    """Test that nested attributes are interned with their parents."""
+    ctx = MLContext()
+    vec1 = ctx.intern_attr(VectorType.from_type_and_list(i32, [2, 3]))
+    vec2 = ctx.intern_attr(VectorType.from_type_and_list(i32, [2, 3]))
+    assert vec1 is vec2
+
+    array = ctx.intern_attr(
+        ArrayAttr.from_list([IntegerAttr.from_index_int_value(2)]))
+    assert array.data[0] is vec1.shape.data[0]
+    assert ctx.intern_attr(i32) is vec1.element_type
+
+
+def test_intern_attr_per_context():
+    ctx1 = MLContext()
+    ctx2 = MLContext()
+    attr1 = ctx1.intern_attr(StringAttr.from_str("a"))
+    attr2 = ctx2.intern_attr(StringAttr.from_str("a"))
+    assert attr1 == attr2
+    assert attr1 is not attr2
+
+
+def test_intern_attr_unused():
+    """Test that unused interned attributes are dropped from the context."""
+    ctx = MLContext()
+    attr = ctx.intern_attr(StringAttr.from_str("a"))
+    assert ctx.intern_attr(StringAttr.from_str("a")) is attr
+    del attr
+    gc.collect()
+    assert not ctx._interned_attrs and not ctx._interned_attr_ids
+
+
+def test_pickle_context():
+    ctx = MLContext()
+    Builtin(ctx)
+    ctx.intern_attr(i32)
+    unpickled = pickle.loads(pickle.dumps(ctx))
+    assert unpickled.get_attr("string") is StringAttr
+    assert unpickled.intern_attr(IntegerType.from_width(32)) is not i32
+
+
+def test_parser_interns_attributes():
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+
+    prog = """
+module() {
+  %0 : !i32 = arith.constant() ["value" = 0 : !i32]
+  %1 : !i32 = arith.addi(%0 : !i32, %0 : !i32)
+}"""
+    module = Parser(ctx, prog).parse_op()
+    constant_op, add_op = module.ops
+    assert constant_op.results[0].typ is add_op.results[0].typ
+    assert constant_op.value.typ is add_op.results[0].typ
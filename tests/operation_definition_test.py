@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from xdsl.ir import Operation
+from io import StringIO
+
+from xdsl.dialects.builtin import StringAttr, i32
+from xdsl.ir import Block, OpResult, Operation, Region
 from xdsl.irdl import (irdl_op_definition, OperandDef, ResultDef, AttributeDef,
                        RegionDef, AnyAttr, OpDef)
+from xdsl.printer import Printer
 
 #  ___ ____  ____  _     ____        __
 # |_ _|  _ \|  _ \| |   |  _ \  ___ / _|
@@ -30,3 +34,41 @@ def test_get_definition():
         results=[("result", ResultDef(AnyAttr()))],
         attributes={"attr": AttributeDef(AnyAttr())},
         regions=[("region", RegionDef())])
+
+
+@irdl_op_definition
+class NoFieldsTestOp(Operation):
+    name = "test.no_fields"
+
+
+def test_operation_slots():
+    """Test that IRDL operations do not have an instance dictionary."""
+    op = NoFieldsTestOp.create()
+    assert not hasattr(op, "__dict__")
+    assert op.name == "test.no_fields"
+
+
+def test_operation_lazy_empty_containers():
+    """
+    Test that the empty containers of an operation are allocated on their
+    first access, and can then be mutated in place. Walking, verifying and
+    printing the operation does not allocate them.
+    """
+    op = NoFieldsTestOp.create()
+    assert op.walk(lambda _: None) is None
+    op.verify()
+    Printer(stream=StringIO()).print_op(op)
+    empty_op = NoFieldsTestOp.create()
+    assert op._attributes is empty_op._attributes
+    assert op._results is empty_op._results
+    assert op._successors is empty_op._successors
+    assert op._regions is empty_op._regions
+
+    op.attributes["attr"] = StringAttr("value")
+    op.results.append(OpResult(i32, op, 0))
+    op.successors.append(Block())
+    op.regions.append(Region())
+    assert op.attributes == {"attr": StringAttr("value")}
+    assert len(op.results) == 1 and op.results[0].typ == i32
+    assert len(op.successors) == 1 and len(op.regions) == 1
+    assert len(NoFieldsTestOp.create().attributes) == 0
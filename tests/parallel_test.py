@@ -0,0 +1,152 @@
+from io import StringIO
+from typing import Callable
+
+import pytest
+
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import i32
+from xdsl.dialects.func import FuncOp
+from xdsl.ir import MLContext, Operation
+from xdsl.parallel import (_init_worker, _print_chunk, _run_pipeline_chunk,
+                           parse_module_parallel, print_module_parallel,
+                           run_pipeline_parallel, split_module)
+from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager
+from xdsl.printer import Printer
+from xdsl.serialization import deserialize_ops, serialize_ops
+
+prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+    ^0(%0 : !i32):
+      %1 : !i32 = arith.addi(%0 : !i32, %0 : !i32)
+      func.return(%1 : !i32)
+  }
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32, "str" = "}{"]
+  func.func() ["sym_name" = "g", "function_type" = !fun<[], []>, "sym_visibility" = "private"] {
+    // {
+    func.return()
+  }
+  %1 : !i64 = arith.constant() ["value" = 2 : !i64]
+}"""
+
+
+def test_split_module():
+    chunks = split_module(prog, 10)
+    assert len(chunks) == 3
+    assert chunks[0].strip().startswith('func.func() ["sym_name" = "f"')
+    assert chunks[1].strip().startswith("%0 : !i32 = arith.constant()")
+    assert chunks[1].strip().endswith("}")
+    assert chunks[2].strip().startswith("%1 : !i64 = arith.constant()")
+    assert "".join(chunks) == prog[len("module() {"):-1]
+
+
+def test_split_module_regions():
+    """Test that operations are not split between their regions."""
+    chunks = split_module('module() { "test.op"() {} {} "test.op"() {} }', 10)
+    assert chunks == [' "test.op"() {} {}', ' "test.op"() {}']
+
+
+def test_serialization_roundtrip(ctx: MLContext,
+                                 print_op: Callable[[Operation], str]):
+    module = Parser(ctx, prog).parse_op()
+    ops = deserialize_ops(serialize_ops([module]), ctx)
+    assert len(ops) == 1
+    assert print_op(ops[0]) == print_op(module)
+
+
+def test_parse_module_parallel(ctx: MLContext, print_op: Callable[[Operation],
+                                                                  str]):
+    expected = Parser(ctx, prog).parse_op()
+    module = parse_module_parallel(ctx, prog, num_workers=2)
+    module.verify()
+    assert print_op(module) == print_op(expected)
+
+
+def test_print_local_ssa_names(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    file = StringIO()
+    Printer(stream=file, local_ssa_names=True).print_op(module)
+    lines = file.getvalue().splitlines()
+    assert lines[
+        6] == '  %0 : !i32 = arith.constant() ["value" = 1 : !i32, "str" = "}{"]'
+    assert lines[10] == '  %0 : !i64 = arith.constant() ["value" = 2 : !i64]'
+
+
+def test_print_module_parallel(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    expected = StringIO()
+    Printer(stream=expected, local_ssa_names=True).print_op(module)
+
+    file = StringIO()
+    print_module_parallel(Printer(stream=file), module, num_workers=2)
+    assert file.getvalue() == expected.getvalue()
+
+
+def test_print_serialized_chunk(ctx: MLContext):
+    """Test printing operations sent to a worker that is not forked."""
+    module = Parser(ctx, prog).parse_op()
+    texts = _print_chunk(serialize_ops(module.ops[2:]),
+                         (False, True, True, 1024))
+    assert texts == [
+        'func.func() ["sym_name" = "g", "function_type" = !fun<[], []>, "sym_visibility" = "private"] {\n    func.return()\n  }',
+        '%0 : !i64 = arith.constant() ["value" = 2 : !i64]'
+    ]
+
+
+def _add_constant(ctx: MLContext, op: Operation) -> None:
+    """Add a constant at the start of the first block of an operation."""
+    op.regions[0].blocks[0].insert_op(Constant.from_int_constant(3, i32), 0)
+
+
+def _func_pass_manager(ctx: MLContext, num_workers: int) -> PassManager:
+    pass_manager = PassManager(ctx)
+    pass_manager.nest(FuncOp, num_workers=num_workers).add_pass(
+        "add-constant", _add_constant)
+    return pass_manager
+
+
+def test_run_pipeline_parallel(ctx: MLContext, print_op: Callable[[Operation],
+                                                                  str]):
+    expected = Parser(ctx, prog).parse_op()
+    _func_pass_manager(ctx, 1).run(expected)
+
+    module = Parser(ctx, prog).parse_op()
+    pass_manager = _func_pass_manager(ctx, 2)
+    pass_manager.enable_timing()
+    pass_manager.run(module)
+    module.verify()
+    assert print_op(module) == print_op(expected)
+
+    assert pass_manager.timing is not None
+    pipeline_timing = pass_manager.timing.children[0]
+    assert pipeline_timing.ops_delta == 2
+    assert [(child.name, child.num_runs, child.ops_delta)
+            for child in pipeline_timing.children] == [("add-constant", 2, 2)]
+
+
+def test_run_pipeline_parallel_callback(ctx: MLContext):
+    """Test that callbacks are rejected in pipelines run by workers."""
+    pass_manager = PassManager(ctx, callback=lambda name, op: None)
+    with pytest.raises(ValueError):
+        pass_manager.nest(FuncOp, num_workers=2)
+    pass_manager.nest(FuncOp)
+
+    module = Parser(ctx, prog).parse_op()
+    nested = _func_pass_manager(ctx, 2).passes[0][1]
+    assert isinstance(nested, PassManager)
+    nested.callback = lambda name, op: None
+    with pytest.raises(ValueError):
+        run_pipeline_parallel(nested, list(module.ops), num_workers=2)
+
+
+def test_run_serialized_pipeline_chunk(ctx: MLContext):
+    """Test running passes on operations sent to a worker that is not forked."""
+    module = Parser(ctx, prog).parse_op()
+    _init_worker(ctx._registeredOps, ctx._registeredAttrs)
+    pass_manager = _func_pass_manager(ctx, 2).passes[0][1]
+    assert isinstance(pass_manager, PassManager)
+    data, timing = _run_pipeline_chunk(serialize_ops([module.ops[0]]),
+                                       pass_manager, True)
+    assert timing is not None and timing.children[0].num_runs == 1
+    func = deserialize_ops(data, ctx)[0]
+    assert isinstance(func.regions[0].blocks[0].first_op, Constant)
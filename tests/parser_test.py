@@ -0,0 +1,57 @@
+import pytest
+
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.func import FuncOp
+from xdsl.ir import MLContext
+from xdsl.parser import Parser
+
+
+def test_parse_module_ops(ctx: MLContext):
+    prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+    ^0(%0 : !i32):
+      func.return(%0 : !i32)
+  }
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  func.func() ["sym_name" = "g", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+    ^0(%0 : !i32):
+      func.return(%0 : !i32)
+  }
+}"""
+    parser = Parser(ctx, prog)
+    ops = parser.parse_module_ops()
+
+    func_f = next(ops)
+    assert isinstance(func_f, FuncOp)
+    assert func_f.parent is None
+    assert not parser._ssaValues and not parser._blocks
+
+    cst = next(ops)
+    assert isinstance(cst, Constant)
+    assert not parser._ssaValues
+
+    func_g = next(ops)
+    assert isinstance(func_g, FuncOp)
+    assert func_g.sym_name.data == "g"
+    assert list(ops) == []
+
+
+def test_parse_module_ops_no_cross_references(ctx: MLContext):
+    """Test that top-level operations cannot use previous results."""
+    prog = """module() {
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  %1 : !i32 = arith.addi(%0 : !i32, %0 : !i32)
+}"""
+    ops = Parser(ctx, prog).parse_module_ops()
+    next(ops)
+    with pytest.raises(Exception) as e:
+        next(ops)
+    assert e.value.args[0] == "name '0' does not refer to a SSA value"
+
+
+def test_parse_module_ops_expects_module(ctx: MLContext):
+    ops = Parser(ctx,
+                 'arith.constant() ["value" = 1 : !i32]').parse_module_ops()
+    with pytest.raises(Exception) as e:
+        next(ops)
+    assert e.value.args[0] == "Expected module as toplevel operation"
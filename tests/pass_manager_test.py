@@ -0,0 +1,154 @@
+from io import StringIO
+
+import pytest
+
+from xdsl.dialects.arith import Addi, Constant
+from xdsl.dialects.builtin import IntegerAttr, i32, i64
+from xdsl.dialects.func import FuncOp
+from xdsl.ir import Block, MLContext, OpResult, Operation
+from xdsl.parser import Parser
+from xdsl.pass_manager import PassManager, count_ops
+
+prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[], []>, "sym_visibility" = "private"] {
+    %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+    func.return()
+  }
+  func.func() ["sym_name" = "g", "function_type" = !fun<[], []>, "sym_visibility" = "private"] {
+    func.return()
+  }
+  %0 : !i32 = arith.constant() ["value" = 2 : !i32]
+}"""
+
+
+def _add_constant(ctx: MLContext, op: Operation) -> None:
+    """Add a constant at the start of the first block of an operation."""
+    op.regions[0].blocks[0].insert_op(Constant.from_int_constant(3, i32), 0)
+
+
+def test_nested_pipeline(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    visited = list[tuple[str, str]]()
+
+    def visit(name: str, op: Operation) -> None:
+        visited.append((name, op.name))
+
+    pass_manager = PassManager(ctx, callback=visit)
+    pass_manager.add_pass("add-constant", _add_constant)
+    func_pass_manager = pass_manager.nest(FuncOp)
+    func_pass_manager.add_pass("add-constant-in-func", _add_constant)
+    pass_manager.run(module)
+
+    assert visited == [("add-constant", "module"),
+                       ("add-constant-in-func", "func.func"),
+                       ("add-constant-in-func", "func.func")]
+    assert [type(op)
+            for op in module.ops] == [Constant, FuncOp, FuncOp, Constant]
+    for func in module.ops[1:3]:
+        cst = func.regions[0].blocks[0].first_op
+        assert isinstance(cst, Constant)
+        assert cst.value == IntegerAttr.from_int_and_width(3, 32)
+
+    with pytest.raises(ValueError):
+        func_pass_manager.run(module)
+
+
+def test_pass_timing(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    pass_manager = PassManager(ctx)
+    pass_manager.add_pass("add-constant", _add_constant)
+    pass_manager.nest(FuncOp).add_pass("add-constant-in-func", _add_constant)
+    pass_manager.enable_timing()
+    num_ops = count_ops(module)
+    pass_manager.run(module)
+    assert count_ops(module) == num_ops + 3
+
+    timing = pass_manager.timing
+    assert timing is not None and timing.num_runs == 1
+    assert [(child.name, child.num_runs, child.ops_delta)
+            for child in timing.children] == [("add-constant", 1, 1),
+                                              ("'func.func' Pipeline", 1, 2)]
+    func_timing = timing.children[1].children[0]
+    assert (func_timing.name, func_timing.num_runs,
+            func_timing.ops_delta) == ("add-constant-in-func", 2, 2)
+    assert pass_manager.verifier_timing is not None
+    assert pass_manager.verifier_timing.num_runs == 2
+
+    report = StringIO()
+    pass_manager.print_timing(report)
+    lines = report.getvalue().splitlines()
+    assert lines[1].strip() == "... Execution time report ..."
+    assert lines[3].startswith("  Total Execution Time: ")
+    assert [line.split()[-1] for line in lines[6:]] == [
+        "add-constant", "Pipeline", "add-constant-in-func", "Verifier", "Total"
+    ]
+    assert lines[6].split()[-2] == "+1"
+    assert lines[8].startswith("  ") and "    add-constant-in-func" in lines[8]
+
+
+def test_dirty_tracking(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    func_f, func_g, cst = module.ops
+    assert module.is_dirty and cst.is_dirty
+    module.verify()
+    assert not module.is_dirty and not func_f.is_dirty and not cst.is_dirty
+
+    # Adding an operation in a block marks the operation containing it
+    _add_constant(ctx, func_g)
+    assert func_g.is_dirty and not func_f.is_dirty and not module.is_dirty
+    # Assigning new attributes marks the operation itself
+    cst.attributes = {"value": IntegerAttr.from_int_and_width(4, 32)}
+    assert cst.is_dirty
+    # Changing attributes in place marks the operation as well
+    module.verify()
+    cst.attributes["value"] = IntegerAttr.from_int_and_width(5, 32)
+    assert cst.is_dirty
+    module.verify()
+    cst.attributes.update(value=IntegerAttr.from_int_and_width(6, 32))
+    assert cst.is_dirty
+    # Changing the type of a value marks its operation and its users
+    module.verify()
+    inner_cst = func_f.regions[0].blocks[0].first_op
+    inner_cst.results[0].typ = i64
+    assert inner_cst.is_dirty and not func_f.is_dirty
+    block = Block.from_arg_types([i32])
+    addi = Addi.get(block.args[0], block.args[0])
+    block.add_op(addi)
+    addi.verify()
+    block.args[0].typ = i64
+    assert addi.is_dirty
+    # Other changes have to be signaled
+    module.verify()
+    cst.results.append(OpResult(i32, cst, 1))
+    assert not cst.is_dirty
+    cst.mark_dirty()
+    assert cst.is_dirty
+
+
+def test_verify_incremental(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    module.verify()
+    assert module.verify_incremental() == 0
+
+    func_g = module.ops[1]
+    _add_constant(ctx, func_g)
+    # The function and its parent, and the new constant
+    assert module.verify_incremental() == 3
+    assert module.verify_incremental() == 0
+
+    # Errors in the modified operations are reported
+    cst = func_g.regions[0].blocks[0].first_op
+    assert isinstance(cst, Constant)
+    cst.attributes = {}
+    with pytest.raises(Exception):
+        module.verify_incremental()
+
+
+def test_pass_manager_verify_incremental(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    module.verify()
+    pass_manager = PassManager(ctx, verify_incremental=True)
+    pass_manager.nest(FuncOp).add_pass("add-constant-in-func", _add_constant)
+    pass_manager.run(module)
+    assert not any(op.is_dirty for op in module.ops)
+    assert count_ops(module) == 9
@@ -1,15 +1,19 @@
-from xdsl.dialects.scf import Scf, If
+import pytest
+
+from xdsl.dialects.scf import Scf, If, Yield
 
 from xdsl.printer import Printer
 from xdsl.dialects.builtin import Builtin, IntegerAttr, i32, i64, ModuleOp
 from xdsl.parser import Parser
 from xdsl.dialects.arith import Arith, Constant, Addi, Muli
-from xdsl.ir import MLContext, Region, Operation
-from xdsl.pattern_rewriter import (PatternRewriteWalker,
-                                   op_type_rewrite_pattern, RewritePattern,
-                                   PatternRewriter, AnonymousRewritePattern,
-                                   GreedyRewritePatternApplier)
-
+from xdsl.ir import Block, MLContext, OpResult, Region, Operation
+from xdsl.pattern_rewriter import (
+    PatternRewriteWalker, op_type_rewrite_pattern, RewritePattern,
+    PatternRewriter, AnonymousRewritePattern, GreedyRewritePatternApplier,
+    IndexedRewritePatternApplier, GreedyPatternRewriteDriver,
+    RewriteStatistics, get_root_op_type)
+
+import json
 from io import StringIO
 
 
@@ -248,6 +252,55 @@ def test_greedy_rewrite_pattern_applier():
                              apply_recursively=False))
 
 
+def test_indexed_rewrite_pattern_applier():
+    """Test IndexedRewritePatternApplier."""
+
+    prog = \
+"""module() {
+  %0 : !i32 = arith.constant() ["value" = 42 : !i32]
+  %1 : !i32 = arith.addi(%0 : !i32, %0 : !i32)
+}"""
+
+    expected = \
+"""module() {
+  %0 : !i32 = arith.constant() ["value" = 43 : !i32]
+  %1 : !i32 = arith.muli(%0 : !i32, %0 : !i32)
+}"""
+
+    class RewriteConst(RewritePattern):
+
+        @op_type_rewrite_pattern
+        def match_and_rewrite(self, op: Constant, rewriter: PatternRewriter):
+            rewriter.replace_matched_op([Constant.from_int_constant(43, i32)])
+
+    @op_type_rewrite_pattern
+    def addi_rewrite(op: Addi, rewriter: PatternRewriter):
+        rewriter.replace_matched_op([Muli.get(op.input1, op.input2)])
+
+    visited = list[Operation]()
+
+    def visit(op: Operation, rewriter: PatternRewriter):
+        visited.append(op)
+
+    applier = IndexedRewritePatternApplier([
+        RewriteConst(),
+        AnonymousRewritePattern(visit),
+        AnonymousRewritePattern(addi_rewrite)
+    ])
+    rewrite_and_compare(prog, expected,
+                        PatternRewriteWalker(applier, apply_recursively=False))
+
+    assert get_root_op_type(applier.rewrite_patterns[0]) is Constant
+    assert get_root_op_type(applier.rewrite_patterns[1]) is None
+    assert get_root_op_type(applier.rewrite_patterns[2]) is Addi
+    assert applier.candidate_patterns(Addi) == applier.rewrite_patterns[1:]
+    assert applier.candidate_patterns(ModuleOp) == [
+        applier.rewrite_patterns[1]
+    ]
+    # The constant is rewritten before the generic pattern is tried
+    assert [type(op) for op in visited] == [ModuleOp, Addi]
+
+
 def test_insert_op_before_matched_op():
     """Test rewrites where operations are inserted before the matched operation."""
 
@@ -399,6 +452,33 @@ def test_insert_op_after_matched_op_reversed():
                              walk_reverse=True))
 
 
+def test_rewriter_permissions():
+    """Test that the rewriter can only modify the matched operation."""
+    cond = Constant.from_int_constant(1, i32)
+    inner = Constant.from_int_constant(2, i32)
+    nested_if = If.get(cond, [], [inner, Yield.get()], [Yield.get()])
+    outer_if = If.get(cond, [], [nested_if, Yield.get()], [Yield.get()])
+    sibling = Constant.from_int_constant(3, i32)
+    module = ModuleOp.from_region_or_ops([cond, outer_if, sibling])
+
+    rewriter = PatternRewriter(outer_if)
+    assert rewriter._can_modify_op(inner)
+    assert rewriter._can_modify_block(Block())
+    assert not rewriter._can_modify_op(sibling)
+    assert not rewriter._can_modify_block(sibling.parent)
+    assert not rewriter._can_modify_op(module)
+    with pytest.raises(Exception):
+        rewriter.erase_op(sibling)
+    rewriter.erase_op(inner)
+    assert rewriter.has_done_action
+
+    # The rewriter is reused for another operation
+    rewriter.reset(sibling)
+    assert not rewriter.has_done_action
+    assert rewriter._can_modify_op(sibling)
+    assert not rewriter._can_modify_op(nested_if)
+
+
 def test_operation_deletion():
     """Test rewrites where SSA values are deleted."""
 
@@ -801,3 +881,115 @@ def test_move_region_contents_to_new_regions():
         prog, expected,
         PatternRewriteWalker(AnonymousRewritePattern(match_and_rewrite),
                              apply_recursively=False))
+
+
+def _folding_patterns() -> RewritePattern:
+    """Patterns folding additions of constants, and erasing dead constants."""
+
+    @op_type_rewrite_pattern
+    def fold_addi(op: Addi, rewriter: PatternRewriter):
+        values = list[int]()
+        for operand in op.operands:
+            if not isinstance(operand, OpResult) or not isinstance(
+                    operand.op, Constant):
+                return
+            value = operand.op.value
+            assert isinstance(value, IntegerAttr)
+            values.append(value.parameters[0].data)
+        rewriter.replace_matched_op(
+            [Constant.from_int_constant(sum(values), i32)])
+
+    @op_type_rewrite_pattern
+    def erase_dead_constant(op: Constant, rewriter: PatternRewriter):
+        if not op.results[0].uses:
+            rewriter.erase_matched_op()
+
+    return IndexedRewritePatternApplier([
+        AnonymousRewritePattern(fold_addi),
+        AnonymousRewritePattern(erase_dead_constant)
+    ])
+
+
+folding_prog = \
+"""module() {
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  %1 : !i32 = arith.constant() ["value" = 2 : !i32]
+  %2 : !i32 = arith.addi(%0 : !i32, %1 : !i32)
+  %3 : !i32 = arith.addi(%2 : !i32, %0 : !i32)
+  %4 : !i32 = arith.muli(%3 : !i32, %3 : !i32)
+}"""
+
+
+def test_greedy_pattern_rewrite_driver():
+    """Test that the driver revisits the users and producers of rewrites."""
+
+    expected = \
+"""module() {
+  %0 : !i32 = arith.constant() ["value" = 4 : !i32]
+  %1 : !i32 = arith.muli(%0 : !i32, %0 : !i32)
+}"""
+
+    driver = GreedyPatternRewriteDriver(_folding_patterns())
+    rewrite_and_compare(folding_prog, expected, driver)
+    # The second iteration checks that a fixpoint is reached
+    assert driver.num_iterations == 2
+    assert driver.num_rewrites == 5
+
+
+def test_greedy_pattern_rewrite_driver_limits():
+    """Test the iteration and rewrite limits of the driver."""
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+
+    module = Parser(ctx, folding_prog).parse_op()
+    driver = GreedyPatternRewriteDriver(_folding_patterns(), max_iterations=1)
+    assert not driver.rewrite_module(module)
+    assert driver.num_iterations == 1
+    assert driver.num_rewrites == 5
+
+    module = Parser(ctx, folding_prog).parse_op()
+    driver = GreedyPatternRewriteDriver(_folding_patterns(), max_rewrites=1)
+    assert not driver.rewrite_module(module)
+    assert driver.num_iterations == 1
+    assert driver.num_rewrites == 1
+    assert isinstance(module.ops[2], Constant)
+
+
+def test_rewrite_statistics():
+    """Test the statistics collected for each pattern."""
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+    module = Parser(ctx, folding_prog).parse_op()
+
+    statistics = RewriteStatistics()
+    with statistics.collect():
+        GreedyPatternRewriteDriver(_folding_patterns()).rewrite_module(module)
+
+    fold_addi = statistics.patterns["_folding_patterns.<locals>.fold_addi"]
+    assert fold_addi.num_attempts == 2
+    assert fold_addi.num_rewrites == 2
+    assert fold_addi.num_created_ops == 2
+    assert fold_addi.num_erased_ops == 2
+    erase_dead_constant = statistics.patterns[
+        "_folding_patterns.<locals>.erase_dead_constant"]
+    assert erase_dead_constant.num_rewrites == 3
+    assert erase_dead_constant.num_created_ops == 0
+    assert erase_dead_constant.num_erased_ops == 3
+    assert len(statistics.patterns) == 2
+
+    table = StringIO()
+    statistics.print_table(table)
+    lines = table.getvalue().splitlines()
+    assert lines[0].split() == [
+        "Pattern", "Attempts", "Rewrites", "Created", "Erased", "Time", "(ms)"
+    ]
+    assert len(lines) == 3
+    assert json.loads(statistics.to_json(
+    ))["_folding_patterns.<locals>.fold_addi"]["num_rewrites"] == 2
+
+    # Statistics are not collected outside of the context
+    module = Parser(ctx, folding_prog).parse_op()
+    GreedyPatternRewriteDriver(_folding_patterns()).rewrite_module(module)
+    assert fold_addi.num_attempts == 2
@@ -6,7 +6,8 @@ from xdsl.dialects.builtin import Builtin, ModuleOp, IntegerType
 from xdsl.dialects.arith import Arith, Addi, Constant
 from xdsl.diagnostic import Diagnostic
 from xdsl.ir import MLContext
-from xdsl.irdl import irdl_op_definition, Operation, OperandDef, ResultDef
+from xdsl.irdl import (irdl_attr_definition, irdl_op_definition, Operation,
+                       OperandDef, ParametrizedAttribute, ResultDef)
 from xdsl.printer import Printer
 from xdsl.parser import Parser
 
@@ -451,3 +452,135 @@ def test_custom_format():
     printer = Printer(stream=file, print_generic_format=True)
     printer.print_op(module)
     assert file.getvalue().strip() == expected.strip()
+
+
+class _WriteCounter(StringIO):
+    """A stream counting the number of writes."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_writes = 0
+
+    def write(self, text: str) -> int:
+        self.num_writes += 1
+        return super().write(text)
+
+
+def test_print_op_buffered():
+    """Test that the printer writes operations in large blocks."""
+    ops = [Constant.from_int_constant(i, 32) for i in range(2000)]
+    mod = ModuleOp.from_region_or_ops(ops)
+
+    file = _WriteCounter()
+    Printer(stream=file).print_op(mod)
+
+    lines = file.getvalue().splitlines()
+    assert len(lines) == 2002
+    assert lines[1] == '  %0 : !i32 = arith.constant() ["value" = 0 : !i32]'
+    assert lines[-1] == "}"
+    assert file.num_writes < 20
+
+
+@irdl_attr_definition
+class CustomPrintedAttr(ParametrizedAttribute):
+    name = "custom_printed"
+
+
+@irdl_attr_definition
+class CustomPrintedSubAttr(CustomPrintedAttr):
+    name = "custom_printed_sub"
+
+
+def test_custom_attribute_printer():
+    """Test that custom attribute printers apply to subclasses."""
+    file = StringIO()
+    printer = Printer(stream=file)
+    printer.print_attribute(CustomPrintedSubAttr())
+    assert file.getvalue() == "!custom_printed_sub"
+
+    Printer.register_attribute_printer(
+        CustomPrintedAttr,
+        lambda printer, attr: printer.print_string(f"#{attr.name}"))
+    try:
+        assert Printer.get_attribute_printer(
+            CustomPrintedSubAttr) is Printer.get_attribute_printer(
+                CustomPrintedAttr)
+
+        file = StringIO()
+        printer = Printer(stream=file)
+        printer.print_attribute(CustomPrintedAttr())
+        printer.print_attribute(CustomPrintedSubAttr())
+        assert file.getvalue() == "#custom_printed#custom_printed_sub"
+    finally:
+        Printer.unregister_attribute_printer(CustomPrintedAttr)
+
+    file = StringIO()
+    Printer(stream=file).print_attribute(CustomPrintedSubAttr())
+    assert file.getvalue() == "!custom_printed_sub"
+
+
+def test_custom_attribute_printer_clears_cache():
+    """
+    Test that registering a custom attribute printer clears the rendered
+    attributes of existing printers.
+    """
+    file = StringIO()
+    printer = Printer(stream=file)
+    printer.print_attribute(CustomPrintedAttr())
+    Printer.register_attribute_printer(
+        CustomPrintedAttr,
+        lambda printer, attr: printer.print_string(f"#{attr.name}"))
+    try:
+        printer.print_attribute(CustomPrintedAttr())
+    finally:
+        Printer.unregister_attribute_printer(CustomPrintedAttr)
+    printer.print_attribute(CustomPrintedAttr())
+    assert file.getvalue() == ("!custom_printed#custom_printed!custom_printed")
+
+
+def test_attribute_cache():
+    """Test that printed attributes are cached, in least recently used order."""
+    i32, i64, i1 = IntegerType.from_width(32), IntegerType.from_width(
+        64), IntegerType.from_width(1)
+
+    file = StringIO()
+    printer = Printer(stream=file, attribute_cache_size=2)
+    for attr in [i32, i64, i32, i1, i64, i32]:
+        printer.print_attribute(attr)
+        printer.print_string(" ")
+    assert file.getvalue() == "!i32 !i64 !i32 !i1 !i64 !i32 "
+    # i64 is evicted by i1, and i32 by i64
+    assert printer.attribute_cache_hits == 1
+    assert printer.attribute_cache_misses == 5
+
+    file = StringIO()
+    printer = Printer(stream=file, attribute_cache_size=0)
+    printer.print_attribute(i32)
+    printer.print_attribute(i32)
+    assert file.getvalue() == "!i32!i32"
+    assert printer.attribute_cache_hits == 0
+    assert printer.attribute_cache_misses == 0
+
+
+def test_print_op_to_string():
+    """Test that operations printed to strings are numbered from zero."""
+    prog = \
+"""module() {
+  %0 : !i32 = arith.constant() ["value" = 1 : !i32]
+  %1 : !i64 = arith.constant() ["value" = 2 : !i64]
+}"""
+
+    ctx = MLContext()
+    builtin = Builtin(ctx)
+    arith = Arith(ctx)
+    module = Parser(ctx, prog).parse_op()
+    assert isinstance(module, ModuleOp)
+
+    file = StringIO()
+    printer = Printer(stream=file)
+    texts = [printer.print_op_to_string(op, indent=1) for op in module.ops]
+    assert texts == [
+        '%0 : !i32 = arith.constant() ["value" = 1 : !i32]',
+        '%0 : !i64 = arith.constant() ["value" = 2 : !i64]'
+    ]
+    assert file.getvalue() == ""
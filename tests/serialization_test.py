@@ -0,0 +1,153 @@
+import copy
+import pickle
+import sys
+from typing import Callable
+
+import pytest
+
+from xdsl.dialects.arith import Constant
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.dialects.scf import If, Yield
+from xdsl.ir import Block, MLContext, Operation, Region
+from xdsl.parser import Parser
+from xdsl.serialization import (copy_ops, deserialize_block, deserialize_ops,
+                                deserialize_region, serialize_block,
+                                serialize_ops, serialize_region)
+
+prog = """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i1, !i32], [!i32]>, "sym_visibility" = "private"] {
+  ^0(%c : !i1, %x : !i32):
+    %y : !i32 = arith.addi(%x : !i32, %x : !i32)
+    cf.cond_br(%c : !i1, %y : !i32, %x : !i32)(^2, ^1) ["operand_segment_sizes" = !dense<!vector<[2 : !i64], !i32>, [1 : !i32, 1 : !i32]>]
+  ^1(%0 : !i32):
+    func.return(%0 : !i32)
+  ^2(%1 : !i32):
+    cf.br(%1 : !i32)(^1)
+  }
+}"""
+
+
+def test_pickle_operation(ctx: MLContext, print_op: Callable[[Operation],
+                                                             str]):
+    module = Parser(ctx, prog).parse_op()
+    unpickled = pickle.loads(pickle.dumps(module))
+    assert isinstance(unpickled, ModuleOp)
+    unpickled.verify()
+    assert print_op(unpickled) == print_op(module)
+
+
+def test_serialize_region_and_block(ctx: MLContext,
+                                    print_op: Callable[[Operation], str]):
+    module = Parser(ctx, prog).parse_op()
+    func_region = module.ops[0].regions[0]
+
+    region = deserialize_region(serialize_region(func_region))
+    assert isinstance(region, Region) and region.parent is None
+    assert len(region.blocks) == 3
+    # Successors refer to the deserialized blocks
+    assert region.blocks[2].ops[0].successors[0] is region.blocks[1]
+
+    block = deserialize_block(serialize_block(module.regions[0].blocks[0]))
+    assert isinstance(block, Block) and block.parent is None
+    assert print_op(block.ops[0]) == print_op(module.ops[0])
+
+
+def test_pickle_region_and_block(ctx: MLContext,
+                                 print_op: Callable[[Operation], str]):
+    module = Parser(ctx, prog).parse_op()
+    func_region = module.ops[0].regions[0]
+
+    region = pickle.loads(pickle.dumps(func_region))
+    assert isinstance(region, Region) and region.parent is None
+    assert len(region.blocks) == 3
+    # Successors refer to the unpickled blocks
+    assert region.blocks[2].ops[0].successors[0] is region.blocks[1]
+
+    block = pickle.loads(pickle.dumps(module.regions[0].blocks[0]))
+    assert isinstance(block, Block) and block.parent is None
+    assert print_op(block.ops[0]) == print_op(module.ops[0])
+
+
+def test_deepcopy_operation(ctx: MLContext, print_op: Callable[[Operation],
+                                                               str]):
+    module = Parser(ctx, prog).parse_op()
+    copied = copy.deepcopy(module)
+    assert copied is not module
+    assert print_op(copied) == print_op(module)
+
+    # Values defined outside of the operation are copied separately
+    addi = module.ops[0].regions[0].blocks[0].first_op
+    for copied_addi in [copy.deepcopy(addi), pickle.loads(pickle.dumps(addi))]:
+        assert copied_addi is not addi and copied_addi.parent is None
+        assert copied_addi.operands[0] is not addi.operands[0]
+        assert copied_addi.operands[0].typ == addi.operands[0].typ
+
+    # Shallow copies share the regions
+    copied = copy.copy(module)
+    assert copied is not module and copied.regions is module.regions
+
+
+def test_serialize_forward_reference(ctx: MLContext,
+                                     print_op: Callable[[Operation], str]):
+    """
+    Test that values used in a block appearing before the block defining
+    them are supported.
+    """
+    module = Parser(
+        ctx, """module() {
+  func.func() ["sym_name" = "f", "function_type" = !fun<[!i32], [!i32]>, "sym_visibility" = "private"] {
+  ^0(%x : !i32):
+    cf.br()(^1)
+  ^1:
+    %y : !i32 = arith.addi(%x : !i32, %x : !i32)
+    cf.br()(^2)
+  ^2:
+    func.return(%y : !i32)
+  }
+}""").parse_op()
+    # Move the block using %y before the block defining it
+    func_region = module.ops[0].regions[0]
+    func_region.insert_block(func_region.detach_block(2), 1)
+    deserialized = deserialize_ops(serialize_ops([module]))[0]
+    # Serialization keeps the value names, unlike copies
+    assert print_op(deserialized) == print_op(module)
+    for copied in [
+            deserialized,
+            pickle.loads(pickle.dumps(module)),
+            copy_ops([module])[0]
+    ]:
+        copied.verify()
+        blocks = copied.regions[0].blocks[0].first_op.regions[0].blocks
+        assert blocks[1].first_op.operands[0] is blocks[2].first_op.results[0]
+
+
+def test_copy_deeply_nested_ops():
+    """
+    Test that copying and pickling IR nested deeper than the recursion limit
+    is supported.
+    """
+    cond = Constant.from_int_constant(1, 1)
+    inner: list[Operation] = [Yield.get()]
+    depth = sys.getrecursionlimit()
+    for _ in range(depth):
+        inner = [If.get(cond, [], inner, [Yield.get()]), Yield.get()]
+    module = ModuleOp.from_region_or_ops([cond, inner[0]])
+
+    for copied in [
+            copy_ops([module])[0],
+            pickle.loads(pickle.dumps(module)),
+            copy.deepcopy(module)
+    ]:
+        op = copied.ops[1]
+        for _ in range(depth - 1):
+            op = op.regions[0].blocks[0].first_op
+        assert isinstance(op, If)
+        assert op.cond is op.parent_op().cond
+        assert op.cond.op.parent is copied.regions[0].blocks[0]
+
+
+def test_serialize_undefined_operand(ctx: MLContext):
+    module = Parser(ctx, prog).parse_op()
+    addi = module.ops[0].regions[0].blocks[0].first_op
+    with pytest.raises(ValueError):
+        serialize_ops([addi])
@@ -23,7 +23,44 @@ def test_main():
     assert isinstance(module, ModuleOp)
     constant_op = module.ops[0]
     andi_op = module.ops[1]
-    assert constant_op.results[0].uses == {Use(andi_op, 0), Use(andi_op, 1)}
-    assert andi_op.results[0].uses == set()
+    assert list(
+        constant_op.results[0].uses) == [Use(andi_op, 1),
+                                         Use(andi_op, 0)]
+    assert not andi_op.results[0].uses
 
     print("Done")
+
+
+def test_replace_operand_keeps_slots():
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+
+    parser = Parser(ctx, test_prog)
+    module = parser.parse_op()
+    constant_op = module.ops[0]
+    andi_op = module.ops[1]
+
+    first_slot, second_slot = andi_op._operand_uses
+    andi_op.replace_operand(1, andi_op.results[0])
+    assert andi_op._operand_uses == [first_slot, second_slot]
+    assert second_slot.value is andi_op.results[0]
+    assert list(constant_op.results[0].uses) == [Use(andi_op, 0)]
+    assert list(andi_op.results[0].uses) == [Use(andi_op, 1)]
+    assert andi_op.operands == [constant_op.results[0], andi_op.results[0]]
+
+
+def test_replace_by():
+    ctx = MLContext()
+    Builtin(ctx)
+    Arith(ctx)
+
+    parser = Parser(ctx, test_prog)
+    module = parser.parse_op()
+    constant_op = module.ops[0]
+    andi_op = module.ops[1]
+
+    constant_op.results[0].replace_by(andi_op.results[0])
+    assert not constant_op.results[0].uses
+    assert len(andi_op.results[0].uses) == 2
+    assert andi_op.operands == [andi_op.results[0]] * 2